@@ -0,0 +1,157 @@
+import asyncio
+from collections import deque
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent scoring requests into a single model call.
+
+    Each request submits its feature rows and awaits its own slice of the scores.
+    The worker holds incoming rows for up to `max_wait_ms` after the first one
+    arrives, or until `max_batch_size` rows are queued, then scores the whole
+    batch in one `score` call on a worker thread. Requests that arrive while a
+    batch is being scored are picked up by the next one, so batches grow with load.
+    """
+
+    def __init__(self, score, max_batch_size: int = 256, max_wait_ms: float = 2.0):
+        self.score = score
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._pending = deque()
+        self._pending_rows = 0
+        self._arrived = asyncio.Event()
+        self._worker = None
+        self._busy = False
+
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.max_batch_rows = 0
+        self.last_batch_rows = 0
+        self.batch_size_histogram = {}
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, drain: bool = False):
+        """
+        Stop the worker. With `drain`, requests already queued are scored first
+        (no new ones must be submitted meanwhile).
+        """
+        if drain:
+            while self._worker is not None and (self._pending or self._busy):
+                await asyncio.sleep(self.max_wait or 0.001)
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        # Fail whatever is still waiting rather than leaving callers hanging
+        while self._pending:
+            _, future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+        self._pending_rows = 0
+
+    async def submit(self, X: np.ndarray) -> np.ndarray:
+        """
+        Queue the rows of X for scoring and return their scores.
+        """
+        if self._worker is None:
+            raise RuntimeError("Batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((X, future))
+        self._pending_rows += len(X)
+        self._arrived.set()
+        return await future
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth_requests": len(self._pending),
+            "queue_depth_rows": self._pending_rows,
+            "requests": self.requests,
+            "rows": self.rows,
+            "batches": self.batches,
+            "mean_batch_rows": self.rows / self.batches if self.batches else 0.0,
+            "max_batch_rows": self.max_batch_rows,
+            "last_batch_rows": self.last_batch_rows,
+            # Batch row counts bucketed by powers of two: {"<=1": n, "<=2": n, "<=4": n, ...}
+            "batch_size_histogram": {f"<={k}": v for k, v in sorted(self.batch_size_histogram.items())},
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    async def _collect(self):
+        """
+        Wait for the first request, then for the batch window or a full batch.
+        """
+        loop = asyncio.get_running_loop()
+        while not self._pending:
+            self._arrived.clear()
+            await self._arrived.wait()
+
+        deadline = loop.time() + self.max_wait
+        while self._pending_rows < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        batch, n_rows = [], 0
+        while self._pending and (not batch or n_rows + len(self._pending[0][0]) <= self.max_batch_size):
+            X, future = self._pending.popleft()
+            self._pending_rows -= len(X)
+            # Skip callers that went away while queued
+            if future.cancelled():
+                continue
+            batch.append((X, future))
+            n_rows += len(X)
+        return batch, n_rows
+
+    async def _run(self):
+        while True:
+            batch, n_rows = await self._collect()
+            if not batch:
+                continue
+            self._busy = True
+
+            self.requests += len(batch)
+            self.rows += n_rows
+            self.batches += 1
+            self.last_batch_rows = n_rows
+            self.max_batch_rows = max(self.max_batch_rows, n_rows)
+            bucket = 1 << max(n_rows - 1, 0).bit_length()
+            self.batch_size_histogram[bucket] = self.batch_size_histogram.get(bucket, 0) + 1
+
+            X = batch[0][0] if len(batch) == 1 else np.concatenate([x for x, _ in batch])
+            try:
+                scores = await asyncio.to_thread(self.score, X)
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Batcher stopped"))
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self._busy = False
+                continue
+
+            start = 0
+            for x, future in batch:
+                stop = start + len(x)
+                if not future.done():
+                    future.set_result(scores[start:stop])
+                start = stop
+            self._busy = False
@@ -0,0 +1,107 @@
+import json
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from starlette.concurrency import iterate_in_threadpool
+
+from employee_attrition.api.formats import ArrowColumns, PARQUET, binary_format
+
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+
+
+def is_ndjson(content_type):
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return media_type in (NDJSON, "application/ndjson", "application/jsonl")
+
+
+async def spool_body(request, max_memory: int = 1024 * 1024):
+    """
+    Copy the streamed request body into a temporary file that stays in memory
+    up to `max_memory` bytes and rolls over to disk beyond that.
+    The body has to be fully received before the response starts streaming.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    async for data in request.stream():
+        spooled.write(data)
+    spooled.seek(0)
+    return spooled
+
+
+def _ndjson_chunks(file, chunk_size: int):
+    """
+    Yield columnar chunks ({column: list}) of at most `chunk_size` rows
+    from an NDJSON file, one JSON object per line.
+    """
+    rows = []
+    for line in file:
+        if line.strip():
+            rows.append(json.loads(line))
+        if len(rows) == chunk_size:
+            yield _rows_to_columns(rows)
+            rows = []
+    if rows:
+        yield _rows_to_columns(rows)
+
+
+def ndjson_chunks(file, chunk_size: int):
+    """
+    Async iterator over the chunks of a spooled NDJSON body, file reads run in the threadpool
+    """
+    return iterate_in_threadpool(_ndjson_chunks(file, chunk_size))
+
+
+def _rows_to_columns(rows):
+    # Every key of the chunk, a row lacking one gets None (rejected as missing when scored)
+    columns = dict.fromkeys(column for row in rows for column in row)
+    return {column: [row.get(column) for row in rows] for column in columns}
+
+
+def _file_chunks(upload, chunk_size: int):
+    """
+    Read an uploaded CSV or Parquet file in chunks of `chunk_size` rows
+    """
+    is_parquet = (binary_format(upload.content_type) == PARQUET
+                  or (upload.filename or "").lower().endswith((".parquet", ".pq")))
+    if is_parquet:
+        for batch in pq.ParquetFile(upload.file).iter_batches(batch_size=chunk_size):
+            yield ArrowColumns(pa.Table.from_batches([batch]))
+    else:
+        yield from pd.read_csv(upload.file, chunksize=chunk_size)
+
+
+def upload_chunks(upload, chunk_size: int):
+    """
+    Async iterator over the chunks of an uploaded file, file reads run in the threadpool
+    """
+    return iterate_in_threadpool(_file_chunks(upload, chunk_size))
+
+
+def encode_scores(employee_numbers, risk_scores, fmt, header=False) -> bytes:
+    """
+    Encode one chunk of scores as NDJSON lines or CSV rows
+    """
+    employee_numbers = np.asarray(employee_numbers).tolist()
+    risk_scores = np.asarray(risk_scores).tolist()
+
+    if fmt == CSV:
+        lines = [f"{e},{r!r}\n" for e, r in zip(employee_numbers, risk_scores)]
+        if header:
+            lines.insert(0, "EmployeeNumber,PredictedRisk\n")
+    else:
+        lines = [json.dumps({"EmployeeNumber": e, "PredictedRisk": r}) + "\n"
+                 for e, r in zip(employee_numbers, risk_scores)]
+    return "".join(lines).encode()
+
+
+def encode_error(message: str, fmt) -> bytes:
+    """
+    Encode the in-band failure trailer of a stream: an {"error": ...} NDJSON line, or
+    a `#error` comment line in CSV (skipped by readers given comment='#')
+    """
+    if fmt == CSV:
+        return ("#error " + " ".join(str(message).split()) + "\n").encode()
+    return (json.dumps({"error": str(message)}) + "\n").encode()
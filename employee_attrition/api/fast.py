@@ -1,11 +1,33 @@
+import asyncio
+import fcntl
+import os
+import numpy as np
 import pandas as pd
-from pydantic import BaseModel
-from typing import Dict, Any
-from fastapi import FastAPI, HTTPException, File, UploadFile, Body
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, Any, List, Literal, Optional
+from fastapi import FastAPI, HTTPException, File, UploadFile, Body, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from employee_attrition.ml_logic.registry import load_model, save_model
+from starlette.concurrency import run_in_threadpool
+from employee_attrition.api.batching import MicroBatcher
+from employee_attrition.api.formats import (
+    ARROW_STREAM, PARQUET, JSON, ArrowColumns, binary_format, response_format, read_table, write_table,
+    risk_scores_table, survival_curves_table,
+)
+from employee_attrition.api.bulk import CSV, NDJSON, is_ndjson, spool_body, ndjson_chunks, upload_chunks, encode_scores, encode_error
+from employee_attrition.api.training import TrainingJob
+from employee_attrition.api.prediction_cache import PredictionCache
+from employee_attrition.api.risk_table import RiskTable
+from employee_attrition.ml_logic.data import get_risk_scores, get_explanations
+from employee_attrition.ml_logic.registry import export_serving_model, get_model_version, load_model_with_version
+from employee_attrition.ml_logic.inference import compile_pipeline, column_values
+from employee_attrition.ml_logic.export import load_exported_model
+from employee_attrition.ml_logic.survival import (
+    baseline_survival, survival_time_grid, survival_matrix, encode_survival_curves,
+)
 # from employee_attrition.ml_logic.data import get_data, save_data_to_gcs, get_processed_data
-from employee_attrition.interface.main import  predict_risk_on_data, get_surv_curves_on_data, train #train_model
+from employee_attrition.interface.main import  predict_risk_on_data #train_model
 from employee_attrition import params
 from contextlib import asynccontextmanager
 
@@ -21,30 +43,175 @@ app.add_middleware(
 
 # app.state.model = load_model()
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Lifespan handler for model loading/training"""
-    # Try to load the model
-    model = load_model()
-
+def load_serving_model():
+    """
+    Load the model to serve, return (pipeline, inference plan, version):
+    - the model exported to SERVING_MODEL_PATH, memory-mapped (multi-worker serving, no pipeline)
+    - otherwise the latest model in MODEL_TARGET
+    All None if no model is found
+    """
+    if params.SERVING_MODEL_PATH and os.path.exists(params.SERVING_MODEL_PATH):
+        # Map the model exported by prestart.sh: all workers share the
+        # file's pages instead of each unpickling a copy
+        plan = load_exported_model(params.SERVING_MODEL_PATH)
+        version = plan.metadata.get('model_version')
+        print(f"✅ Model {version} mapped from {params.SERVING_MODEL_PATH} (pid {os.getpid()})")
+        return None, plan, version
+
+    model, version = load_model_with_version()
     if model is None:
-        print("⏳ No saved model found. Training a new model...")
+        return None, None, None
+    return model, compile_pipeline(model), version
+
+
+async def install_model(app: FastAPI, model, plan, version):
+    """
+    Serve a newly loaded model. The swap happens between two requests' steps:
+    requests that already picked up the previous model finish on it, and its
+    request batcher is drained before being stopped.
+    """
+    # Coalesce concurrent requests into one model call (needs the compiled plan)
+    batcher = None
+    if plan is not None:
+        batcher = MicroBatcher(
+            plan.score,
+            max_batch_size=params.BATCH_MAX_SIZE,
+            max_wait_ms=params.BATCH_WINDOW_MS,
+        )
+        batcher.start()
+
+    previous_batcher = app.state.batcher
+    app.state.model = model
+    app.state.plan = plan
+    app.state.model_version = version
+    app.state.batcher = batcher
+    if app.state.prediction_cache is not None:
+        # Results belong to the object computing them: the plan, or the pipeline without one
+        app.state.prediction_cache.reset(plan if batcher is not None else model)
+    print(f"🚀 Model {version} ready for inference")
+
+    if previous_batcher is not None:
+        await previous_batcher.stop(drain=True)
+
+
+def refresh_serving_model(current_version):
+    """
+    Load the latest model if its version differs from `current_version`, compiled
+    and warmed up: return (pipeline, inference plan, version), None if unchanged.
+    Only the registry metadata is read when the model has not changed.
+    """
+    version = get_model_version()
+    if version is None or version == current_version:
+        return None
+
+    if params.SERVING_MODEL_PATH:
+        # Multi-worker serving: the first worker to notice re-exports the model,
+        # the others find the new version already in the shared file
+        with open(f"{params.SERVING_MODEL_PATH}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            plan = None
+            if os.path.exists(params.SERVING_MODEL_PATH):
+                plan = load_exported_model(params.SERVING_MODEL_PATH)
+            if plan is None or plan.metadata.get('model_version') != version:
+                export_serving_model(params.SERVING_MODEL_PATH)
+                plan = load_exported_model(params.SERVING_MODEL_PATH)
+        model, version = None, plan.metadata.get('model_version')
+    else:
+        model, version = load_model_with_version()
+        if model is None:
+            return None
+        plan = compile_pipeline(model)
+
+    # Score one row so the first request does not pay for page faults and lazy setup
+    if plan is not None:
+        plan.score(np.zeros((1, plan.n_features), dtype=np.float32))
+    return model, plan, version
+
+
+def load_risk_table(plan):
+    """
+    Precomputed risk table written by train(), None if there is none, with the risk
+    factors saved alongside. Survival curves are precomputed with the served model's
+    baseline if RISK_TABLE_CURVE_POINTS > 0
+    """
+    try:
+        risk_score_df = get_risk_scores()
+    except Exception as e:
+        print(f"⚠️ Precomputed risk table not loaded: {e}")
+        return None
+    if risk_score_df is None:
+        print("⚠️ No precomputed risk table found")
+        return None
+
+    try:
+        explanation_df = get_explanations()
+    except Exception as e:
+        print(f"⚠️ Precomputed risk factors not loaded: {e}")
+        explanation_df = None
+
+    baseline = plan.baseline if plan is not None else None
+    table = RiskTable.from_frame(risk_score_df, baseline, params.RISK_TABLE_CURVE_POINTS,
+                                 params.RISK_TABLE_CURVE_MAX_TIME, explanation_df)
+    print(f"✅ Precomputed risk table loaded ({len(table)} employees"
+          f"{', with risk factors' if explanation_df is not None else ''})")
+    return table
+
+
+async def watch_model(app: FastAPI):
+    """
+    Poll the registry every MODEL_POLL_INTERVAL_S seconds and hot-swap new
+    model versions in; loading and warm-up run off the request path.
+    """
+    while True:
+        await asyncio.sleep(params.MODEL_POLL_INTERVAL_S)
         try:
-            # Train and save new model
-            model = train()
-            save_model(model)
-            print("✅ New model trained and saved")
+            refreshed = await run_in_threadpool(refresh_serving_model, app.state.model_version)
+            if refreshed is not None:
+                print(f"🔄 New model version found: {refreshed[2]}")
+                await install_model(app, *refreshed)
+                app.state.risk_table = await run_in_threadpool(load_risk_table, app.state.plan)
         except Exception as e:
-            print(f"❌ Model training failed: {str(e)}")
-            raise HTTPException(status_code=500, detail="Model initialization failed")
+            print(f"❌ Model reload failed, keeping the current model: {e}")
 
-    # Store model and yield control
-    app.state.model = model
-    print("🚀 Model ready for inference")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Lifespan handler: load the model or fail fast, training is a separate job (POST /train)"""
+    app.state.model = None
+    app.state.plan = None
+    app.state.model_version = None
+    app.state.batcher = None
+    # Workers sharing an exported model share its training job too
+    app.state.training = TrainingJob(f"{params.SERVING_MODEL_PATH}.training" if params.SERVING_MODEL_PATH else None)
+    app.state.watcher = None
+    app.state.risk_table = None
+    app.state.prediction_cache = None
+    if params.PREDICTION_CACHE_MAX_MB > 0:
+        app.state.prediction_cache = PredictionCache(params.PREDICTION_CACHE_MAX_MB * 1024 * 1024)
+
+    model, plan, version = load_serving_model()
+    if model is None and plan is None:
+        if not params.API_START_WITHOUT_MODEL:
+            raise RuntimeError(
+                f"No model found in {params.MODEL_TARGET}: train one first (make run_train), "
+                "or set API_START_WITHOUT_MODEL=true to start unready and POST /train")
+        print("⚠️ No model found: not ready until a training job (POST /train) completes")
+    else:
+        await install_model(app, model, plan, version)
+    app.state.risk_table = load_risk_table(app.state.plan)
+
+    # Pick up newly saved / promoted models without a restart
+    if params.MODEL_POLL_INTERVAL_S > 0:
+        app.state.watcher = asyncio.create_task(watch_model(app))
     yield
 
     # Cleanup (if needed) when shutting down
     print("🛑 Cleaning up resources...")
+    if app.state.watcher is not None:
+        app.state.watcher.cancel()
+    await app.state.training.cancel()
+    if app.state.batcher is not None:
+        await app.state.batcher.stop()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -54,55 +221,389 @@ def root():
         "greeting": "works!"
     }
 
+@app.get("/health/live")
+def liveness():
+    """Liveness probe: the process is up and answering requests"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def readiness():
+    """Readiness probe: 200 once a model is in memory, 503 until then"""
+    if app.state.model is None and app.state.plan is None:
+        return JSONResponse(status_code=503, content={
+            "status": "not ready",
+            "training": app.state.training.to_dict(),
+        })
+    return {"status": "ready", "model_version": app.state.model_version}
+
+def require_model():
+    if app.state.model is None and app.state.plan is None:
+        raise HTTPException(status_code=503, detail="No model loaded yet")
+
+async def load_trained_model():
+    """
+    Serve the model a training job just saved. With SERVING_MODEL_PATH set, it is
+    re-exported to the shared file under its lock and mapped, like the other
+    workers' watchers do, instead of unpickling a private copy
+    """
+    if params.SERVING_MODEL_PATH:
+        refreshed = await run_in_threadpool(refresh_serving_model, app.state.model_version)
+        if refreshed is None:
+            if app.state.model is None and app.state.plan is None:
+                raise RuntimeError(f"The trained model could not be loaded from {params.MODEL_TARGET}")
+            return
+        await install_model(app, *refreshed)
+    else:
+        model, version = await run_in_threadpool(load_model_with_version)
+        if model is None:
+            raise RuntimeError(f"The trained model could not be loaded from {params.MODEL_TARGET}")
+        await install_model(app, model, compile_pipeline(model), version)
+    app.state.risk_table = await run_in_threadpool(load_risk_table, app.state.plan)
+
+@app.post("/train", status_code=202)
+async def start_training():
+    """
+    Train a new model in a background process; it is saved to MODEL_TARGET and
+    served by this process once ready. Poll GET /train for the job status.
+    """
+    try:
+        app.state.training.start(on_success=load_trained_model)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return app.state.training.to_dict()
+
+@app.get("/train")
+def training_status():
+    """Status of the last training job"""
+    return app.state.training.to_dict()
+
+def require_risk_table():
+    if app.state.risk_table is None:
+        raise HTTPException(status_code=503, detail="No precomputed risk table loaded")
+    return app.state.risk_table
+
+def risk_table_response(table, positions, curves, explain=False, n_factors=None):
+    response = {"risk_scores": table.records(positions)}
+    if curves:
+        if table.survival is None:
+            raise HTTPException(status_code=400, detail="Survival curves are not precomputed (RISK_TABLE_CURVE_POINTS is 0)")
+        response["survival_curves"] = encode_survival_curves(
+            table.employee_numbers[positions], table.time_grid, table.survival[positions], dtype="float32")
+    if explain:
+        # Looked up, never computed here: train() saves them next to the risk scores
+        if table.attributions is None:
+            raise HTTPException(status_code=400, detail="Risk factors are not precomputed (retrain a GBSA model)")
+        response["explanations"] = table.explanations(positions, n_factors)
+    return response
+
+@app.get("/risk/top")
+async def top_risk(n: int = Query(10, gt=0), curves: bool = False, explain: bool = False,
+                   n_factors: Optional[int] = Query(None, gt=0)):
+    """Employees with the highest precomputed risk, highest first"""
+    table = require_risk_table()
+    return risk_table_response(table, table.top(n), curves, explain, n_factors)
+
+@app.get("/risk")
+async def lookup_risk(employee_number: List[int] = Query(...), curves: bool = False, explain: bool = False,
+                      n_factors: Optional[int] = Query(None, gt=0)):
+    """Precomputed risk of one or many employees: /risk?employee_number=1&employee_number=2"""
+    table = require_risk_table()
+    positions, found = table.positions(employee_number)
+    response = risk_table_response(table, positions[found], curves, explain, n_factors)
+    response["missing"] = np.asarray(employee_number)[~found].tolist()
+    return response
+
+@app.get("/risk/{employee_number}")
+async def employee_risk(employee_number: int, curves: bool = False, explain: bool = False,
+                        n_factors: Optional[int] = Query(None, gt=0)):
+    """Precomputed risk of one employee"""
+    table = require_risk_table()
+    positions, found = table.positions([employee_number])
+    if not found[0]:
+        raise HTTPException(status_code=404, detail=f"Employee {employee_number} is not in the risk table")
+    return risk_table_response(table, positions, curves, explain, n_factors)
+
+@app.get("/explain/{employee_number}")
+async def explain_employee(employee_number: int, n_factors: Optional[int] = Query(None, gt=0)):
+    """
+    Precomputed risk factors of one employee: the attribution of each feature to
+    their log-risk, largest first, on top of the BaseValue
+    """
+    table = require_risk_table()
+    positions, found = table.positions([employee_number])
+    if not found[0]:
+        raise HTTPException(status_code=404, detail=f"Employee {employee_number} is not in the risk table")
+    return risk_table_response(table, positions, False, True, n_factors)["explanations"][0]
+
+@app.get("/metrics")
+def metrics():
+    """Queue depth and batch-size metrics of the request batcher, prediction cache counters"""
+    batcher = app.state.batcher
+    cache = app.state.prediction_cache
+    return {
+        "model_version": app.state.model_version,
+        "batching": batcher.metrics() if batcher is not None else None,
+        "prediction_cache": cache.metrics() if cache is not None else None,
+    }
+
+async def encode_rows(hr_data, model, plan, batcher):
+    """
+    Encode a columnar payload into the served model's feature matrix: with the
+    compiled plan (scored through its batcher), or the sklearn preprocessor as a fallback.
+    Returns (employee_numbers, X, async scoring function, the model the results belong to).
+    """
+    if batcher is not None:
+        employee_numbers = column_values(hr_data, 'EmployeeNumber')
+        if len(employee_numbers) == 0:
+            raise HTTPException(status_code=400, detail="Empty DataFrame received")
+        # Encoding a large payload is CPU work too: keep it off the event loop
+        return employee_numbers, await run_in_threadpool(plan.transform, hr_data), batcher.submit, plan
+
+    hr_df = hr_data_frame(hr_data)
+    if len(hr_df) == 0:
+        raise HTTPException(status_code=400, detail="Empty DataFrame received")
+    hr_df = hr_df.set_index('EmployeeNumber').drop(columns=['Attrition', 'YearsAtCompany'], errors='ignore')
+    X = await run_in_threadpool(model[:-1].transform, hr_df)
+
+    async def score(X):
+        return await run_in_threadpool(model.named_steps['model'].predict, X)
+    return hr_df.index.to_numpy(), X, score, model
+
+async def cached_scores(X, score, served):
+    """
+    Risk scores of an encoded matrix: rows already scored by the `served` model come
+    from the prediction cache, only the others are scored
+    """
+    cache = app.state.prediction_cache
+    if cache is None:
+        return np.asarray(await score(X), dtype=np.float64)
+
+    # Keying and looking up every row is CPU work: off the event loop
+    def lookup():
+        keys = cache.row_keys(X)
+        return (keys, *cache.lookup(keys))
+    keys, risk_scores, missing = await run_in_threadpool(lookup)
+    if missing.any():
+        new_scores = await score(X[missing] if not missing.all() else X)
+        risk_scores[missing] = new_scores
+        await run_in_threadpool(cache.store, served, [key for key, miss in zip(keys, missing) if miss], new_scores)
+    return risk_scores
+
+async def cached_curves(X, score, served, baseline, time_grid, grid_key: bytes):
+    """
+    Survival curves of an encoded matrix on `time_grid` (identified by `grid_key`):
+    rows already computed for the same grid by the `served` model come from the
+    prediction cache, the others are scored (risk scores cached too) and evaluated
+    in the threadpool, off the event loop
+    """
+    cache = app.state.prediction_cache
+    if cache is None:
+        return await run_in_threadpool(survival_matrix, baseline, await score(X), time_grid)
+
+    def lookup():
+        keys = cache.row_keys(X, salt=grid_key)
+        return (keys, *cache.lookup_curves(keys, len(time_grid)))
+    keys, curves, missing = await run_in_threadpool(lookup)
+    if missing.any():
+        X_missing = X[missing] if not missing.all() else X
+        new_curves = await run_in_threadpool(
+            survival_matrix, baseline, await cached_scores(X_missing, score, served), time_grid)
+        curves[missing] = new_curves
+        await run_in_threadpool(cache.store, served, [key for key, miss in zip(keys, missing) if miss], new_curves)
+    return curves
+
 class RiskRequest(BaseModel):
     hr_data: Dict[str, Any]  # Flexible dictionary structure
 
 
-@app.post("/predictRisk")
-def predict_risk(request: RiskRequest = Body(...)):
+class SurvivalCurvesRequest(BaseModel):
+    hr_data: Dict[str, Any]
+    max_time: Optional[float] = Field(10, gt=0)  # Horizon in years, None for the last event time
+    n_points: Optional[int] = Field(None, gt=0)  # Evenly spaced grid, None for the model's event times
+    dtype: Literal["float64", "float32"] = "float64"
+    encoding: Literal["json", "base64"] = "json"
+
+
+def request_body_docs(schema):
+    """OpenAPI request body: the JSON schema or an Arrow IPC stream / Parquet file"""
+    binary = {"schema": {"type": "string", "format": "binary"}}
+    return {"requestBody": {"required": True, "content": {
+        JSON: {"schema": schema.model_json_schema()},
+        ARROW_STREAM: binary,
+        PARQUET: binary,
+    }}}
+
+
+async def read_request(request: Request, schema):
+    """
+    Parse the request by content type.
+    - JSON: the `schema` body, `hr_data` is the columnar dict
+    - Arrow IPC stream / Parquet: the table is the HR data, other options come
+      from the query string
+    Returns (options, hr_data, response format)
+    """
+    content_type = request.headers.get("content-type")
+    fmt = binary_format(content_type)
     try:
-        # Convert input to DataFrame
-        hr_data = pd.DataFrame(request.hr_data)
+        if fmt is not None:
+            table = read_table(await request.body(), fmt)
+            options = schema(hr_data={}, **request.query_params)
+            hr_data = ArrowColumns(table)
+        else:
+            options = schema(**await request.json())
+            hr_data = options.hr_data
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    return options, hr_data, response_format(request.headers.get("accept"), content_type)
+
+
+def hr_data_frame(hr_data):
+    """
+    DataFrame of the HR data for the sklearn pipeline fallback, which is indexed by
+    EmployeeNumber: raise ValueError without the column, like the compiled plan does
+    """
+    if isinstance(hr_data, ArrowColumns):
+        hr_df = hr_data.table.to_pandas()
+    elif isinstance(hr_data, pd.DataFrame):
+        hr_df = hr_data
+    else:
+        hr_df = pd.DataFrame(hr_data)
+    if 'EmployeeNumber' not in hr_df.columns:
+        raise ValueError("Column 'EmployeeNumber' is missing from the input data")
+    return hr_df
+
+
+@app.post("/predictRisk", openapi_extra=request_body_docs(RiskRequest))
+async def predict_risk(request: Request):
+    try:
+        require_model()
+        options, hr_data, fmt = await read_request(request, RiskRequest)
 
-        # Validate
-        if len(hr_data) == 0:
-            raise HTTPException(status_code=400, detail="Empty DataFrame received")
+        # The served model is picked up once, a hot reload meanwhile does not affect this request
+        model, plan, batcher = app.state.model, app.state.plan, app.state.batcher
 
-        risk_scores_df = predict_risk_on_data(app.state.model, hr_data.set_index('EmployeeNumber'))
+        # Fast path: the columnar payload encoded with the compiled inference plan,
+        # scored through its batcher; otherwise the sklearn pipeline
+        employee_numbers, X, score, served = await encode_rows(hr_data, model, plan, batcher)
+        risk_scores = await cached_scores(X, score, served)
+
+        if fmt != JSON:
+            table = risk_scores_table(employee_numbers, risk_scores)
+            return Response(content=write_table(table, fmt), media_type=fmt)
 
         return {
-            "risk_scores_df": risk_scores_df.to_dict("records"),
+            "risk_scores_df": [
+                {"EmployeeNumber": employee_number, "PredictedRisk": risk}
+                for employee_number, risk in zip(np.asarray(employee_numbers).tolist(), risk_scores.tolist())
+            ],
         }
+    except (HTTPException, RequestValidationError):
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
-class SurvivalCurvesRequest(BaseModel):
-    hr_data: Dict[str, Any]
 
-
-@app.post("/getSurvivalCurves")
-def get_surv_curves(request: SurvivalCurvesRequest = Body(...)):
+@app.post("/getSurvivalCurves", openapi_extra=request_body_docs(SurvivalCurvesRequest))
+async def get_surv_curves(request: Request):
     try:
-        # Convert input to DataFrame
-        hr_df = pd.DataFrame(request.hr_data)
-
-        # Validate
-        if len(hr_df) == 0:
-            raise HTTPException(status_code=400, detail="Empty DataFrame received")
-
-        survival_df = get_surv_curves_on_data(app.state.model, hr_df.set_index('EmployeeNumber'))
+        require_model()
+        options, hr_data, fmt = await read_request(request, SurvivalCurvesRequest)
+
+        model, plan, batcher = app.state.model, app.state.plan, app.state.batcher
+
+        # Curves from the model's baseline hazard and the (batched, cached) risk scores
+        employee_numbers, X, score, served = await encode_rows(hr_data, model, plan, batcher)
+        baseline = plan.baseline if batcher is not None else baseline_survival(model.named_steps['model'])
+        if baseline is None:
+            raise ValueError("Survival curves need a model fitted with loss='coxph'")
+        time_grid = survival_time_grid(baseline, max_time=options.max_time, n_points=options.n_points)
+        grid_key = f"curves:{options.max_time}:{options.n_points}".encode()
+        survival_probs = await cached_curves(X, score, served, baseline, time_grid, grid_key)
+
+        # Serializing n_employees x n_points values is CPU work too
+        if fmt != JSON:
+            def write_curves():
+                table = survival_curves_table(employee_numbers, time_grid, survival_probs, dtype=options.dtype)
+                return write_table(table, fmt)
+            return Response(content=await run_in_threadpool(write_curves), media_type=fmt)
 
         return {
-            "survival_df": survival_df.to_dict("records")
+            "survival_curves": await run_in_threadpool(
+                encode_survival_curves, employee_numbers, time_grid, survival_probs,
+                dtype=options.dtype, encoding=options.encoding)
         }
+    except (HTTPException, RequestValidationError):
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
 
+def score_chunk(hr_data, model, plan):
+    """
+    Score one chunk of HR data with the compiled plan, or the sklearn pipeline as a fallback.
+    Returns (employee_numbers, risk_scores).
+    """
+    if plan is not None:
+        return column_values(hr_data, 'EmployeeNumber'), plan.predict(hr_data)
+
+    risk_scores_df = predict_risk_on_data(model, hr_data_frame(hr_data).set_index('EmployeeNumber'))
+    return risk_scores_df.index.to_numpy(), risk_scores_df['PredictedRisk'].to_numpy()
+
+
+@app.post("/predictRiskBulk", openapi_extra={"requestBody": {"content": {
+    "multipart/form-data": {"schema": {"type": "object", "properties": {"file": {"type": "string", "format": "binary"}}}},
+    NDJSON: {"schema": {"type": "string"}},
+}}})
+async def predict_risk_bulk(request: Request):
+    """
+    Score a full HR extract in chunks of BULK_CHUNK_SIZE rows and stream the
+    risk scores back as they are ready (NDJSON, or CSV with `Accept: text/csv`).
+    Input is an uploaded CSV / Parquet `file` (multipart) or an NDJSON body.
+    Only one chunk is held in memory at a time.
+    """
+    require_model()
+    # Every chunk is scored by the model served when the request arrived
+    model, plan = app.state.model, app.state.plan
+    content_type = request.headers.get("content-type")
+    fmt = CSV if CSV in (request.headers.get("accept") or "") else NDJSON
+
+    if is_ndjson(content_type):
+        chunks = ndjson_chunks(await spool_body(request), params.BULK_CHUNK_SIZE)
+    elif (content_type or "").startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Expected a CSV or Parquet upload in the 'file' field")
+        chunks = upload_chunks(upload, params.BULK_CHUNK_SIZE)
+    else:
+        raise HTTPException(status_code=415, detail="Send a multipart 'file' upload or an application/x-ndjson body")
+
+    # Score the first chunk up front so bad input still gets a proper status code
+    try:
+        first_chunk = await chunks.__anext__()
+        first_scores = await run_in_threadpool(score_chunk, first_chunk, model, plan)
+    except StopAsyncIteration:
+        raise HTTPException(status_code=400, detail="Empty DataFrame received")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def stream():
+        yield encode_scores(*first_scores, fmt, header=True)
+        try:
+            async for chunk in chunks:
+                scores = await run_in_threadpool(score_chunk, chunk, model, plan)
+                yield encode_scores(*scores, fmt)
+        except Exception as e:
+            # Headers are already sent: report the failure in-band and stop
+            print(f"❌ Bulk scoring failed: {e}")
+            yield encode_error(str(e), fmt)
+
+    return StreamingResponse(stream(), media_type=fmt)
+
 # @app.get("/train_model")
 # def train_model():
 #     # 1. read the latest clean data from google cloud
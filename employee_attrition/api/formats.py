@@ -0,0 +1,124 @@
+import json
+from collections.abc import Mapping
+from io import BytesIO
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+JSON = "application/json"
+
+# Content types accepted for each binary format
+BINARY_CONTENT_TYPES = {
+    ARROW_STREAM: ARROW_STREAM,
+    "application/vnd.apache.arrow.file": ARROW_STREAM,
+    PARQUET: PARQUET,
+    "application/x-parquet": PARQUET,
+    "application/parquet": PARQUET,
+}
+
+
+def binary_format(content_type):
+    """
+    Return ARROW_STREAM or PARQUET for a binary content type, None otherwise
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return BINARY_CONTENT_TYPES.get(media_type)
+
+
+def response_format(accept, content_type):
+    """
+    Pick the response format: a binary type named in the Accept header,
+    otherwise the format the request was sent in.
+    """
+    for media_type in (accept or "").split(","):
+        fmt = binary_format(media_type)
+        if fmt is not None:
+            return fmt
+    return binary_format(content_type) or JSON
+
+
+def read_table(body: bytes, fmt) -> pa.Table:
+    """
+    Parse an Arrow IPC stream / file or a Parquet body into an Arrow table
+    """
+    try:
+        if fmt == PARQUET:
+            return pq.read_table(pa.BufferReader(body))
+        try:
+            return pa.ipc.open_stream(pa.BufferReader(body)).read_all()
+        except pa.ArrowInvalid:
+            return pa.ipc.open_file(pa.BufferReader(body)).read_all()
+    except pa.ArrowException as e:
+        raise ValueError(f"Could not read {fmt} body: {e}")
+
+
+def write_table(table: pa.Table, fmt) -> bytes:
+    """
+    Serialize an Arrow table as an Arrow IPC stream or Parquet
+    """
+    sink = BytesIO()
+    if fmt == PARQUET:
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
+
+
+class ArrowColumns(Mapping):
+    """
+    Columnar view of an Arrow table for the inference plan.
+
+    Columns are converted on first access only: numeric columns become NumPy
+    arrays (zero-copy for single-chunk columns without nulls), string columns
+    are dictionary-encoded into categoricals so each category is looked up once.
+    """
+
+    def __init__(self, table: pa.Table):
+        self.table = table
+        self._columns = {}
+
+    def __getitem__(self, name):
+        if name not in self._columns:
+            if name not in self.table.column_names:
+                raise KeyError(name)
+            column = self.table.column(name)
+            if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+                self._columns[name] = column.dictionary_encode().to_pandas()
+            elif pa.types.is_dictionary(column.type):
+                self._columns[name] = column.to_pandas()
+            else:
+                self._columns[name] = column.to_numpy()
+        return self._columns[name]
+
+    def __iter__(self):
+        return iter(self.table.column_names)
+
+    def __len__(self):
+        return self.table.num_columns
+
+
+def risk_scores_table(employee_numbers, risk_scores) -> pa.Table:
+    return pa.table({
+        "EmployeeNumber": pa.array(np.asarray(employee_numbers)),
+        "PredictedRisk": pa.array(risk_scores),
+    })
+
+
+def survival_curves_table(employee_numbers, time_grid, matrix, dtype="float64") -> pa.Table:
+    """
+    One row per employee with its survival probabilities as a fixed-size list,
+    the shared time axis is stored once in the schema metadata under b"Time".
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=dtype)
+    n_times = matrix.shape[1]
+    probabilities = pa.FixedSizeListArray.from_arrays(pa.array(matrix.reshape(-1)), n_times)
+    table = pa.table({
+        "EmployeeNumber": pa.array(np.asarray(employee_numbers)),
+        "SurvivalProbability": probabilities,
+    })
+    time_axis = json.dumps(np.asarray(time_grid, dtype=np.float64).tolist())
+    return table.replace_schema_metadata({"Time": time_axis})
@@ -0,0 +1,77 @@
+"""
+Closed-loop load test of the /predictRisk endpoint.
+
+Start the API with a given number of workers, then run for example:
+
+    API_WORKERS=4 make run_api_workers
+    python -m employee_attrition.api.loadtest --concurrency 64 --requests 5000
+
+and repeat with API_WORKERS=1, 2, 4, ... to see how throughput scales with cores.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+import numpy as np
+from colorama import Fore, Style
+
+from employee_attrition.ml_logic.data import get_data
+from employee_attrition.ml_logic.schema import FEATURE_COLUMNS
+
+
+async def run_load(url, payloads, n_requests, concurrency):
+    """
+    Send `n_requests` POSTs from `concurrency` concurrent clients, each sending
+    its next request as soon as the previous one returned.
+    Return (wall time in seconds, per-request latencies in seconds, n errors)
+    """
+    latencies, errors = [], 0
+    remaining = iter(range(n_requests))
+
+    async def client_loop(client):
+        nonlocal errors
+        for i in remaining:
+            start = time.perf_counter()
+            response = await client.post(url, json=payloads[i % len(payloads)])
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        wall_time = time.perf_counter() - start
+
+    return wall_time, np.array(latencies), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rows", type=int, default=1, help="employees per request")
+    args = parser.parse_args()
+
+    # Only the model features are read
+    hr_data = get_data(columns=FEATURE_COLUMNS).reset_index()
+    payloads = [
+        {"hr_data": hr_data.iloc[start:start + args.rows].to_dict(orient='list')}
+        for start in range(0, len(hr_data) - args.rows + 1, args.rows)
+    ]
+
+    # Warm up connections and the workers before measuring
+    asyncio.run(run_load(f"{args.url}/predictRisk", payloads, args.concurrency * 2, args.concurrency))
+    wall_time, latencies, errors = asyncio.run(
+        run_load(f"{args.url}/predictRisk", payloads, args.requests, args.concurrency))
+
+    p50, p99 = np.percentile(latencies * 1000, [50, 99])
+    print(Fore.BLUE + f"\n{args.requests} requests x {args.rows} rows, concurrency {args.concurrency}" + Style.RESET_ALL)
+    print(f"✅ {args.requests / wall_time:.0f} requests/s, {args.requests * args.rows / wall_time:.0f} rows/s")
+    print(f"✅ latency p50 {p50:.1f} ms, p99 {p99:.1f} ms, {errors} errors")
+
+
+if __name__ == "__main__":
+    main()
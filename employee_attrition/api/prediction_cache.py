@@ -0,0 +1,126 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Approximate memory held by one cached row besides its key and value: the
+# OrderedDict entry and object headers around them
+ENTRY_BYTES = 200
+
+
+class PredictionCache:
+    """
+    In-process LRU cache of risk scores and survival curves, keyed by the bytes of
+    the encoded feature row (plus the time grid for curves), bounded by memory.
+
+    Rows are keyed after the model's preprocessing encoded them, so two payloads that
+    differ only in column order or in int / float representation share an entry.
+    Entries belong to one model: `reset` flushes the cache when a new model
+    version is served, and results computed by the previous model are not stored.
+    Lookups and stores are thread-safe, so they can run in the threadpool.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.model = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def reset(self, model) -> None:
+        """
+        Flush the cache for a newly served `model` (the object that computes the results)
+        """
+        with self._lock:
+            self.model = model
+            self._entries.clear()
+            self._bytes = 0
+
+    @staticmethod
+    def row_keys(X, salt: bytes = b"") -> list:
+        """
+        Key of each row of an encoded feature matrix: its float32 bytes followed by
+        `salt` (what else the cached result depends on, e.g. the time grid of a curve),
+        built for all rows at once
+        """
+        # Adding 0.0 turns -0.0 into 0.0, the model does not tell them apart
+        X = np.asarray(X, dtype=np.float32) + np.float32(0.0)
+        rows = np.empty((len(X), X.shape[1] * 4 + len(salt)), dtype=np.uint8)
+        rows[:, :X.shape[1] * 4] = X.view(np.uint8)
+        rows[:, X.shape[1] * 4:] = np.frombuffer(salt, dtype=np.uint8)
+        # One opaque (void) item per row, converted to bytes in C
+        return rows.view(np.dtype((np.void, rows.shape[1]))).ravel().tolist()
+
+    def _lookup(self, keys, out):
+        """Fill the rows of `out` found in the cache, return the mask of the missing ones"""
+        missing = np.ones(len(keys), dtype=bool)
+        with self._lock:
+            for i, key in enumerate(keys):
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    out[i] = value
+                    missing[i] = False
+
+        n_hits = len(keys) - int(missing.sum())
+        self.hits += n_hits
+        self.misses += len(keys) - n_hits
+        return missing
+
+    def lookup(self, keys):
+        """
+        Return (scores, missing): the cached scores (NaN where missing)
+        and the boolean mask of the rows to score
+        """
+        scores = np.full(len(keys), np.nan)
+        return scores, self._lookup(keys, scores)
+
+    def lookup_curves(self, keys, n_times: int):
+        """
+        Return (curves, missing): the cached survival curves on `n_times` time points
+        (NaN rows where missing) and the boolean mask of the rows to compute
+        """
+        curves = np.full((len(keys), n_times), np.nan)
+        return curves, self._lookup(keys, curves)
+
+    def store(self, model, keys, values) -> None:
+        """
+        Cache the risk scores (or survival curves, one row per key) computed by
+        `model`, ignored if it is no longer served
+        """
+        values = np.asarray(values)
+        # Curves are copied row by row: an entry does not keep a whole batch alive
+        values = values.tolist() if values.ndim == 1 else [row.copy() for row in values]
+        with self._lock:
+            if model is not self.model or self.max_bytes < ENTRY_BYTES:
+                return
+            for key, value in zip(keys, values):
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._bytes -= _entry_bytes(key, previous)
+                self._entries[key] = value
+                self._bytes += _entry_bytes(key, value)
+            while self._bytes > self.max_bytes:
+                key, evicted = self._entries.popitem(last=False)
+                self._bytes -= _entry_bytes(key, evicted)
+                self.evictions += 1
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_bytes": self.max_bytes,
+            "approx_bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def _entry_bytes(key: bytes, value) -> int:
+    return ENTRY_BYTES + len(key) + getattr(value, 'nbytes', 0)
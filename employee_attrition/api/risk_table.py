@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+from employee_attrition.ml_logic.survival import survival_time_grid, survival_matrix
+from employee_attrition.ml_logic.explanation import BASE_VALUE_COLUMN
+
+
+class RiskTable:
+    """
+    Precomputed risk scores of the active employees (written by `train()`),
+    held as arrays sorted by EmployeeNumber for vectorized lookups and
+    ordered by risk for top-N queries, so neither touches the model.
+    Survival curves on a fixed time grid can be precomputed alongside, and the
+    risk factors computed by `train()` (a float32 matrix, one column per feature).
+    """
+
+    def __init__(self, employee_numbers, risk_scores, years_at_company=None, time_grid=None, survival=None,
+                 attributions=None, factor_names=None, base_values=None):
+        order = np.argsort(np.asarray(employee_numbers), kind='stable')
+        # int64: lookups of numbers outside the stored (compacted) integer type just miss
+        self.employee_numbers = np.asarray(employee_numbers)[order].astype(np.int64)
+        self.risk_scores = np.asarray(risk_scores, dtype=np.float64)[order]
+        self.years_at_company = None if years_at_company is None else np.asarray(years_at_company)[order]
+        self.time_grid = time_grid
+        self.survival = None if survival is None else np.asarray(survival)[order]
+        self.attributions = None if attributions is None else np.asarray(attributions, dtype=np.float32)[order]
+        self.factor_names = None if factor_names is None else np.asarray(factor_names, dtype=object)
+        self.base_values = None if base_values is None else np.asarray(base_values, dtype=np.float32)[order]
+
+        # Positions by decreasing risk: top-N is a slice
+        self.by_risk = np.argsort(-self.risk_scores, kind='stable')
+
+    @classmethod
+    def from_frame(cls, risk_score_df: pd.DataFrame, baseline=None, n_points: int = 0, max_time=10,
+                   explanation_df: pd.DataFrame = None):
+        """
+        Build the table from the risk score DataFrame indexed by EmployeeNumber.
+        With a coxph baseline and `n_points` > 0, also precompute the survival
+        curves on `n_points` evenly spaced times up to `max_time`.
+        `explanation_df` holds the risk factors (see `explain_risk`) by EmployeeNumber:
+        employees missing from it get none (NaN).
+        """
+        risk_scores = risk_score_df['PredictedRisk'].to_numpy(dtype=np.float64)
+        years_at_company = None
+        if 'YearsAtCompany' in risk_score_df.columns:
+            years_at_company = risk_score_df['YearsAtCompany'].to_numpy()
+
+        time_grid, survival = None, None
+        if baseline is not None and n_points > 0:
+            time_grid = survival_time_grid(baseline, max_time=max_time, n_points=n_points)
+            survival = survival_matrix(baseline, risk_scores, time_grid).astype(np.float32)
+
+        attributions, factor_names, base_values = None, None, None
+        if explanation_df is not None:
+            explanation_df = explanation_df.reindex(risk_score_df.index)
+            factors = explanation_df.drop(columns=BASE_VALUE_COLUMN)
+            attributions = factors.to_numpy(dtype=np.float32)
+            factor_names = factors.columns.tolist()
+            base_values = explanation_df[BASE_VALUE_COLUMN].to_numpy(dtype=np.float32)
+
+        return cls(risk_score_df.index.to_numpy(), risk_scores, years_at_company, time_grid, survival,
+                   attributions, factor_names, base_values)
+
+    def __len__(self):
+        return len(self.employee_numbers)
+
+    def positions(self, employee_numbers):
+        """
+        Return (positions, found): the rows of the requested employees
+        and a mask of the ones present in the table
+        """
+        employee_numbers = np.asarray(employee_numbers, dtype=self.employee_numbers.dtype)
+        positions = np.searchsorted(self.employee_numbers, employee_numbers)
+        positions = np.minimum(positions, max(len(self) - 1, 0))
+        found = (self.employee_numbers[positions] == employee_numbers) if len(self) else np.zeros(len(positions), bool)
+        return positions, found
+
+    def top(self, n: int) -> np.ndarray:
+        """Positions of the `n` employees with the highest risk, highest first"""
+        return self.by_risk[:n]
+
+    def records(self, positions) -> list:
+        records = [
+            {"EmployeeNumber": employee_number, "PredictedRisk": risk}
+            for employee_number, risk in zip(self.employee_numbers[positions].tolist(),
+                                             self.risk_scores[positions].tolist())
+        ]
+        if self.years_at_company is not None:
+            for record, years in zip(records, self.years_at_company[positions].tolist()):
+                record["YearsAtCompany"] = years
+        return records
+
+    def explanations(self, positions, n_factors=None) -> list:
+        """
+        Risk factors of the employees at `positions`: their attributions, largest
+        absolute contribution first (the `n_factors` largest if given), and the
+        BaseValue they add up from (in log-risk). None for employees without any.
+        """
+        attributions = self.attributions[positions]
+        order = np.argsort(-np.abs(attributions), axis=1, kind='stable')[:, :n_factors]
+        contributions = np.take_along_axis(attributions, order, axis=1)
+        explained = ~np.isnan(self.base_values[positions])
+        return [
+            {"EmployeeNumber": employee_number, "BaseValue": base_value,
+             "RiskFactors": [{"Feature": feature, "Contribution": contribution}
+                             for feature, contribution in zip(names, values)]}
+            if found else {"EmployeeNumber": employee_number, "BaseValue": None, "RiskFactors": None}
+            for employee_number, found, base_value, names, values in zip(
+                self.employee_numbers[positions].tolist(), explained.tolist(),
+                self.base_values[positions].tolist(), self.factor_names[order].tolist(), contributions.tolist())
+        ]
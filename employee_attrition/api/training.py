@@ -0,0 +1,147 @@
+import asyncio
+import fcntl
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _train_and_save():
+    """
+    Entry point of the training process: train() saves the model to the registry,
+    only the outcome goes back to the API process
+    """
+    from employee_attrition.interface.main import train
+    train(save=True)
+
+
+class TrainingJob:
+    """
+    Model training run as an explicit background job.
+
+    The fit runs in a separate process so the API keeps answering requests and
+    health probes meanwhile; `on_success` (a coroutine function) is awaited once
+    the new model is saved, typically to load it into the API.
+
+    With a `state_path`, API workers share one job: the worker starting it holds an
+    exclusive lock on `<state_path>.lock` until it ends (released by the system if
+    the worker dies), and the status is kept in `state_path` for every worker to
+    report. The other workers pick the new model up with their model watcher.
+    """
+
+    def __init__(self, state_path=None):
+        self.state_path = state_path
+        self.status = "idle"
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self._task = None
+        self._lock = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, on_success) -> None:
+        if self.running:
+            raise RuntimeError("A training job is already running")
+        if self.state_path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+            lock = open(f"{self.state_path}.lock", "w")
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock.close()
+                raise RuntimeError("A training job is already running in another worker")
+            self._lock = lock
+        self.status = "running"
+        self.started_at = time.time()
+        self.finished_at = None
+        self.error = None
+        self._save_state()
+        self._task = asyncio.create_task(self._run(on_success))
+
+    def _save_state(self) -> None:
+        if self.state_path is None:
+            return
+        # Atomic replace so the other workers never read a partial status
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.state_path)), suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._own_state(), f)
+        os.replace(tmp_path, self.state_path)
+
+    async def _run(self, on_success):
+        # Spawn rather than fork: the API process runs an event loop and threads
+        pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            await asyncio.get_running_loop().run_in_executor(pool, _train_and_save)
+            await on_success()
+            self.status = "succeeded"
+            print("✅ Training job succeeded")
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+            # shutdown() does not stop a running call: end the training process itself
+            for process in list((pool._processes or {}).values()):
+                process.terminate()
+            raise
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            print(f"❌ Training job failed: {e}")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._finish()
+
+    def _finish(self) -> None:
+        self.finished_at = time.time()
+        self._save_state()
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    async def cancel(self) -> None:
+        """
+        Stop a running job (on shutdown), the model it was fitting is not saved
+        """
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            if self.status == "running":
+                # Cancelled before `_run` started: nothing ran, release the job here
+                self.status = "cancelled"
+                self._finish()
+
+    def _own_state(self) -> dict:
+        return {
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+    def to_dict(self) -> dict:
+        """
+        Status of the last job, whichever worker ran it
+        """
+        if self.state_path is None or self.running:
+            return self._own_state()
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self._own_state()
+
+        if state["status"] == "running":
+            # Nobody holds the lock: the worker running the job died
+            with open(f"{self.state_path}.lock", "w") as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    state.update(status="failed", error="The worker running the job exited")
+                except BlockingIOError:
+                    pass
+        return state
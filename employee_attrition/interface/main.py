@@ -1,16 +1,84 @@
+import time
+
 import pandas as pd
 import numpy as np
 import os.path as Path
 
 from colorama import Fore, Style
 
-from employee_attrition.ml_logic.data import get_data, save_data, get_processed_data
-from employee_attrition.ml_logic.registry import load_model, save_model
-from employee_attrition.ml_logic.model import train_model
+from employee_attrition.ml_logic.data import get_data, iter_data, save_data, get_processed_data
+from employee_attrition.ml_logic.registry import load_model, save_model, load_model_with_version, get_model_version
+from employee_attrition.ml_logic.model import (
+    train_model, compare_learners, fit_pipeline, build_learner, concordance_index,
+    validation_mask, predict_risk,
+)
+from employee_attrition.ml_logic.selection import successive_halving
+from employee_attrition.ml_logic.evaluation import evaluate_model
+from employee_attrition.ml_logic.incremental import (
+    save_training_state, load_training_state, changed_rows, full_refit_reason, detect_drift, warm_start_pipeline,
+)
+from employee_attrition.ml_logic.survival import baseline_survival, survival_time_grid, survival_matrix
+from employee_attrition.ml_logic.schema import LOADED_COLUMNS, TARGET_COLUMNS
+from employee_attrition.ml_logic.scoring import score_chunks
+from employee_attrition.ml_logic.explanation import explain_risk
 from employee_attrition import params
 
 # Split into structured target for survival analysis and features
 from sksurv.util import Surv
+from sksurv.ensemble import ComponentwiseGradientBoostingSurvivalAnalysis
+
+
+def training_outputs(raw_data, pipeline):
+    """
+    Feature importances of a trained pipeline, risk scores of the active employees and
+    their per-employee risk factors (None if the model cannot be explained), saved next
+    to the model for further analysis, the API and the dashboard
+    """
+    # Extract feature importances from the model
+    model = pipeline.named_steps['model']
+    if isinstance(model, ComponentwiseGradientBoostingSurvivalAnalysis):
+        # Absolute coefficients, without the intercept
+        feature_importances = np.abs(model.coef_[1:])
+    else:
+        feature_importances = model.feature_importances_
+    preprocessor = pipeline.named_steps['preprocessor']
+    transformed_feature_names = preprocessor.get_feature_names_out()
+    # Sort and plot feature importance
+    feature_importance_df = pd.DataFrame({'Feature': transformed_feature_names, 'Importance': feature_importances})
+    feature_importance_df = feature_importance_df.sort_values(by='Importance', ascending=False)
+
+    # Employees who haven't quit (Attrition == 0), without the target: a single copy
+    active = (raw_data['Attrition'] == 0).to_numpy()
+    risk_score_df = raw_data.loc[active, raw_data.columns.difference(TARGET_COLUMNS, sort=False)]
+    # Attributions of each employee's risk, in batch: the API only looks them up
+    try:
+        start = time.perf_counter()
+        explanation_df = explain_risk(pipeline, risk_score_df)
+        print(f"✅ Risk factors of {len(explanation_df)} employees computed in {time.perf_counter() - start:.2f}s")
+    except TypeError as e:
+        print(f"⚠️ No risk factors saved: {e}")
+        explanation_df = None
+    # Add the predicted risk scores to the DataFrame
+    risk_score_df['PredictedRisk'] = predict_risk(pipeline, risk_score_df)
+    # Get back the YearsAtCompany for the employees who haven't quit
+    risk_score_df['YearsAtCompany'] = raw_data['YearsAtCompany'].to_numpy()[active]
+
+    # Sort by predicted risk (highest risk first)
+    risk_score_df.sort_values(by='PredictedRisk', ascending=False, inplace=True)
+
+    return feature_importance_df, risk_score_df, explanation_df
+
+
+def save_training(raw_data, pipeline, mode="full", incremental_runs=0):
+    """
+    Save a trained pipeline: the model to the registry, its feature importances, risk
+    scores and risk factors for further analysis and the dashboard, and the training state
+    `retrain` finds the next delta from
+    """
+    feature_importance_df, risk_score_df, explanation_df = training_outputs(raw_data, pipeline)
+    save_model(pipeline)
+    save_data(raw_data, feature_importance_df, risk_score_df, explanation_df)
+    save_training_state(raw_data, get_model_version(), mode=mode, incremental_runs=incremental_runs)
 
 
 def train(save=True):
@@ -27,88 +95,251 @@ def train(save=True):
     if raw_data is None:
         raise ValueError("Failed to load raw data. Please check the data source or `get_data()` function.")
 
-    # Split into structured target for survival analysis and features
-    X = raw_data.drop(columns=['Attrition', 'YearsAtCompany'])
+    # Structured target for survival analysis; the preprocessor only selects the
+    # feature columns, so the raw table is the feature frame (no copy without the target)
     y = Surv.from_arrays(event=raw_data["Attrition"] == 1, time=raw_data["YearsAtCompany"])
 
     print(Fore.BLUE + "\n Training the model.." + Style.RESET_ALL)
-    pipeline = train_model(X,y)
+    pipeline = train_model(raw_data, y)
 
-    # Extract feature importances from the model
-    feature_importances = pipeline.named_steps['model'].feature_importances_
-    preprocessor = pipeline.named_steps['preprocessor']
-    transformed_feature_names = preprocessor.get_feature_names_out()
-    # Sort and plot feature importance
-    feature_importance_df = pd.DataFrame({'Feature': transformed_feature_names, 'Importance': feature_importances})
-    feature_importance_df = feature_importance_df.sort_values(by='Importance', ascending=False)
+    # Save model and data
+    if save == True:
+        save_training(raw_data, pipeline)
+    return pipeline
 
-    # Filter df to include only employees who haven't quit (Attrition == 0)
-    active_df = raw_data[raw_data['Attrition'] == 0]
-    risk_score_df = active_df.drop(columns=['Attrition', 'YearsAtCompany'])
-    # Add the predicted risk scores to the DataFrame
-    risk_score_df['PredictedRisk'] = pipeline.predict(risk_score_df)
-    # Get back the YearsAtCompany for the employees who haven't quit
-    risk_score_df['YearsAtCompany'] = active_df['YearsAtCompany']
 
-    # Sort by predicted risk (highest risk first)
-    risk_score_df = risk_score_df.sort_values(by='PredictedRisk', ascending=False)
+def retrain_pipeline(raw_data):
+    """
+    Retrain the production model on `raw_data` without saving it.
+    Return (pipeline, mode, incremental_runs) where mode is:
+    - "incremental": RETRAIN_INCREMENTAL_STAGES boosting stages added to the production
+      model, fitted on the new or changed rows plus a replay sample of unchanged ones
+      (see `warm_start_pipeline`)
+    - "full": refitted like `train()`, on schedule, on a large delta or on drift
+    - "unchanged": no new or changed rows, the production model itself
+    The validation rows of `train_model` are never fitted on, in either mode.
+    """
+    pipeline, model_version = load_model_with_version()
+    state = load_training_state()
+    delta = changed_rows(raw_data, state) if state is not None else np.ones(len(raw_data), dtype=bool)
 
-    # Save model and data
-    if save == True:
-        save_model(pipeline)
-        save_data(raw_data, feature_importance_df, risk_score_df)
+    X = raw_data.drop(columns=['Attrition', 'YearsAtCompany'])
+    y = Surv.from_arrays(event=raw_data["Attrition"] == 1, time=raw_data["YearsAtCompany"])
+
+    reason = full_refit_reason(pipeline, model_version, state, int(delta.sum()), len(raw_data))
+    if reason is None and delta.any():
+        reason = detect_drift(pipeline.named_steps['preprocessor'], X[delta])
+        reason = reason and f"drift: {reason}"
+    if reason is not None:
+        print(Fore.BLUE + f"\nFull refit ({reason})" + Style.RESET_ALL)
+        return train_model(X, y), "full", 0
+
+    if not delta.any():
+        print("✅ No new or changed rows, the production model is kept")
+        return pipeline, "unchanged", state["incremental_runs"]
+
+    # Replay unchanged rows alongside the delta so the new stages see older risk sets too
+    trainable = ~validation_mask(X.index, random_state=params.TRAIN_RANDOM_STATE)
+    unchanged = np.flatnonzero(~delta & trainable)
+    n_replay = min(len(unchanged), int(round(params.RETRAIN_REPLAY_RATIO * delta.sum())))
+    replay = np.random.default_rng(params.TRAIN_RANDOM_STATE).choice(unchanged, size=n_replay, replace=False)
+    fit_rows = np.concatenate([np.flatnonzero(delta & trainable), replay])
+
+    print(Fore.BLUE + f"\nWarm-starting {params.RETRAIN_INCREMENTAL_STAGES} stages on {delta.sum()} new or changed "
+          f"rows + {n_replay} replayed rows.." + Style.RESET_ALL)
+    start = time.perf_counter()
+    # The baseline hazard is re-estimated on the training rows only, like the stages
+    pipeline = warm_start_pipeline(pipeline, X.iloc[fit_rows], y[fit_rows], X[trainable], y[trainable],
+                                   n_stages=params.RETRAIN_INCREMENTAL_STAGES)
+    c_index = concordance_index(y[~trainable], pipeline.predict(X[~trainable]))
+    print(f"✅ Model retrained in {time.perf_counter() - start:.2f}s "
+          f"({pipeline.named_steps['model'].n_estimators_} stages), "
+          f"Concordance Index on the validation rows: {c_index:.4f}")
+
+    return pipeline, "incremental", state["incremental_runs"] + 1
+
+
+def retrain(save=True):
+    """
+    Monthly retraining scaled to the delta (see `retrain_pipeline`):
+    - Get the raw data
+    - Warm-start the production model on the new or changed rows, or refit it when due
+    - Save the pipeline and data like `train()`
+    """
+    print(Fore.MAGENTA + "\n⭐️ Use case: retrain" + Style.RESET_ALL)
+
+    raw_data = get_data()
+    if raw_data is None:
+        raise ValueError("Failed to load raw data. Please check the data source or `get_data()` function.")
+
+    pipeline, mode, incremental_runs = retrain_pipeline(raw_data)
+    if save == True and mode != "unchanged":
+        save_training(raw_data, pipeline, mode, incremental_runs)
     return pipeline
 
 
+def compare_training(tolerance=0.01):
+    """
+    Fit the training options of `compare_learners` (learners, subsampling, early
+    stopping) on the raw data and report their wall time and C-index
+    """
+    print(Fore.MAGENTA + "\n⭐️ Use case: compare training options" + Style.RESET_ALL)
+
+    raw_data = get_data()
+    X = raw_data.drop(columns=['Attrition', 'YearsAtCompany'])
+    y = Surv.from_arrays(event=raw_data["Attrition"] == 1, time=raw_data["YearsAtCompany"])
+
+    report = compare_learners(X, y, tolerance=tolerance)
+    print(Fore.BLUE + f"\nTraining options (fastest within {tolerance} of the best C-index is selected):" + Style.RESET_ALL)
+    print(report.to_string(index=False))
+    return report
+
+
 def train_model_with_selection(save=False):
+    """
+    - Get the raw data
+    - Select the model hyperparameters by successive halving on the cross-validated C-index
+    - Refit the best candidate on all the data but the validation rows
+    - Save the pipeline and data like `train()`
+    """
+    print(Fore.MAGENTA + "\n⭐️ Use case: train with model selection" + Style.RESET_ALL)
+
+    raw_data = get_data()
+    if raw_data is None:
+        raise ValueError("Failed to load raw data. Please check the data source or `get_data()` function.")
 
-    pass
+    X = raw_data.drop(columns=['Attrition', 'YearsAtCompany'])
+    y = Surv.from_arrays(event=raw_data["Attrition"] == 1, time=raw_data["YearsAtCompany"])
+
+    # The validation rows of `train_model` are neither searched nor fitted on: evaluate()
+    # and train_flow compare models on them
+    trainable = ~validation_mask(X.index, random_state=params.TRAIN_RANDOM_STATE)
+    X, y = X[trainable], y[trainable]
+
+    best_params, cv_c_index, report = successive_halving(X, y)
+    print(f"✅ Best parameters {best_params} with CV Concordance Index: {cv_c_index:.4f}")
+
+    pipeline = fit_pipeline(X, y, build_learner("gbsa", **best_params))
+
+    if save == True:
+        save_training(raw_data, pipeline)
+    return {
+        "model": pipeline,
+        "params": best_params,
+        "score": cv_c_index,
+        "report": report,
+    }
+
+def validation_data(raw_data):
+    """
+    (X, y, y_train): the validation rows `train_model` holds out of `raw_data`,
+    and the target of the training rows (for the censoring distribution)
+    """
+    X = raw_data.drop(columns=['Attrition', 'YearsAtCompany'])
+    y = Surv.from_arrays(event=raw_data["Attrition"] == 1, time=raw_data["YearsAtCompany"])
+    validation = validation_mask(X.index, random_state=params.TRAIN_RANDOM_STATE)
+    return X[validation], y[validation], y[~validation]
+
+
+def evaluate(stage="Production", data=None):
+    """
+    Evaluate the model in `stage` (see `evaluate_model` for the metrics):
+    - on `data` (raw HR rows, e.g. a new period) when given
+    - otherwise on the validation split `train_model` holds out of the raw data
+    Results are cached per model version and data fingerprint, so evaluating
+    an unchanged model on unchanged data is immediate.
+    """
+    print(Fore.MAGENTA + "\n⭐️ Use case: evaluate" + Style.RESET_ALL)
+
+    pipeline, model_version = load_model_with_version(stage)
+    if pipeline is None:
+        raise ValueError("Failed to load model. Please check the model source or `load_model()` function.")
+
+    raw_data = get_data() if data is None else data
+    if raw_data is None:
+        raise ValueError("Failed to load raw data. Please check the data source or `get_data()` function.")
+
+    if data is None:
+        X, y, y_train = validation_data(raw_data)
+    else:
+        X = raw_data.drop(columns=['Attrition', 'YearsAtCompany'])
+        y = Surv.from_arrays(event=raw_data["Attrition"] == 1, time=raw_data["YearsAtCompany"])
+        y_train = None
+
+    start = time.perf_counter()
+    metrics = evaluate_model(pipeline, X, y, y_train=y_train, model_version=model_version)
+
+    summary = {name: metrics[name] for name in
+               ["c_index", "mean_auc", "integrated_brier_score", "calibration_error"] if name in metrics}
+    print(f"✅ Model {model_version} evaluated on {metrics['n_rows']} rows in {time.perf_counter() - start:.2f}s "
+          f"({metrics['n_bootstrap']} bootstrap resamples):")
+    for name, value in summary.items():
+        interval = f" (95% CI {value['ci_low']:.4f}-{value['ci_high']:.4f})" if "ci_low" in value else ""
+        print(f"   {name}: {value['estimate']:.4f}{interval}")
+    return metrics
+
+def score(output_path=None, top_k=None):
+    """
+    Batch scoring of the active workforce, separate from training:
+    - Stream the active employees from the raw data, SCORING_CHUNK_ROWS rows at a time
+    - Score the chunks with the production model on SCORING_N_JOBS processes
+    - Write the scores to `output_path` (SCORING_OUTPUT_PATH) as Parquet, chunk by chunk
+    - Return the `top_k` (SCORING_TOP_K) highest-risk employees, also written next to it
+    """
+    print(Fore.MAGENTA + "\n⭐️ Use case: score" + Style.RESET_ALL)
+
+    output_path = output_path or params.SCORING_OUTPUT_PATH
+    top_k = params.SCORING_TOP_K if top_k is None else top_k
+    pipeline, model_version = load_model_with_version()
+    if pipeline is None:
+        raise ValueError("No model to score with. Please train one first.")
+
+    # Active employees only, filtered by the reader; the target is not read
+    chunks = iter_data(params.SCORING_CHUNK_ROWS,
+                       columns=[column for column in LOADED_COLUMNS if column != 'Attrition'],
+                       filters=[('Attrition', '==', 'No')])
+
+    start = time.perf_counter()
+    top = score_chunks(pipeline, chunks, output_path, top_k=top_k, n_jobs=params.SCORING_N_JOBS)
+    top_path = Path.splitext(output_path)[0] + "_top.parquet"
+    top.to_parquet(top_path)
+    print(f"✅ Scored with model {model_version} in {time.perf_counter() - start:.2f}s, "
+          f"top {len(top)} risks written to {top_path}")
+    return top
 
-def evaluate():
-    pass
 
 def predict_risk_on_data(pipeline, hr_data):
     """
     Predict risk scores for the given HR data using the trained pipeline.
     """
-    # Preprocess the input data
+    # Drop the target columns if present, the pipeline preprocesses the rest
     hr_data = hr_data.drop(columns=['Attrition', 'YearsAtCompany'], errors='ignore')
-    hr_data_proc = pipeline.named_steps['preprocessor'].transform(hr_data)
-    hr_data_proc = pipeline.named_steps['to_dataframe'].transform(hr_data_proc)
 
     # Predict risk scores
-    risk_scores = pipeline.predict(hr_data_proc)
+    risk_scores = pipeline.predict(hr_data)
 
-    return risk_scores
+    return pd.DataFrame({'PredictedRisk': risk_scores}, index=hr_data.index)
 
-def get_surv_curves_on_data(pipeline, hr_data, num_samples=None, max_time=10):
+def get_surv_curves_on_data(pipeline, hr_data, num_samples=None, max_time=10, n_points=None):
+    """
+    Survival curves of the first `num_samples` employees on a shared time grid
+    (see `survival_time_grid` for `max_time` and `n_points`).
+    Returns a wide DataFrame: one row per EmployeeNumber, one column per time point.
+    """
     if num_samples is None or num_samples > len(hr_data):
         num_samples = len(hr_data)
     top_n_high_risk = hr_data.head(num_samples) # type: ignore
+    top_n_high_risk = top_n_high_risk.drop(columns=['Attrition', 'YearsAtCompany'], errors='ignore')
+
+    baseline = baseline_survival(pipeline.named_steps['model'])
+    risk_scores = pipeline.predict(top_n_high_risk)
+
+    # Evaluate all curves at once instead of one StepFunction per employee
+    time_grid = survival_time_grid(baseline, max_time=max_time, n_points=n_points)
+    survival_probs = survival_matrix(baseline, risk_scores, time_grid)
 
-    # Preprocess the top high-risk employees' data
-    top_n_high_risk_proc = pipeline.named_steps['preprocessor'].transform(top_n_high_risk)
-    top_n_high_risk_proc = pipeline.named_steps['to_dataframe'].transform(top_n_high_risk_proc)
-    survival_funcs = pipeline.named_steps['model'].predict_survival_function(top_n_high_risk_proc)
-
-    # Create a DataFrame to store survival probabilities for the top n high-risk employees
-    survival_data = []
-    # Extract time points and survival probabilities from the survival functions (StepFunction)
-    for i, employee_id in enumerate(top_n_high_risk.index):
-        step_function = survival_funcs[i]  # Get the StepFunction for the current employee
-        time_points = step_function.x  # Time points
-        survival_prob = step_function.y  # Survival probabilities
-
-        # Add the survival curve to the DataFrame
-        for time, prob in zip(time_points, survival_prob):
-            survival_data.append({
-                'EmployeeNumber': employee_id,
-                'Time': time,
-                'SurvivalProbability': prob
-            })
-
-    # Convert the survival data to a DataFrame
-    survival_df = pd.DataFrame(survival_data)
+    survival_df = pd.DataFrame(survival_probs, index=top_n_high_risk.index, columns=time_grid)
+    survival_df.columns.name = 'Time'
     return survival_df
 
 # def predict_curves(num_samples=10, max_time=10):
@@ -1,26 +1,57 @@
 import os
 
 import requests
-from datetime import datetime
+from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 from prefect import task, flow
 
-from employee_attrition.interface.main import evaluate, train
-from employee_attrition.ml_logic.registry import mlflow_transition_model
+from employee_attrition.interface.main import retrain_pipeline, save_training, validation_data
+from employee_attrition.ml_logic.data import get_data
+from employee_attrition.ml_logic.evaluation import evaluate_model
+from employee_attrition.ml_logic.preprocessing import data_fingerprint
+from employee_attrition.ml_logic.registry import get_model_version, load_model_with_version, mlflow_transition_model
 from employee_attrition.params import *
 
 
-@task
-def evaluate_production_model():
-    return evaluate()
-
-@task
-def re_train():
-    return train()
+def fingerprint_cache_key(context, parameters):
+    """
+    Cache tasks by the raw data fingerprint and the production model version they start
+    from: re-running the flow on unchanged data reuses the results instead of recomputing
+    """
+    return f"{context.task.name}-{parameters['data_fingerprint']}-{parameters['model_version']}"
+
+
+@task(retries=2, retry_delay_seconds=10, cache_key_fn=fingerprint_cache_key, cache_expiration=timedelta(days=31))
+def evaluate_production_model(raw_data, data_fingerprint: str, model_version: str):
+    # The result is cached under `model_version`: fail (and retry) rather than cache
+    # the metrics of a model promoted since the flow read the version
+    pipeline, loaded_version = load_model_with_version()
+    if loaded_version != model_version:
+        raise RuntimeError(f"Production model changed from {model_version} to {loaded_version} during the flow")
+    X, y, y_train = validation_data(raw_data)
+    return evaluate_model(pipeline, X, y, y_train=y_train, model_version=model_version)
+
+@task(retries=2, retry_delay_seconds=10, cache_key_fn=fingerprint_cache_key, cache_expiration=timedelta(days=31))
+def re_train(raw_data, data_fingerprint: str, model_version: str):
+    # Warm-starts the production model on the month's delta, full refit when due;
+    # the candidate is evaluated in the same branch, on the same validation rows
+    pipeline, mode, incremental_runs = retrain_pipeline(raw_data)
+    X, y, y_train = validation_data(raw_data)
+    metrics = evaluate_model(pipeline, X, y, y_train=y_train)
+    return pipeline, mode, incremental_runs, metrics
+
+@task(retries=2, retry_delay_seconds=10)
+def promote_model(raw_data, pipeline, mode: str, incremental_runs: int):
+    save_training(raw_data, pipeline, mode, incremental_runs)
+    if MODEL_TARGET == "mlflow":
+        # save_model registered the candidate without a stage
+        mlflow_transition_model(current_stage="None", new_stage="Production")
 
 @task
-def transition_model(current_stage: str, new_stage: str):
-    return mlflow_transition_model(current_stage=current_stage, new_stage=new_stage)
+def notify(old_c_index, new_c_index):
+    if max(old_c_index or 0, new_c_index) < PROMOTION_MIN_C_INDEX:
+        print(f"⚠️ Neither model reaches a Concordance Index of {PROMOTION_MIN_C_INDEX}: "
+              f"production {old_c_index}, retrained {new_c_index}")
 
 
 
@@ -28,33 +59,43 @@ def transition_model(current_stage: str, new_stage: str):
 @flow(name=PREFECT_FLOW_NAME)
 def train_flow():
     """
-    Build the Prefect workflow for the employee_attrition package. It should:
-        - preprocess new data from the following month
-        - compute old concordance index by evaluating the current production model in this new month period
-          for the employees who left the company
-        - compute new concordance index by re-training with the new data, then evaluating
-        - if the new one is better than the old one, replace the current production model with the new one
-        - if neither model is good enough, send a notification!
+    Monthly lifecycle of the employee_attrition model:
+        - evaluate the current production model on the validation rows of the latest data
+        - concurrently, retrain it on the new data (incremental or full, see `retrain_pipeline`)
+          and evaluate the candidate on the same rows
+        - promote the candidate if its Concordance Index beats production by PROMOTION_MIN_GAIN
+        - notify if neither model reaches PROMOTION_MIN_C_INDEX
+    Tasks are cached by data fingerprint and model version and retried on failure.
     """
-    pass
-    # min_date = EVALUATION_START_DATE
-    # max_date = str(datetime.strptime(min_date, "%Y-%m-%d") + relativedelta(months=1)).split()[0]
-
-    # preprocessed = preprocess_new_data.submit(min_date=min_date, max_date=max_date)
-
-    # old_mae = evaluate_production_model.submit(min_date=min_date, max_date=max_date, wait_for=[preprocessed])
-    # new_mae = re_train.submit(min_date=min_date, max_date=max_date, split_ratio = 0.2, wait_for=[preprocessed])
-
-    # old_mae = old_mae.result()
-    # new_mae = new_mae.result()
-
-    # if new_mae < old_mae:
-    #     print(f"🚀 New model replacing old in production with MAE: {new_mae} the Old MAE was: {old_mae}")
-    #     transition_model.submit(current_stage="Staging", new_stage="Production")
-    # else:
-    #     print(f"🚀 Old model kept in place with MAE: {old_mae}. The new MAE was: {new_mae}")
-
-    # notify.submit(old_mae, new_mae)
+    raw_data = get_data()
+    if raw_data is None:
+        raise ValueError("Failed to load raw data. Please check the data source or `get_data()` function.")
+
+    fingerprint = data_fingerprint(raw_data)
+    # Metadata only: the tasks load the model if their cache misses
+    model_version = get_model_version()
+
+    # Both branches run at once: the cycle takes as long as the retraining branch
+    retrained = re_train.submit(raw_data, fingerprint, model_version)
+    old_metrics = None
+    if model_version is not None:
+        old_metrics = evaluate_production_model.submit(raw_data, fingerprint, model_version).result()
+    pipeline, mode, incremental_runs, new_metrics = retrained.result()
+
+    old_c_index = old_metrics["c_index"]["estimate"] if old_metrics is not None else None
+    new_c_index = new_metrics["c_index"]["estimate"]
+
+    if mode == "unchanged":
+        print(f"🚀 No new data, the production model is kept with Concordance Index: {old_c_index}")
+    elif old_c_index is None or new_c_index >= old_c_index + PROMOTION_MIN_GAIN:
+        print(f"🚀 New model ({mode} retrain) replacing old in production with Concordance Index: {new_c_index} "
+              f"the Old Concordance Index was: {old_c_index}")
+        promote_model.submit(raw_data, pipeline, mode, incremental_runs).result()
+    else:
+        print(f"🚀 Old model kept in place with Concordance Index: {old_c_index}. "
+              f"The new Concordance Index was: {new_c_index}")
+
+    notify.submit(old_c_index, new_c_index)
 
 if __name__ == "__main__":
     train_flow()
@@ -0,0 +1,127 @@
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+class ArtifactCache:
+    """
+    Local on-disk cache of model artifacts, content-addressed and LRU-bounded.
+
+    Objects are stored once under `objects/<sha256>`; `index.json` maps each
+    (source, version) seen in a registry backend to the object holding its bytes,
+    so an unchanged version is served from disk without downloading it again.
+    The least recently used objects are evicted once the cache exceeds `max_bytes`.
+
+    Processes sharing the cache serialize their index updates on `index.lock`, and
+    artifacts are handed out as open files: an object evicted by another process
+    stays readable through them.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.json")
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        """Hold the cache's exclusive lock: one read-modify-write of the index at a time"""
+        with open(os.path.join(self.root, "index.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"versions": {}, "objects": {}}
+
+    def _write_index(self, index: dict) -> None:
+        # Atomic replace so concurrent readers never see a partial index
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def open(self, source: str, version: str):
+        """
+        Return the cached artifact for (source, version) opened for binary reading,
+        or None
+        """
+        with self._locked():
+            index = self._read_index()
+            digest = index["versions"].get(f"{source}@{version}")
+            if digest is None:
+                return None
+
+            try:
+                f = open(os.path.join(self.objects_dir, digest), "rb")
+            except FileNotFoundError:
+                return None
+
+            index["objects"][digest]["last_used"] = time.time()
+            self._write_index(index)
+            return f
+
+    def put(self, source: str, version: str, data: bytes) -> str:
+        """
+        Store the artifact bytes for (source, version) and return their local path
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return self.put_file(source, version, tmp_path)
+
+    def put_file(self, source: str, version: str, file_path: str) -> str:
+        """
+        Same as `put` for an artifact already written to `file_path` (moved into the
+        cache, on the same filesystem), so large artifacts are never held in memory
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        digest = digest.hexdigest()
+        path = os.path.join(self.objects_dir, digest)
+        size = os.path.getsize(file_path)
+
+        # Identical content is stored once, whichever version it came from; moved in
+        # under the lock so an eviction cannot remove it before it is indexed
+        with self._locked():
+            if os.path.exists(path):
+                os.remove(file_path)
+            else:
+                os.replace(file_path, path)
+
+            index = self._read_index()
+            index["versions"][f"{source}@{version}"] = digest
+            index["objects"][digest] = {"size": size, "last_used": time.time()}
+            self._evict(index, keep=digest)
+            self._write_index(index)
+        return path
+
+    def _evict(self, index: dict, keep: str) -> None:
+        """
+        Drop least recently used objects until the cache fits in max_bytes
+        (called with the lock held)
+        """
+        objects = index["objects"]
+        total = sum(entry["size"] for entry in objects.values())
+        for digest in sorted(objects, key=lambda d: objects[d]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            total -= objects.pop(digest)["size"]
+            try:
+                os.remove(os.path.join(self.objects_dir, digest))
+            except FileNotFoundError:
+                pass
+
+        index["versions"] = {key: digest for key, digest in index["versions"].items() if digest in objects}
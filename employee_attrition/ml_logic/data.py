@@ -1,19 +1,170 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as pa_dataset
+import pyarrow.parquet as pq
 import os.path as Path
 from colorama import Fore, Style
 from employee_attrition import params
+from employee_attrition.ml_logic.schema import (
+    LOADED_COLUMNS, SCHEMA_VERSION, apply_schema, check_filters, filter_mask, iter_employee_csv, read_employee_csv,
+)
+from employee_attrition.ml_logic.object_store import (
+    columnar_name, delete_object, download_frame, get_bucket, upload_frames,
+)
+from employee_attrition.ml_logic.warehouse import get_warehouse, load_table, query_table
 from io import BytesIO
 
 from google.cloud import bigquery
-from google.cloud import storage
 
 
 
-def get_data():
+# Parquet schema metadata key holding the CSV the cache was built from
+_CACHE_SOURCE_KEY = b"employee_attrition.source"
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    String columns as categoricals, integer columns in the smallest integer type
+    holding their values (ordinal fields fit in int8); floats are left as they are
+    """
+    for column in df.columns:
+        if df[column].dtype == object or isinstance(df[column].dtype, pd.StringDtype):
+            df[column] = df[column].astype('category')
+        elif pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_columnar_cache(chunks, cache_path: str, source: dict) -> None:
+    """
+    Write the Parquet copy from `chunks` (DataFrames or Arrow record batches of one
+    schema), one at a time, then swap it in
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=Path.dirname(cache_path), suffix=".parquet")
+    os.close(fd)
+    writer = None
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, pd.DataFrame):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+            else:
+                table = pa.Table.from_batches([chunk])
+            if writer is None:
+                metadata = dict(table.schema.metadata or {})
+                metadata[_CACHE_SOURCE_KEY] = json.dumps(source).encode()
+                writer = pq.ParquetWriter(tmp_path, table.schema.with_metadata(metadata))
+            # Row groups small enough for filtered reads to skip some of them
+            writer.write_table(table, row_group_size=100_000)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        os.remove(tmp_path)
+        raise
+    if writer is None:
+        os.remove(tmp_path)
+        return
+    writer.close()
+    os.replace(tmp_path, cache_path)
+
+
+def _fresh_cache_source(path: str, cache_path: str, stat, parse_version="") -> dict:
+    """
+    Source recorded in the Parquet copy of `path` if the copy is up to date, else None.
+    Same size and mtime is trusted, otherwise the content hash decides: the copy of a
+    touched but unmodified CSV is only re-stamped with its new mtime.
+    """
+    if not Path.exists(cache_path):
+        return None
+    cached = json.loads((pq.read_schema(cache_path).metadata or {}).get(_CACHE_SOURCE_KEY, b"{}"))
+    if cached.get("parse_version", "") != parse_version:
+        return None
+    if (cached.get("mtime_ns"), cached.get("size")) == (stat.st_mtime_ns, stat.st_size):
+        return cached
+    if cached.get("size") == stat.st_size and cached.get("sha256") == _file_sha256(path):
+        source = dict(cached, mtime_ns=stat.st_mtime_ns)
+        _write_columnar_cache(pq.ParquetFile(cache_path).iter_batches(batch_size=100_000), cache_path, source)
+        return source
+    return None
+
+
+def read_csv_cached(path: str, index_col=None, columns=None, parse=None, parse_version="", filters=None) -> pd.DataFrame:
+    """
+    Read a local CSV through its typed Parquet copy (`<name>.parquet` next to it),
+    with the dtypes of `compact_dtypes`. The copy is rebuilt when the CSV changed:
+    same size and mtime is trusted, otherwise the content hash decides.
+    `columns` reads only those of the listed columns the file has (index column included).
+    `filters` keeps only the rows matching them (see `schema.filter_mask`): pushed down
+    into the Parquet reader, which skips row groups and never converts the other rows.
+    `parse` (path, columns, filters -> typed DataFrame) replaces the generic parsing, the
+    copy is also rebuilt when its `parse_version` changes.
+    """
+    if not params.COLUMNAR_CACHE:
+        if parse is not None:
+            df = parse(path, columns=columns, filters=filters)
+            return df if index_col is None else df.set_index(index_col)
+        usecols = None if columns is None else (lambda column: column in columns)
+        df = pd.read_csv(path, index_col=index_col, usecols=usecols)
+        return df[filter_mask(df, filters)] if filters else df
+
+    cache_path = Path.splitext(path)[0] + ".parquet"
+    stat = os.stat(path)
+
+    if _fresh_cache_source(path, cache_path, stat, parse_version) is None:
+        # The copy holds the whole file, whatever this read projects or filters
+        df = parse(path) if parse is not None else compact_dtypes(pd.read_csv(path))
+        try:
+            _write_columnar_cache([df], cache_path, {
+                "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": _file_sha256(path),
+                "parse_version": parse_version,
+            })
+            print(f"✅ Columnar cache of {path} rebuilt")
+        except OSError as e:
+            print(f"⚠️ Columnar cache of {path} not written: {e}")
+    else:
+        names = pq.read_schema(cache_path).names
+        df = pd.read_parquet(cache_path, columns=None if columns is None else [c for c in names if c in columns],
+                             filters=filters or None)
+        filters = None
+
+    if filters:
+        df = df[filter_mask(df, filters)]
+    if columns is not None:
+        df = df[[column for column in df.columns if column in columns]]
+    if index_col is not None:
+        df = df.set_index(index_col)
+    return df
+
+
+def get_data(columns=None, filters=None):
     '''
-    Get the raw data from GCS or local and return cleaned data
+    Get the raw data from GCS, BigQuery or local and return cleaned data.
+
+    Only `columns` (default: all but the constant ones) and the rows matching
+    `filters` are read, both pushed down into the reader: the Parquet copy of a
+    local CSV, the chunked CSV parser, or the warehouse query. Filters are
+    (column, operator, value) tuples on the raw values, all of which must hold, e.g.
+    [('Attrition', '==', 'No'), ('Department', 'in', ['Sales']), ('YearsAtCompany', '<=', 2)]
     '''
+    check_filters(filters)
     df_raw = pd.DataFrame()
+    # File order, EmployeeNumber always read (it becomes the index)
+    columns = [column for column in LOADED_COLUMNS if columns is None or column in columns or column == 'EmployeeNumber']
 
     # Get Data from Google Cloud Storage
     if params.DATA_SOURCE == 'gcs':
@@ -26,19 +177,28 @@ def get_data():
         gsfile_path = f'gs://{bucket_name}/{params.RAW_DATA}'
 
         try:
-            df_raw = pd.read_csv(gsfile_path)
+            df_raw = read_employee_csv(gsfile_path, columns=columns, filters=filters)
 
             print("✅ Latest 2 files loaded from GCS")
         except Exception as e:
             print(f"Error in reading files from GCS, {e}")
 
+    elif params.DATA_SOURCE == 'bq':
+        print(Fore.BLUE + "\nLoad data from BigQuery..." + Style.RESET_ALL)
+
+        # Table named after the data file, as written by `load_data_to_bq`: hr.csv -> hr
+        table = Path.splitext(params.RAW_DATA)[0]
+        df_raw = query_table(get_warehouse(params.GCP_PROJECT, params.BQ_DATASET), table, columns, filters)
+        apply_schema(df_raw, columns)
+
     elif params.DATA_SOURCE == 'local':
         print(Fore.BLUE + "\nLoad data from local CSV..." + Style.RESET_ALL)
 
         # Get Local Data
         if params.RAW_DATA is None or params.LOCAL_CACHE_DIR is None:
             raise ValueError("LOCAL_CACHE_DIR/RAW_DATA parameter is not set in params.")
-        df_raw = pd.read_csv(Path.join(params.LOCAL_CACHE_DIR,params.RAW_DATA))
+        df_raw = read_csv_cached(Path.join(params.LOCAL_CACHE_DIR,params.RAW_DATA), columns=columns, filters=filters,
+                                 parse=read_employee_csv, parse_version=SCHEMA_VERSION)
 
     else:
         print(Fore.RED + "\nDATA_TARGET not set, exiting" + Style.RESET_ALL)
@@ -49,15 +209,75 @@ def get_data():
         print(Fore.RED + "\nData is empty!" + Style.RESET_ALL)
         return None
 
+    return _clean_raw_data(df_raw)
+
+
+def _clean_raw_data(df_raw: pd.DataFrame) -> pd.DataFrame:
     # Set EmployeeNumber as the index
     df_raw.set_index("EmployeeNumber", inplace=True)
-    # Drop irrelevant columns
-    df_raw.drop(columns=["EmployeeCount","StandardHours", "Over18"], inplace=True)
-    # Create boolean target
-    df_raw['Attrition'] = df_raw['Attrition'].map({'Yes': 1, 'No': 0})
+    # Create boolean target (the schema guarantees Yes / No values)
+    if 'Attrition' in df_raw.columns:
+        df_raw['Attrition'] = (df_raw['Attrition'] == 'Yes').astype(np.int8)
 
     return df_raw
 
+
+def _refresh_employee_cache(path: str, cache_path: str) -> bool:
+    """
+    Rebuild the Parquet copy of the employee CSV `path` if it is not up to date, like
+    `read_csv_cached` does, but streaming the CSV into it: the table is never held whole.
+    Return whether the copy is up to date.
+    """
+    stat = os.stat(path)
+    if _fresh_cache_source(path, cache_path, stat, SCHEMA_VERSION) is not None:
+        return True
+    try:
+        _write_columnar_cache(iter_employee_csv(path), cache_path, {
+            "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": _file_sha256(path),
+            "parse_version": SCHEMA_VERSION,
+        })
+        print(f"✅ Columnar cache of {path} rebuilt")
+        return Path.exists(cache_path)
+    except OSError as e:
+        print(f"⚠️ Columnar cache of {path} not written: {e}")
+        return False
+
+
+def iter_data(chunk_rows=100_000, columns=None, filters=None):
+    '''
+    Stream the raw data like `get_data(columns, filters)`, in cleaned chunks of at
+    most `chunk_rows` rows: only one chunk of the table is materialized at a time.
+    Local data is streamed from its Parquet copy, rebuilt chunk by chunk first if the
+    CSV changed.
+    '''
+    check_filters(filters)
+    columns = [column for column in LOADED_COLUMNS if columns is None or column in columns or column == 'EmployeeNumber']
+
+    if params.DATA_SOURCE == 'gcs':
+        chunks = iter_employee_csv(f'gs://{params.BUCKET_NAME}/{params.RAW_DATA}', chunk_rows, columns, filters)
+    elif params.DATA_SOURCE == 'bq':
+        warehouse = get_warehouse(params.GCP_PROJECT, params.BQ_DATASET)
+        table = Path.splitext(params.RAW_DATA)[0]
+        chunks = (apply_schema(chunk, columns) for chunk in warehouse.query_chunks(table, columns, filters, chunk_rows))
+    elif params.DATA_SOURCE == 'local':
+        if params.RAW_DATA is None or params.LOCAL_CACHE_DIR is None:
+            raise ValueError("LOCAL_CACHE_DIR/RAW_DATA parameter is not set in params.")
+        path = Path.join(params.LOCAL_CACHE_DIR, params.RAW_DATA)
+        cache_path = Path.splitext(path)[0] + ".parquet"
+        if params.COLUMNAR_CACHE and _refresh_employee_cache(path, cache_path):
+            batches = pa_dataset.dataset(cache_path, format="parquet").to_batches(
+                columns=columns, filter=pq.filters_to_expression(filters) if filters else None, batch_size=chunk_rows)
+            # Back to the declared categories: row groups only hold the values they use
+            chunks = (apply_schema(batch.to_pandas(), columns) for batch in batches if batch.num_rows)
+        else:
+            chunks = iter_employee_csv(path, chunk_rows, columns, filters)
+    else:
+        raise ValueError(f"Unknown DATA_SOURCE '{params.DATA_SOURCE}'")
+
+    for chunk in chunks:
+        if len(chunk):
+            yield _clean_raw_data(chunk)
+
 def load_data_to_bq(
         data: pd.DataFrame,
         gcp_project:str,
@@ -69,82 +289,116 @@ def load_data_to_bq(
     """
     - Save the DataFrame to BigQuery
     - Empty the table beforehand if `truncate` is True, append otherwise
+    Bulk-loaded with a Parquet load job written BQ_LOAD_CHUNK_ROWS rows at a time
+    (see `warehouse.load_table`), into the SQLite stand-in when BQ_LOCAL_ROOT is set
     """
-    pass
+    start = time.perf_counter()
+    n_rows = load_table(get_warehouse(gcp_project, bq_dataset), data, table, truncate)
+    print(f"✅ {n_rows} rows {'written' if truncate else 'appended'} to {bq_dataset}.{table} "
+          f"in {time.perf_counter() - start:.2f}s")
 
 def save_data(
         cleaned_df: pd.DataFrame,
         feature_importance_df: pd.DataFrame,
-        risk_score_df: pd.DataFrame
+        risk_score_df: pd.DataFrame,
+        explanation_df: pd.DataFrame = None
     ):
 
     '''
-    Save the processed version of data in DATA_TARGET
+    Save the processed version of data in DATA_TARGET, with the per-employee
+    risk factors (EXPLANATION_DATA) when given. Without them, the previous model's
+    risk factors are deleted: they must not be served next to the new risk scores.
     '''
     if params.DATA_TARGET == 'local':
         print(Fore.BLUE + "\n Saving processed data locally.." + Style.RESET_ALL)
-        cleaned_df.to_csv(f'raw_data/{params.CLEANED_DATA}', index=True)
-        feature_importance_df.to_csv(f'raw_data/{params.FEATURE_IMPORTANCE_DATA}')
-        risk_score_df.to_csv(f'raw_data/{params.RISK_SCORE_DATA}', index=True)
+        if params.LOCAL_CACHE_DIR is None:
+            raise ValueError("LOCAL_CACHE_DIR parameter is not set in params.")
+        # Where get_processed_data, get_risk_scores and get_explanations read them
+        cleaned_df.to_csv(Path.join(params.LOCAL_CACHE_DIR, params.CLEANED_DATA), index=True)
+        feature_importance_df.to_csv(Path.join(params.LOCAL_CACHE_DIR, params.FEATURE_IMPORTANCE_DATA))
+        risk_score_df.to_csv(Path.join(params.LOCAL_CACHE_DIR, params.RISK_SCORE_DATA), index=True)
+        explanation_path = Path.join(params.LOCAL_CACHE_DIR, params.EXPLANATION_DATA)
+        if explanation_df is not None:
+            explanation_df.to_csv(explanation_path, index=True)
+        else:
+            # The CSV and its columnar cache
+            for path in (explanation_path, Path.splitext(explanation_path)[0] + ".parquet"):
+                if Path.exists(path):
+                    os.remove(path)
     elif params.DATA_TARGET == 'gcs':
         print(Fore.BLUE + "\n Saving processed data to the gcs.." + Style.RESET_ALL)
-        save_data_to_gcs(cleaned_df,  feature_importance_df, risk_score_df)
+        save_data_to_gcs(cleaned_df,  feature_importance_df, risk_score_df, explanation_df)
+    elif params.DATA_TARGET == 'bq':
+        print(Fore.BLUE + "\n Saving processed data to BigQuery.." + Style.RESET_ALL)
+        for name, df in [(params.CLEANED_DATA, cleaned_df),
+                         (params.FEATURE_IMPORTANCE_DATA, feature_importance_df),
+                         (params.RISK_SCORE_DATA, risk_score_df),
+                         (params.EXPLANATION_DATA, explanation_df)]:
+            # Table named after the data file: cleaned.csv -> cleaned
+            if df is None:
+                get_warehouse(params.GCP_PROJECT, params.BQ_DATASET).drop_table(Path.splitext(name)[0])
+                continue
+            load_data_to_bq(df, params.GCP_PROJECT, params.BQ_DATASET, Path.splitext(name)[0], truncate=True)
 
 def save_data_to_gcs(
         cleaned_df: pd.DataFrame,
         feature_importance_df: pd.DataFrame,
-        risk_score_df: pd.DataFrame
+        risk_score_df: pd.DataFrame,
+        explanation_df: pd.DataFrame = None
     ):
 
     '''
-    Save the processed version of data in google cloud storage to make it available to Dashboard
+    Save the processed version of data in google cloud storage to make it available to Dashboard.
+    The tables are uploaded concurrently as compressed Parquet objects (`cleaned.csv` ->
+    `cleaned.parquet`), streamed row group by row group (see `object_store.upload_frame`)
     '''
-    client = storage.Client()
-    bucket = client.bucket(params.BUCKET_NAME)
+    frames = {}
+    for name, df in [(params.CLEANED_DATA, cleaned_df),
+                     (params.FEATURE_IMPORTANCE_DATA, feature_importance_df),
+                     (params.RISK_SCORE_DATA, risk_score_df),
+                     (params.EXPLANATION_DATA, explanation_df)]:
+        if df is None:
+            continue
+        df.columns = df.columns.str.strip().str.replace(r'[\n\r]', '', regex=True)
+        frames[columnar_name(name)] = df
 
     try:
-        # Convert DataFrame to CSV format in memory
-        cleaned_data_buffer = BytesIO()
-        cleaned_df.columns = cleaned_df.columns.str.strip().str.replace(r'[\n\r]', '', regex=True)
-        cleaned_df.to_csv(cleaned_data_buffer, index=True)
-
-        feature_importance_buffer = BytesIO()
-        feature_importance_df.columns = feature_importance_df.columns.str.strip().str.replace(r'[\n\r]', '', regex=True)
-        feature_importance_df.to_csv(feature_importance_buffer)
-
-        survival_data_buffer = BytesIO()
-        risk_score_df.columns = risk_score_df.columns.str.strip().str.replace(r'[\n\r]', '', regex=True)
-        risk_score_df.to_csv(survival_data_buffer, index=True)
-
-
-        # Specify the bucket name and CSV file path in GCS | Used in printing only
-        gcsfile_name_cleaned = f'gs://{params.BUCKET_NAME}/{params.CLEANED_DATA}'
-        gcsfile_name_feature_imp = f'gs://{params.BUCKET_NAME}/{params.FEATURE_IMPORTANCE_DATA}'
-        gcsfile_name_survival = f'gs://{params.BUCKET_NAME}/{params.RISK_SCORE_DATA}'
-
-        # Create a Blob object and upload the CSV data
-        blob_cleaned = bucket.blob(params.CLEANED_DATA)
-        blob_cleaned.upload_from_string(cleaned_data_buffer.getvalue(), content_type='text/csv')
-
-        blob_feature_imp = bucket.blob(params.FEATURE_IMPORTANCE_DATA)
-        blob_feature_imp.upload_from_string(feature_importance_buffer.getvalue(), content_type='text/csv')
-
-        blob_survival = bucket.blob(params.RISK_SCORE_DATA)
-        blob_survival.upload_from_string(survival_data_buffer.getvalue(), content_type='text/csv')
-
-        print(f"cleaned_df successfully written to '{gcsfile_name_cleaned}'")
-        print(f"feature_importance_df successfully written to '{gcsfile_name_feature_imp}'")
-        print(f"survival_df successfully written to '{gcsfile_name_survival}'")
+        start = time.perf_counter()
+        if explanation_df is None and delete_object(get_bucket(), columnar_name(params.EXPLANATION_DATA)):
+            print(f"{columnar_name(params.EXPLANATION_DATA)} of the previous model deleted")
+        names = upload_frames(frames)
+        for name in names:
+            print(f"{name} successfully written to 'gs://{params.BUCKET_NAME}/{name}'")
+        print(f"✅ Processed data uploaded in {time.perf_counter() - start:.2f}s")
 
         return True, "OK"
 
     except Exception as e:
-        print(f"\n❌ No files saved in GCS bucket {bucket}")
+        print(f"\n❌ No files saved in GCS bucket {params.BUCKET_NAME}: {e}")
         return False, e
 
 
 
 
+def _download_processed_frames(names: list, columns=None) -> dict:
+    '''
+    Download processed tables by data file name, concurrently: their Parquet objects,
+    or the CSV objects written by earlier versions when there is no Parquet one
+    '''
+    bucket = get_bucket()
+    columns = columns or {}
+    def download(name):
+        if bucket.blob(columnar_name(name)).exists():
+            return download_frame(bucket, columnar_name(name), columns.get(name))
+        usecols = None if columns.get(name) is None else (lambda column: column in columns[name])
+        index_col = 'EmployeeNumber' if name != params.FEATURE_IMPORTANCE_DATA else None
+        return pd.read_csv(BytesIO(bucket.blob(name).download_as_bytes()), index_col=index_col, usecols=usecols)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(params.GCS_MAX_WORKERS, len(names)))) as pool:
+        futures = {name: pool.submit(download, name) for name in names}
+        return {name: future.result() for name, future in futures.items()}
+
+
 def get_processed_data_from_gcs():
     '''
     Retrieve the processed data from Google Cloud Storage and return as DataFrames
@@ -153,27 +407,13 @@ def get_processed_data_from_gcs():
         tuple: (success_status, cleaned_df, feature_importance_df, risk_score_df)
                success_status is True if all data was retrieved successfully
     '''
-    client = storage.Client()
-    bucket = client.bucket(params.BUCKET_NAME)
-
+    names = [params.CLEANED_DATA, params.FEATURE_IMPORTANCE_DATA, params.RISK_SCORE_DATA]
     try:
-        # Get cleaned data
-        blob_cleaned = bucket.blob(params.CLEANED_DATA)
-        cleaned_data = blob_cleaned.download_as_string()
-        cleaned_df = pd.read_csv(BytesIO(cleaned_data), index_col='EmployeeNumber')
-
-        # Get feature importance data
-        blob_feature_imp = bucket.blob(params.FEATURE_IMPORTANCE_DATA)
-        feature_imp_data = blob_feature_imp.download_as_string()
-        feature_importance_df = pd.read_csv(BytesIO(feature_imp_data))
+        start = time.perf_counter()
+        frames = _download_processed_frames(names)
 
-        # Get risk score data
-        blob_survival = bucket.blob(params.RISK_SCORE_DATA)
-        risk_score_data = blob_survival.download_as_string()
-        risk_score_df = pd.read_csv(BytesIO(risk_score_data), index_col='EmployeeNumber')
-
-        print("Successfully retrieved all data from GCS")
-        return True, cleaned_df, feature_importance_df, risk_score_df
+        print(f"Successfully retrieved all data from GCS in {time.perf_counter() - start:.2f}s")
+        return True, *(frames[name] for name in names)
 
     except Exception as e:
         print(f"Error retrieving data from GCS: {e}")
@@ -215,9 +455,9 @@ def get_processed_data():
                     Path.exists(local_feature_imp_path) and \
                     Path.exists(local_risk_score_path)):
 
-                    cleaned_df = pd.read_csv(local_cleaned_path, index_col='EmployeeNumber')
-                    feature_importance_df = pd.read_csv(local_feature_imp_path)
-                    risk_score_df = pd.read_csv(local_risk_score_path, index_col='EmployeeNumber')
+                    cleaned_df = read_csv_cached(local_cleaned_path, index_col='EmployeeNumber')
+                    feature_importance_df = read_csv_cached(local_feature_imp_path)
+                    risk_score_df = read_csv_cached(local_risk_score_path, index_col='EmployeeNumber')
                     data_loaded = True
                     print("✅ Successfully loaded all data from local cache")
 
@@ -229,3 +469,55 @@ def get_processed_data():
 
     elif params.DATA_TARGET == 'gcs':
         return get_processed_data_from_gcs()
+
+def get_risk_scores():
+    '''
+    Get only the precomputed risk scores written by `train()` (RISK_SCORE_DATA),
+    without the cleaned data and feature importances, from DATA_TARGET
+
+    Returns:
+        DataFrame of PredictedRisk (and YearsAtCompany) indexed by EmployeeNumber
+        None: if the file does not exist
+    '''
+    columns = ['EmployeeNumber', 'PredictedRisk', 'YearsAtCompany']
+
+    if params.DATA_TARGET == 'local':
+        if params.LOCAL_CACHE_DIR is None:
+            raise ValueError("LOCAL_CACHE_DIR parameter is not set in params.")
+        local_risk_score_path = Path.join(params.LOCAL_CACHE_DIR, params.RISK_SCORE_DATA) # type: ignore
+        if not Path.exists(local_risk_score_path):
+            return None
+        return read_csv_cached(local_risk_score_path, index_col='EmployeeNumber', columns=columns)
+
+    elif params.DATA_TARGET == 'gcs':
+        bucket = get_bucket()
+        if not (bucket.blob(columnar_name(params.RISK_SCORE_DATA)).exists() or bucket.blob(params.RISK_SCORE_DATA).exists()):
+            return None
+        return _download_processed_frames([params.RISK_SCORE_DATA], {params.RISK_SCORE_DATA: columns})[params.RISK_SCORE_DATA]
+
+    return None
+
+
+def get_explanations():
+    '''
+    Get the per-employee risk factors written by `train()` (EXPLANATION_DATA) from DATA_TARGET
+
+    Returns:
+        DataFrame of attributions per feature (and BaseValue) indexed by EmployeeNumber
+        None: if the file does not exist
+    '''
+    if params.DATA_TARGET == 'local':
+        if params.LOCAL_CACHE_DIR is None:
+            raise ValueError("LOCAL_CACHE_DIR parameter is not set in params.")
+        local_explanation_path = Path.join(params.LOCAL_CACHE_DIR, params.EXPLANATION_DATA)
+        if not Path.exists(local_explanation_path):
+            return None
+        return read_csv_cached(local_explanation_path, index_col='EmployeeNumber')
+
+    elif params.DATA_TARGET == 'gcs':
+        bucket = get_bucket()
+        if not bucket.blob(columnar_name(params.EXPLANATION_DATA)).exists():
+            return None
+        return _download_processed_frames([params.EXPLANATION_DATA])[params.EXPLANATION_DATA]
+
+    return None
@@ -0,0 +1,252 @@
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy.integrate import trapezoid
+from sksurv.nonparametric import CensoringDistributionEstimator
+
+from employee_attrition.params import *
+from employee_attrition.ml_logic.artifact_cache import ArtifactCache
+from employee_attrition.ml_logic.preprocessing import data_fingerprint
+from employee_attrition.ml_logic.survival import baseline_survival, survival_matrix
+
+# Pairs (events x employees) held at once by the C-index computation
+_PAIR_CHUNK = 4_000_000
+# Risk groups of the calibration table
+CALIBRATION_BINS = 10
+
+
+def evaluation_times(y, n_times=EVALUATION_N_TIMES) -> np.ndarray:
+    """
+    Time points of the time-dependent metrics: quantiles (10% to 80%) of the
+    event times, strictly inside the follow-up range of `y`
+    """
+    event_times = y['time'][y['event']]
+    times = np.unique(np.quantile(event_times, np.linspace(0.1, 0.8, n_times)))
+    return times[(times >= y['time'].min()) & (times < y['time'].max())]
+
+
+def bootstrap_weights(n: int, n_bootstrap: int, random_state=TRAIN_RANDOM_STATE) -> np.ndarray:
+    """
+    (1 + n_bootstrap, n) row multiplicities: the first row is the sample itself,
+    the others bootstrap resamples. A resample is a weighted copy of the sample,
+    so every metric below is computed for all resamples at once.
+    """
+    rng = np.random.default_rng(random_state)
+    resamples = rng.multinomial(n, np.full(n, 1 / n), size=n_bootstrap)
+    return np.vstack([np.ones((1, n), dtype=np.int64), resamples]).astype(np.float32)
+
+
+def _c_index(weights, time, event, risk, tied_tol=1e-8) -> np.ndarray:
+    """
+    Harrell's concordance index for each row of weights, same pairs and ties as
+    `concordance_index_censored`: an event is comparable with everyone who
+    outlived it or was censored at its time; tied risks count for a half.
+    """
+    numerator = np.zeros(len(weights))
+    denominator = np.zeros(len(weights))
+    events = np.flatnonzero(event)
+    chunk = max(1, _PAIR_CHUNK // len(time))
+    for start in range(0, len(events), chunk):
+        i = events[start:start + chunk]
+        comparable = (time[np.newaxis, :] > time[i, np.newaxis]) | (
+            (time[np.newaxis, :] == time[i, np.newaxis]) & ~event[np.newaxis, :])
+        diff = risk[i, np.newaxis] - risk[np.newaxis, :]
+        score = np.where(np.abs(diff) <= tied_tol, 0.5, (diff > 0).astype(np.float32)) * comparable
+
+        # sum_i w_i sum_j w_j score_ij, for all rows of weights as two matrix products
+        numerator += (weights[:, i] * (weights @ score.T.astype(np.float32))).sum(axis=1, dtype=np.float64)
+        denominator += (weights[:, i] * (weights @ comparable.T.astype(np.float32))).sum(axis=1, dtype=np.float64)
+    return numerator / denominator
+
+
+def _time_auc(weights, time, event, risk, ipcw, times) -> np.ndarray:
+    """
+    Cumulative/dynamic AUC at each time (as `cumulative_dynamic_auc`): cases are the
+    events up to t weighted by their inverse probability of censoring, controls the
+    employees still there after t. Counted on the risk-sorted employees with
+    cumulative sums instead of pairs. Return (len(weights), len(times)).
+    """
+    order = np.argsort(risk, kind='stable')
+    weights, time, event, ipcw = weights[:, order], time[order], event[order], ipcw[order]
+    # Start of each group of tied risks, in risk order
+    starts = np.flatnonzero(np.r_[True, np.diff(risk[order]) > 0])
+
+    auc = np.empty((len(weights), len(times)))
+    for k, t in enumerate(times):
+        controls = np.add.reduceat(weights * (time > t), starts, axis=1)
+        cases = np.add.reduceat(weights * (((time <= t) & event) * ipcw).astype(np.float32), starts, axis=1)
+        below = np.cumsum(controls, axis=1, dtype=np.float64) - controls
+        numerator = (cases * (below + 0.5 * controls)).sum(axis=1)
+        # NaN for the resamples without a case or a control at t
+        with np.errstate(invalid='ignore', divide='ignore'):
+            auc[:, k] = numerator / (cases.sum(axis=1, dtype=np.float64) * controls.sum(axis=1, dtype=np.float64))
+    return auc
+
+
+def _brier_losses(time, event, survival, prob_cens_y, prob_cens_t, times) -> np.ndarray:
+    """
+    Per-employee IPCW squared errors at each time (as `brier_score`), (n, len(times))
+    """
+    is_case = (time[:, np.newaxis] <= times) & event[:, np.newaxis]
+    is_control = time[:, np.newaxis] > times
+    return (np.square(survival) * is_case / prob_cens_y[:, np.newaxis]
+            + np.square(1.0 - survival) * is_control / prob_cens_t[np.newaxis, :])
+
+
+def _summary(values) -> dict:
+    """
+    Point estimate (first value) and bootstrap mean, standard deviation and 95% interval
+    """
+    values = np.asarray(values, dtype=np.float64)
+    bootstrap = values[1:][np.isfinite(values[1:])]
+    summary = {"estimate": float(values[0])}
+    if len(bootstrap):
+        summary.update(mean=float(bootstrap.mean()), std=float(bootstrap.std()),
+                       ci_low=float(np.percentile(bootstrap, 2.5)), ci_high=float(np.percentile(bootstrap, 97.5)))
+    return summary
+
+
+def _metrics(weights, data) -> dict:
+    """
+    All metrics for one block of bootstrap weights, one value per row
+    """
+    time, event, risk = data["time"], data["event"], data["risk"]
+    metrics = {
+        "c_index": _c_index(weights, time, event, risk),
+        "auc": _time_auc(weights, time, event, risk, data["ipcw"], data["times"]),
+    }
+    if data.get("brier_losses") is not None:
+        totals = weights.sum(axis=1, dtype=np.float64)
+        metrics["brier"] = (weights @ data["brier_losses"]) / totals[:, np.newaxis]
+
+        # Calibration by risk group at the horizon: predicted vs IPCW observed event probability
+        groups = data["calibration_groups"]
+        n_group = weights @ groups
+        with np.errstate(invalid='ignore', divide='ignore'):
+            predicted = (weights @ (groups * data["predicted"][:, np.newaxis])) / n_group
+            observed = (weights @ (groups * data["observed"][:, np.newaxis])) / n_group
+        metrics["calibration_predicted"] = predicted
+        metrics["calibration_observed"] = observed
+        metrics["calibration_error"] = np.nansum(n_group * np.abs(predicted - observed), axis=1) / totals
+    return metrics
+
+
+_evaluation_cache = None
+
+def get_evaluation_cache():
+    """
+    Return the local cache of evaluation results, None if EVALUATION_CACHE_MAX_MB is 0
+    """
+    global _evaluation_cache
+    if _evaluation_cache is None and EVALUATION_CACHE_MAX_MB > 0:
+        _evaluation_cache = ArtifactCache(EVALUATION_CACHE_DIR, EVALUATION_CACHE_MAX_MB * 1024 * 1024)
+    return _evaluation_cache
+
+
+def evaluate_model(
+        pipeline,
+        X,
+        y,
+        y_train=None,
+        model_version=None,
+        times=None,
+        n_bootstrap=EVALUATION_N_BOOTSTRAP,
+        random_state=TRAIN_RANDOM_STATE,
+        n_jobs=EVALUATION_N_JOBS,
+    ) -> dict:
+    """
+    Evaluate a fitted pipeline on (X, y):
+    - C-index
+    - time-dependent (cumulative/dynamic) AUC at `times` and its mean
+    - Brier score at `times` and integrated Brier score (coxph models only)
+    - calibration: predicted vs observed event probability by risk decile at the
+      middle time point, and its frequency-weighted mean absolute error
+    with bootstrap means and 95% intervals over `n_bootstrap` resamples.
+
+    The censoring distribution is estimated on `y_train` (default `y`). Bootstrap
+    blocks run on `n_jobs` threads (0 for all cores). Results are cached per
+    (model version, data fingerprint, settings); `model_version` defaults to a hash
+    of the pickled pipeline.
+    """
+    y_train = y if y_train is None else y_train
+    times = evaluation_times(y) if times is None else np.asarray(times, dtype=np.float64)
+    if model_version is None:
+        model_version = hashlib.sha256(pickle.dumps(pipeline)).hexdigest()
+
+    fingerprint = data_fingerprint(X, y)
+    key = hashlib.sha256(json.dumps({
+        "model_version": model_version,
+        "data": fingerprint,
+        "censoring": hashlib.sha256(np.ascontiguousarray(y_train).tobytes()).hexdigest(),
+        "times": times.tolist(),
+        "n_bootstrap": n_bootstrap,
+        "random_state": random_state,
+    }).encode()).hexdigest()
+
+    cache = get_evaluation_cache()
+    cached = cache.open("evaluation", key) if cache is not None else None
+    if cached is not None:
+        with cached as f:
+            return json.load(f)
+
+    time, event = y['time'].astype(np.float64), y['event'].astype(bool)
+    risk = np.asarray(pipeline.predict(X), dtype=np.float64)
+
+    censoring = CensoringDistributionEstimator().fit(y_train)
+    prob_cens_y = censoring.predict_proba(time)
+    prob_cens_y[prob_cens_y == 0] = np.inf
+    data = {"time": time, "event": event, "risk": risk, "times": times, "ipcw": event / prob_cens_y}
+
+    try:
+        baseline = baseline_survival(pipeline.named_steps['model'])
+    except (AttributeError, ValueError):
+        baseline = None
+    if baseline is not None:
+        survival = survival_matrix(baseline, risk, times)
+        data["brier_losses"] = _brier_losses(time, event, survival, prob_cens_y,
+                                             censoring.predict_proba(times), times).astype(np.float32)
+        horizon = len(times) // 2
+        data["predicted"] = 1.0 - survival[:, horizon]
+        data["observed"] = ((time <= times[horizon]) & event) / prob_cens_y
+        edges = np.quantile(data["predicted"], np.linspace(0, 1, CALIBRATION_BINS + 1)[1:-1])
+        group = np.searchsorted(edges, data["predicted"], side="right")
+        data["calibration_groups"] = (group[:, np.newaxis] == np.arange(CALIBRATION_BINS)).astype(np.float32)
+
+    # Bootstrap blocks in threads: numpy and BLAS release the GIL
+    weights = bootstrap_weights(len(time), n_bootstrap, random_state)
+    n_jobs = n_jobs or os.cpu_count()
+    blocks = np.array_split(weights, min(n_jobs, len(weights)))
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        parts = list(pool.map(lambda block: _metrics(block, data), blocks))
+    values = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+    results = {
+        "model_version": model_version,
+        "data_fingerprint": fingerprint,
+        "n_rows": int(len(time)),
+        "n_events": int(event.sum()),
+        "n_bootstrap": n_bootstrap,
+        "times": times.tolist(),
+        "c_index": _summary(values["c_index"]),
+        "auc": [_summary(values["auc"][:, k]) for k in range(len(times))],
+        "mean_auc": _summary(np.nanmean(values["auc"], axis=1)),
+    }
+    if "brier" in values:
+        brier = values["brier"]
+        integrated = trapezoid(brier, times, axis=1) / (times[-1] - times[0]) if len(times) > 1 else brier[:, 0]
+        results["brier"] = [_summary(brier[:, k]) for k in range(len(times))]
+        results["integrated_brier_score"] = _summary(integrated)
+        results["calibration"] = {
+            "time": float(times[len(times) // 2]),
+            "predicted": values["calibration_predicted"][0].tolist(),
+            "observed": values["calibration_observed"][0].tolist(),
+        }
+        results["calibration_error"] = _summary(values["calibration_error"])
+
+    if cache is not None:
+        cache.put("evaluation", key, json.dumps(results).encode())
+    return results
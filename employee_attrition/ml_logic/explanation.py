@@ -0,0 +1,209 @@
+from math import factorial
+
+import numpy as np
+import pandas as pd
+from sksurv.ensemble import GradientBoostingSurvivalAnalysis
+
+from employee_attrition.params import *
+from employee_attrition.ml_logic.export import _tree_arrays
+from employee_attrition.ml_logic.inference import InferencePlan
+
+# Column of the explanation table holding the expected log-risk the attributions start from
+BASE_VALUE_COLUMN = 'BaseValue'
+
+
+class TreeExplainer:
+    """
+    Exact path-dependent TreeSHAP attributions of a GradientBoostingSurvivalAnalysis,
+    precomputed per leaf so a batch is explained with array operations only.
+
+    A leaf's share of E[f(x) | x_S] only depends on which of the (at most max_depth)
+    features on its path are in S and whether x follows the path on them: its Shapley
+    contributions for every such agreement pattern are tabulated once, then each row
+    looks its pattern up in every leaf.
+    """
+
+    def __init__(self, model: GradientBoostingSurvivalAnalysis):
+        if not isinstance(model, GradientBoostingSurvivalAnalysis) or model.estimators_.shape[1] != 1:
+            raise TypeError(f"Cannot explain {type(model).__name__}")
+
+        arrays = _tree_arrays(model)
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+
+        leaves = []
+        for tree_index, (estimator, root) in enumerate(zip(model.estimators_[:, 0], arrays["roots"])):
+            tree = estimator.tree_
+            weight = arrays["tree_weight"][tree_index]
+            stack = [(0, [])]
+            while stack:
+                node, path = stack.pop()
+                if tree.children_left[node] < 0:
+                    leaves.append((weight * tree.value[node, 0, 0], path))
+                    continue
+                for child, go_left in ((tree.children_left[node], True), (tree.children_right[node], False)):
+                    cover = tree.weighted_n_node_samples[child] / tree.weighted_n_node_samples[node]
+                    stack.append((child, path + [(root + node, int(tree.feature[node]), go_left, cover)]))
+
+        n_leaves = len(leaves)
+        max_splits = max(len(path) for _, path in leaves)
+        max_features = max(len({feature for _, feature, _, _ in path}) for _, path in leaves)
+
+        # Splits of each leaf's path: node, direction and slot of its feature (-1 pads)
+        self.split_node = np.zeros((n_leaves, max_splits), dtype=np.int64)
+        self.split_left = np.ones((n_leaves, max_splits), dtype=bool)
+        self.split_slot = np.full((n_leaves, max_splits), -1, dtype=np.int64)
+        # Model feature of each slot, contributions by agreement pattern (bit k: x follows slot k)
+        self.slot_feature = np.full((n_leaves, max_features), -1, dtype=np.int64)
+        # Share of the training cover reaching each leaf along its slot's splits (1 for pads)
+        zero_fraction = np.ones((n_leaves, max_features))
+        n_path_features = np.zeros(n_leaves, dtype=np.int64)
+        values = np.array([value for value, _ in leaves])
+
+        for leaf, (value, path) in enumerate(leaves):
+            features = list(dict.fromkeys(feature for _, feature, _, _ in path))
+            for j, (node, feature, go_left, cover) in enumerate(path):
+                slot = features.index(feature)
+                self.split_node[leaf, j], self.split_left[leaf, j], self.split_slot[leaf, j] = node, go_left, slot
+                zero_fraction[leaf, slot] *= cover
+            self.slot_feature[leaf, :len(features)] = features
+            n_path_features[leaf] = len(features)
+        self.base_value = float(values @ zero_fraction.prod(axis=1))
+
+        # Tables of the leaves with as many path features at once, each distinct
+        # zero fraction vector computed once
+        self.table = np.zeros((n_leaves, 2 ** max_features, max_features), dtype=np.float64)
+        for d in range(1, max_features + 1):
+            leaves_d = np.flatnonzero(n_path_features == d)
+            if len(leaves_d) == 0:
+                continue
+            distinct, inverse = np.unique(zero_fraction[leaves_d, :d], axis=0, return_inverse=True)
+            tables = _shapley_tables(distinct)[inverse.ravel()]
+            # Padding slots always "follow": patterns differing only there share the leaf's values
+            patterns = np.arange(2 ** max_features) & (2 ** d - 1)
+            self.table[leaves_d, :, :d] = values[leaves_d, np.newaxis, np.newaxis] * tables[:, patterns]
+
+        # Only the split nodes are tested: renumber them
+        nodes, self.split_node = np.unique(self.split_node, return_inverse=True)
+        self.split_node = self.split_node.reshape(n_leaves, max_splits)
+        self.feature, self.threshold = self.feature[nodes], self.threshold[nodes]
+        # Bit a disagreeing split clears from its leaf's pattern (none for pads); patterns
+        # and table positions in the smallest integer types holding them
+        self.pattern_dtype = np.min_scalar_type(2 ** max_features - 1)
+        self.split_bit = np.where(self.split_slot >= 0, 1 << np.maximum(self.split_slot, 0), 0).astype(self.pattern_dtype)
+        # Used (leaf, slot) pairs grouped by feature: the flat table position of their
+        # pattern-0 contribution, the leaf whose pattern shifts it, where each feature starts
+        used_leaf, used_slot = np.nonzero(self.slot_feature >= 0)
+        order = np.argsort(self.slot_feature[used_leaf, used_slot], kind='stable')
+        used_leaf, used_slot = used_leaf[order], used_slot[order]
+        self.pair_leaf = used_leaf
+        self.index_dtype = np.min_scalar_type(n_leaves * 2 ** max_features * max_features)
+        self.pair_offset = (used_leaf * 2 ** max_features * max_features + used_slot).astype(self.index_dtype)
+        self.n_slots = max_features
+        self.features, self.feature_start = np.unique(self.slot_feature[used_leaf, used_slot], return_index=True)
+        self.n_features = model.n_features_in_
+        self.table = self.table.ravel()
+
+    def attributions(self, X: np.ndarray) -> np.ndarray:
+        """
+        Attributions of a float32 feature matrix (see `InferencePlan.transform`) to its
+        columns, in the model's raw (log-risk) output: each row sums to its raw
+        prediction minus `base_value`
+        """
+        # Same test as the trees: float32 feature <= float64 threshold
+        go_left = X[:, self.feature] <= self.threshold
+        n_leaves, n_splits = self.split_node.shape
+
+        # Start from "follows every slot", clear the bits of the splits x disagrees with
+        pattern = np.full((X.shape[0], n_leaves), 2 ** self.n_slots - 1, dtype=self.pattern_dtype)
+        for j in range(n_splits):
+            disagree = go_left[:, self.split_node[:, j]] != self.split_left[:, j]
+            pattern &= ~(disagree * self.split_bit[:, j])
+
+        index = pattern[:, self.pair_leaf].astype(self.index_dtype)
+        index *= self.n_slots
+        index += self.pair_offset
+        out = np.zeros((X.shape[0], self.n_features))
+        if len(self.features):
+            out[:, self.features] = np.add.reduceat(self.table[index], self.feature_start, axis=1)
+        return out
+
+
+def _shapley_tables(zero_fraction: np.ndarray) -> np.ndarray:
+    """
+    Shapley values of the d features of leaf paths (rows of the (n, d) `zero_fraction`)
+    for each agreement pattern, as an (n, 2^d, d) array. With S the known features, a
+    leaf weighs prod(1 if known and followed, 0 if known and not followed,
+    zero_fraction otherwise), so only subsets of the followed features count: for
+    feature i, with a of the others followed, the sum over them is
+    sum_j w(a - j) e_j(their zero fractions), times the product of the others' zero
+    fractions. The elementary symmetric polynomials e_j are built one feature at a
+    time, for all leaves and patterns at once.
+    """
+    n, d = zero_fraction.shape
+    follows = (np.arange(2 ** d)[:, np.newaxis] >> np.arange(d)) & 1 == 1
+    # Shapley weight of a subset of s of the d features: s! (d - s - 1)! / d!
+    weights = np.array([factorial(s) * factorial(d - s - 1) / factorial(d) for s in range(d)])
+
+    table = np.zeros((n, 2 ** d, d))
+    for i in range(d):
+        others = [k for k in range(d) if k != i]
+        # e_0..e_(d-1) of the followed others' zero fractions, product of the rest
+        elementary = np.zeros((n, 2 ** d, d))
+        elementary[..., 0] = 1.0
+        unfollowed = np.ones((n, 2 ** d))
+        for k in others:
+            z = zero_fraction[:, k, np.newaxis]
+            shifted = np.concatenate([np.zeros((n, 2 ** d, 1)), elementary[..., :-1]], axis=2)
+            elementary = np.where(follows[:, k, np.newaxis], elementary + z[..., np.newaxis] * shifted, elementary)
+            unfollowed = np.where(follows[:, k], unfollowed, unfollowed * z)
+
+        n_followed = follows[:, others].sum(axis=1)
+        j = np.arange(d)
+        subset_weights = np.where(j <= n_followed[:, np.newaxis],
+                                  weights[np.clip(n_followed[:, np.newaxis] - j, 0, d - 1)], 0.0)
+        table[..., i] = ((follows[:, i] - zero_fraction[:, i, np.newaxis]) * unfollowed
+                         * (elementary * subset_weights).sum(axis=2))
+    return table
+
+
+def _input_columns(plan: InferencePlan) -> list:
+    """
+    Input column of each model feature: one-hot columns map to their categorical column
+    """
+    columns = [None] * plan.n_features
+    for column, index in zip(plan.numeric_columns, plan.numeric_index):
+        columns[index] = column
+    for column, lookup, _ in plan.categorical:
+        for index in lookup.values():
+            if index >= 0:
+                columns[index] = column
+    return columns
+
+
+def explain_risk(pipeline, X: pd.DataFrame, chunk_rows=EXPLANATION_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Per-employee TreeSHAP attributions of the risk predicted by a GBSA pipeline,
+    `chunk_rows` rows at a time: a float32 frame indexed like X with one column per
+    input feature (one-hot columns summed into their categorical column) and the
+    BaseValue they start from. In log-risk: BaseValue plus a row's attributions is its
+    PredictedRisk for loss='coxph', its log otherwise.
+    Raise TypeError for models the explainer does not cover.
+    """
+    plan = InferencePlan.from_pipeline(pipeline)
+    explainer = TreeExplainer(pipeline.named_steps['model'])
+
+    input_columns = _input_columns(plan)
+    names = list(dict.fromkeys(input_columns))
+    # Model feature -> input feature aggregation
+    grouping = np.zeros((plan.n_features, len(names)))
+    grouping[np.arange(plan.n_features), [names.index(column) for column in input_columns]] = 1.0
+
+    out = np.empty((len(X), len(names)), dtype=np.float32)
+    for start in range(0, len(X), chunk_rows):
+        chunk = plan.transform(X.iloc[start:start + chunk_rows])
+        out[start:start + chunk_rows] = explainer.attributions(chunk) @ grouping
+
+    explanation_df = pd.DataFrame(out, index=X.index, columns=names)
+    explanation_df[BASE_VALUE_COLUMN] = np.float32(explainer.base_value)
+    return explanation_df
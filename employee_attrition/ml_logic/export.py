@@ -0,0 +1,197 @@
+import json
+import mmap
+import os
+import tempfile
+
+import numpy as np
+from sksurv.ensemble import GradientBoostingSurvivalAnalysis
+
+from employee_attrition.ml_logic.inference import InferencePlan
+
+# File layout: MAGIC | header length (uint64, little-endian) | JSON header | arrays,
+# each array starting on a 64-byte boundary at the offset recorded in the header
+MAGIC = b"EAMODEL1"
+ALIGNMENT = 64
+
+
+class TreeEnsemble:
+    """
+    Inference-only GradientBoostingSurvivalAnalysis rebuilt from flat arrays.
+
+    All trees are stored back to back: `left` / `right` hold global node indices
+    (-1 for leaves) and `roots` the first node of each tree, so every tree is
+    walked at once for the whole batch, one depth level per step.
+    """
+
+    def __init__(self, roots, left, right, feature, threshold, value, tree_weight, max_depth, exp_output):
+        self.roots = roots
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.tree_weight = tree_weight
+        self.max_depth = max_depth
+        self.exp_output = exp_output
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        n_rows = X.shape[0]
+        node = np.repeat(self.roots[np.newaxis, :], n_rows, axis=0)
+        rows = np.arange(n_rows)[:, np.newaxis]
+
+        for _ in range(self.max_depth):
+            left = self.left[node]
+            is_leaf = left < 0
+            if is_leaf.all():
+                break
+            # Same test as sklearn's trees: float32 feature <= float64 threshold
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(is_leaf, node, np.where(go_left, left, self.right[node]))
+
+        # Add the trees left to right like sklearn's predict_stages (cumsum is
+        # sequential, unlike the pairwise np.sum), so scores match exactly
+        contributions = self.value[node] * self.tree_weight
+        raw = np.cumsum(contributions, axis=1)[:, -1] if contributions.shape[1] else np.zeros(n_rows)
+
+        if self.exp_output:
+            np.exp(raw, out=raw)
+        return raw
+
+
+def _tree_arrays(model: GradientBoostingSurvivalAnalysis) -> dict:
+    """
+    Concatenate the fitted regression trees of the ensemble into flat arrays
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+    sizes = np.array([tree.node_count for tree in trees])
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    left, right = [], []
+    for tree, root in zip(trees, roots):
+        is_leaf = tree.children_left < 0
+        left.append(np.where(is_leaf, -1, tree.children_left + root))
+        right.append(np.where(is_leaf, -1, tree.children_right + root))
+
+    # Leaves have feature -2: point them at column 0, the result is masked anyway
+    feature = np.concatenate([np.maximum(tree.feature, 0) for tree in trees])
+
+    learning_rate = float(model.learning_rate)
+    scale = getattr(model, "_scale", None)
+    if scale is None:
+        tree_weight = np.full(len(trees), learning_rate)
+    else:
+        tree_weight = learning_rate * np.asarray(scale[:len(trees)], dtype=np.float64)
+
+    return {
+        "roots": roots.astype(np.int64),
+        "left": np.concatenate(left).astype(np.int64),
+        "right": np.concatenate(right).astype(np.int64),
+        "feature": feature.astype(np.int64),
+        "threshold": np.concatenate([tree.threshold for tree in trees]).astype(np.float64),
+        "value": np.concatenate([tree.value[:, 0, 0] for tree in trees]).astype(np.float64),
+        "tree_weight": tree_weight,
+    }
+
+
+def export_model(pipeline, path: str, metadata: dict = None) -> None:
+    """
+    Write a fitted survival pipeline to `path` in the pickle-free export format:
+    tree arrays, scaler / encoder parameters and the baseline survival function
+    as flat arrays in one memory-mappable file.
+    The file is replaced atomically, processes that mapped the previous one keep it.
+    """
+    model = pipeline.named_steps['model']
+    if not isinstance(model, GradientBoostingSurvivalAnalysis) or model.estimators_.shape[1] != 1:
+        raise TypeError(f"Cannot export {type(model).__name__}")
+
+    plan = InferencePlan.from_pipeline(pipeline)
+
+    arrays = _tree_arrays(model)
+    arrays["numeric_index"] = plan.numeric_index.astype(np.int64)
+    arrays["means"] = plan.means
+    arrays["scales"] = plan.scales
+    if plan.baseline is not None:
+        arrays["baseline_times"] = np.asarray(plan.baseline[0], dtype=np.float64)
+        arrays["baseline_survival"] = np.asarray(plan.baseline[1], dtype=np.float64)
+
+    header = {
+        "feature_names": plan.feature_names,
+        "numeric_columns": plan.numeric_columns,
+        # Lookups as (category, output column) pairs: JSON keys would turn numbers into strings
+        "categorical": [
+            {"column": column, "lookup": list(lookup.items()), "handle_unknown": handle_unknown}
+            for column, lookup, handle_unknown in plan.categorical
+        ],
+        "max_depth": int(max(estimator.tree_.max_depth for estimator in model.estimators_[:, 0])),
+        "exp_output": model.loss != "coxph",
+        "metadata": metadata or {},
+        "arrays": {},
+    }
+
+    # Offsets depend on the header length, which depends on the offsets: lay the
+    # arrays out relative to the data section, then place it after the header
+    relative, position = {}, 0
+    for name, array in arrays.items():
+        relative[name] = position
+        position += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    data_start = 0
+    while True:
+        header["arrays"] = {
+            name: {"offset": data_start + relative[name], "dtype": array.dtype.str, "shape": list(array.shape)}
+            for name, array in arrays.items()
+        }
+        header_bytes = json.dumps(header).encode()
+        header_end = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+        if header_end == data_start:
+            break
+        data_start = header_end
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".eam")
+    with os.fdopen(fd, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b"\0" * (header["arrays"][name]["offset"] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def load_exported_model(path: str) -> InferencePlan:
+    """
+    Memory-map an exported model and return its InferencePlan.
+    The arrays are read-only views of the file, so processes loading the same
+    file share its pages instead of each holding a copy.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not an exported model")
+    header_length = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 8], "little")
+    header = json.loads(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + header_length])
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        count = int(np.prod(spec["shape"]))
+        arrays[name] = np.frombuffer(buffer, dtype=spec["dtype"], count=count,
+                                     offset=spec["offset"]).reshape(spec["shape"])
+
+    ensemble = TreeEnsemble(
+        arrays["roots"], arrays["left"], arrays["right"], arrays["feature"], arrays["threshold"],
+        arrays["value"], arrays["tree_weight"], header["max_depth"], header["exp_output"],
+    )
+    categorical = [
+        (entry["column"], {category: index for category, index in entry["lookup"]}, entry["handle_unknown"])
+        for entry in header["categorical"]
+    ]
+    baseline = None
+    if "baseline_times" in arrays:
+        baseline = (arrays["baseline_times"], arrays["baseline_survival"])
+
+    return InferencePlan(
+        header["feature_names"], header["numeric_columns"], arrays["numeric_index"],
+        arrays["means"], arrays["scales"], categorical, ensemble.predict, baseline,
+        header.get("metadata"),
+    )
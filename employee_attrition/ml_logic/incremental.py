@@ -0,0 +1,136 @@
+import copy
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+from employee_attrition.params import *
+from employee_attrition.ml_logic.preprocessing import NUMERICAL_COLUMNS, CATEGORICAL_COLUMNS
+
+
+def row_hashes(raw_data: pd.DataFrame) -> np.ndarray:
+    """
+    64-bit hash of each raw row, EmployeeNumber (the index) included:
+    a new employee or any changed value gives a hash the previous data did not have
+    """
+    return pd.util.hash_pandas_object(raw_data, index=True).to_numpy()
+
+
+def save_training_state(raw_data: pd.DataFrame, model_version, mode: str, incremental_runs: int = 0) -> None:
+    """
+    Record what the model saved as `model_version` was trained on: the row hashes
+    of `raw_data` and the number of incremental retrains since the last full refit
+    """
+    os.makedirs(TRAINING_STATE_DIR, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=TRAINING_STATE_DIR, suffix=".npy")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, row_hashes(raw_data))
+    os.replace(tmp_path, os.path.join(TRAINING_STATE_DIR, "row_hashes.npy"))
+
+    state = {
+        "model_version": model_version,
+        "mode": mode,
+        "incremental_runs": incremental_runs,
+        "n_rows": len(raw_data),
+        "saved_at": time.time(),
+    }
+    # Written last: the state describes the hashes saved before it
+    fd, tmp_path = tempfile.mkstemp(dir=TRAINING_STATE_DIR, suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, os.path.join(TRAINING_STATE_DIR, "state.json"))
+
+
+def load_training_state():
+    """
+    Return the state saved by `save_training_state` with its "row_hashes", None if there is none
+    """
+    state_path = os.path.join(TRAINING_STATE_DIR, "state.json")
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path) as f:
+        state = json.load(f)
+    state["row_hashes"] = np.load(os.path.join(TRAINING_STATE_DIR, "row_hashes.npy"))
+    return state
+
+
+def changed_rows(raw_data: pd.DataFrame, state: dict) -> np.ndarray:
+    """
+    Boolean mask of the rows of `raw_data` that are new or changed since the training state
+    """
+    return ~np.isin(row_hashes(raw_data), state["row_hashes"])
+
+
+def full_refit_reason(pipeline, model_version, state, n_changed: int, n_rows: int):
+    """
+    Return why the model has to be refitted from scratch, None if it can be warm-started
+    """
+    if pipeline is None:
+        return "no production model"
+    if state is None:
+        return "no training state"
+    if state["model_version"] != model_version:
+        return "the production model is not the one the training state describes"
+    if 'to_dataframe' in pipeline.named_steps:
+        return "legacy pipeline layout"
+    if state["incremental_runs"] >= RETRAIN_FULL_EVERY:
+        return f"scheduled ({state['incremental_runs']} incremental retrains since the last full refit)"
+    if n_changed > RETRAIN_MAX_DELTA_FRACTION * n_rows:
+        return f"{n_changed} new or changed rows out of {n_rows}"
+    return None
+
+
+def detect_drift(preprocessor, X_delta: pd.DataFrame):
+    """
+    Compare the delta rows to the data the preprocessor was fitted on.
+    Return a description of the drift, None if there is none:
+    - categories the one-hot encoder has never seen
+    - numerical columns whose delta mean moved more than RETRAIN_DRIFT_THRESHOLD
+      standard deviations, and significantly so for the delta size
+    """
+    encoder = preprocessor.named_transformers_['cat']
+    for column, categories in zip(CATEGORICAL_COLUMNS, encoder.categories_):
+        unseen = set(X_delta[column].unique()) - set(categories)
+        if unseen:
+            return f"unseen {column} categories {sorted(map(str, unseen))}"
+
+    scaler = preprocessor.named_transformers_['num']
+    z = (X_delta[NUMERICAL_COLUMNS].to_numpy(dtype=np.float64) - scaler.mean_) / scaler.scale_
+    shift = np.abs(z.mean(axis=0))
+    # Standard error of a mean of standardized values is 1 / sqrt(n)
+    drifted = (shift > RETRAIN_DRIFT_THRESHOLD) & (shift * np.sqrt(len(z)) > 3)
+    if drifted.any():
+        columns = [f"{c} ({s:.2f} sd)" for c, s, d in zip(NUMERICAL_COLUMNS, shift, drifted) if d]
+        return f"mean shift of {', '.join(columns)}"
+    return None
+
+
+def warm_start_pipeline(pipeline: Pipeline, X_fit, y_fit, X_all, y_all, n_stages=RETRAIN_INCREMENTAL_STAGES) -> Pipeline:
+    """
+    Return a copy of the fitted `pipeline` with `n_stages` boosting stages added,
+    fitted on (X_fit, y_fit) with the existing preprocessor.
+
+    The new stages only see the fit rows, so the cost scales with them. The Cox
+    baseline hazard needs every risk set though: it is re-estimated on
+    (X_all, y_all), every training row (never the validation rows), which only
+    takes a prediction over them.
+    """
+    preprocessor = pipeline.named_steps['preprocessor']
+    model = copy.deepcopy(pipeline.named_steps['model'])
+
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_stages)
+    model.fit(np.ascontiguousarray(preprocessor.transform(X_fit), dtype=np.float64), y_fit)
+    model.set_params(warm_start=False)
+
+    X_all_processed = np.ascontiguousarray(preprocessor.transform(X_all), dtype=np.float32)
+    model._set_baseline_model(X_all_processed, y_all['event'], y_all['time'])
+
+    return Pipeline(steps=[
+        ('preprocessor', preprocessor),
+        ('model', model)
+    ])
@@ -0,0 +1,217 @@
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, StandardScaler
+
+from employee_attrition.ml_logic.survival import baseline_survival
+
+
+def column_values(columns, name):
+    """
+    Return the values of column `name` from a columnar payload.
+    Accepts a DataFrame, a dict of lists or a dict of {index: value} dicts
+    (the default `DataFrame.to_dict()` orientation).
+    """
+    try:
+        values = columns[name]
+    except KeyError:
+        raise ValueError(f"Column '{name}' is missing from the input data")
+    if isinstance(values, Mapping):
+        values = list(values.values())
+    return values
+
+
+def _category_codes(values, lookup, n_rows) -> np.ndarray:
+    """
+    Map a categorical column to one-hot output columns:
+    -2 marks unknown categories, -1 the dropped category.
+    """
+    if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+        # Dictionary-encoded column: look each category up once, then gather by code
+        values = pd.Categorical(values)
+        mapping = np.fromiter((lookup.get(c, -2) for c in values.categories.tolist()),
+                              dtype=np.intp, count=len(values.categories))
+        # Missing values (code -1) land on the trailing "unknown" slot
+        mapping = np.append(mapping, -2)
+        return mapping[values.codes]
+    return np.fromiter((lookup.get(v, -2) for v in values), dtype=np.intp, count=n_rows)
+
+
+class InferencePlan:
+    """
+    Inference-only view of a fitted survival pipeline, compiled once at model load.
+
+    The fitted StandardScaler / OneHotEncoder / passthrough columns of the
+    ColumnTransformer are turned into NumPy arrays and category lookup tables,
+    so a columnar payload is scored straight into a preallocated float32 matrix
+    without building any intermediate DataFrame.
+    Scores are identical to `pipeline.predict`.
+
+    Build it with `InferencePlan.from_pipeline`, or `load_exported_model` for
+    a plan backed by the pickle-free export format.
+    """
+
+    def __init__(self, feature_names, numeric_columns, numeric_index, means, scales,
+                 categorical, score, baseline=None, metadata=None):
+        """
+        :param categorical: list of (input column, {category: output column or -1 if dropped}, handle_unknown)
+        :param score: callable scoring a float32 feature matrix into risk scores
+        :param baseline: (event times, baseline survival) of a coxph model, None otherwise
+        :param metadata: free-form information about the model (e.g. its registry version)
+        """
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.numeric_columns = list(numeric_columns)
+        self.numeric_index = np.asarray(numeric_index, dtype=np.intp)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+        self.categorical = categorical
+        self._score = score
+        self.baseline = baseline
+        self.metadata = metadata or {}
+
+    @classmethod
+    def from_pipeline(cls, pipeline: Pipeline):
+        """
+        Compile a fitted preprocessor / model pipeline (with or without the
+        legacy to_dataframe step in between)
+        """
+        preprocessor = pipeline.named_steps['preprocessor']
+        if not isinstance(preprocessor, ColumnTransformer):
+            raise TypeError(f"Unsupported preprocessor {type(preprocessor).__name__}")
+
+        model = pipeline.named_steps['model']
+        feature_names = list(preprocessor.get_feature_names_out())
+
+        input_names = list(preprocessor.feature_names_in_)
+        # Input column, output column, mean and scale of the scaled and passthrough columns
+        numeric_columns, numeric_index, means, scales = [], [], [], []
+        categorical = []
+
+        offset = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == 'drop':
+                continue
+            columns = [input_names[c] if not isinstance(c, str) else c for c in np.atleast_1d(columns)]
+            if len(columns) == 0:
+                continue
+
+            # Fitted passthrough columns are stored as an identity FunctionTransformer
+            if transformer == 'passthrough' or (
+                    isinstance(transformer, FunctionTransformer) and transformer.func is None):
+                numeric_columns += columns
+                numeric_index += range(offset, offset + len(columns))
+                means += [0.0] * len(columns)
+                scales += [1.0] * len(columns)
+                offset += len(columns)
+
+            elif isinstance(transformer, StandardScaler):
+                numeric_columns += columns
+                numeric_index += range(offset, offset + len(columns))
+                means += list(transformer.mean_) if transformer.with_mean else [0.0] * len(columns)
+                scales += list(transformer.scale_) if transformer.with_std else [1.0] * len(columns)
+                offset += len(columns)
+
+            elif isinstance(transformer, OneHotEncoder):
+                if getattr(transformer, '_infrequent_enabled', False):
+                    raise TypeError("OneHotEncoder with infrequent categories is not supported")
+                if transformer.handle_unknown not in ('error', 'ignore'):
+                    raise TypeError(f"Unsupported handle_unknown='{transformer.handle_unknown}'")
+                drop_idx = transformer.drop_idx_
+                for i, column in enumerate(columns):
+                    lookup = {}
+                    for j, category in enumerate(transformer.categories_[i].tolist()):
+                        if drop_idx is not None and drop_idx[i] is not None and j == drop_idx[i]:
+                            lookup[category] = -1
+                        else:
+                            lookup[category] = offset
+                            offset += 1
+                    categorical.append((column, lookup, transformer.handle_unknown))
+
+            else:
+                raise TypeError(f"Unsupported transformer '{name}' ({type(transformer).__name__})")
+
+        if offset != len(feature_names):
+            raise TypeError(f"Compiled {offset} features, the preprocessor outputs {len(feature_names)}")
+
+        try:
+            baseline = baseline_survival(model)
+        except ValueError:
+            baseline = None
+
+        # X is already a validated C-contiguous float32 matrix: skip the
+        # feature-name checks `model.predict` would repeat on every call
+        return cls(feature_names, numeric_columns, numeric_index, means, scales,
+                   categorical, model._predict, baseline)
+
+    def transform(self, columns) -> np.ndarray:
+        """
+        Encode a columnar payload into the model's float32 feature matrix.
+        Columns the model does not use (EmployeeNumber, Attrition, ...) are ignored.
+        """
+        numeric = [np.asarray(column_values(columns, c), dtype=np.float64) for c in self.numeric_columns]
+        n_rows = len(numeric[0]) if numeric else len(column_values(columns, self.categorical[0][0]))
+
+        # Zero-filled so one-hot blocks only need their hot cell set
+        X = np.zeros((n_rows, self.n_features), dtype=np.float32)
+
+        if numeric:
+            block = np.empty((n_rows, len(numeric)), dtype=np.float64)
+            for i, values in enumerate(numeric):
+                if len(values) != n_rows:
+                    raise ValueError("All columns must have the same length")
+                block[:, i] = values
+            if not np.isfinite(block).all():
+                raise ValueError("Input contains NaN or infinity")
+            block -= self.means
+            block /= self.scales
+            X[:, self.numeric_index] = block
+
+        rows = np.arange(n_rows)
+        for column, lookup, handle_unknown in self.categorical:
+            values = column_values(columns, column)
+            if len(values) != n_rows:
+                raise ValueError("All columns must have the same length")
+            codes = _category_codes(values, lookup, n_rows)
+            if handle_unknown == 'error' and (codes == -2).any():
+                unknown = sorted({str(v) for v in values if v not in lookup})
+                raise ValueError(f"Found unknown categories {unknown} in column '{column}'")
+            hot = codes >= 0
+            X[rows[hot], codes[hot]] = 1.0
+
+        return X
+
+    def predict(self, columns) -> np.ndarray:
+        """
+        Predict risk scores for a columnar payload.
+        """
+        return self.score(self.transform(columns))
+
+    def score(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict risk scores for a feature matrix built by `transform`.
+        """
+        if len(X) == 0:
+            return np.empty(0, dtype=np.float64)
+        return self._score(X)
+
+
+def compile_pipeline(pipeline):
+    """
+    Return the InferencePlan for a fitted pipeline
+
+    Return None (but do not Raise) if the pipeline cannot be compiled,
+    callers then fall back to `pipeline.predict`
+    """
+    if pipeline is None:
+        return None
+    try:
+        plan = InferencePlan.from_pipeline(pipeline)
+        print(f"✅ Inference plan compiled ({plan.n_features} features)")
+        return plan
+    except (TypeError, KeyError, AttributeError) as e:
+        print(f"⚠️ Could not compile inference plan, using the sklearn pipeline: {e}")
+        return None
@@ -1,22 +1,25 @@
 
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.compose import ColumnTransformer
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
 from colorama import Fore, Style
+import copy
+import time
 import pandas as pd
 
 from employee_attrition.ml_logic.data import load_data_to_bq
 from employee_attrition.params import *
+from employee_attrition.ml_logic.preprocessing import TRANSFORM_CHUNK_ROWS, fit_transform_cached
 
-from sksurv.ensemble import GradientBoostingSurvivalAnalysis
+from sksurv.ensemble import ComponentwiseGradientBoostingSurvivalAnalysis, GradientBoostingSurvivalAnalysis
 from sksurv.metrics import concordance_index_censored
 
 
 
 # **Create a Custom Transformer to Convert Output to DataFrame**
-# Need it for GradientBoostingSurvivalAnalysis to retain feature names
+# No longer part of new pipelines (the model is fitted on the preprocessor's float
+# array, feature names come from `get_feature_names_out`): kept so pipelines
+# pickled with a 'to_dataframe' step still load
 class ToDataFrame(BaseEstimator, TransformerMixin):
     def __init__(self, preprocessor):
         """
@@ -42,64 +45,198 @@ class ToDataFrame(BaseEstimator, TransformerMixin):
         """
         return pd.DataFrame(X, columns=self.feature_names)
 
+# Survival learners selectable with TRAIN_LEARNER
+LEARNERS = {
+    "gbsa": GradientBoostingSurvivalAnalysis,
+    # Boosts one linear feature per stage: much faster, less flexible
+    "componentwise": ComponentwiseGradientBoostingSurvivalAnalysis,
+}
+
+
+def build_learner(learner=TRAIN_LEARNER, **learner_params):
+    """
+    Return an unfitted survival learner by name (see LEARNERS), with the
+    TRAIN_* defaults for the parameters not given
+    """
+    if learner not in LEARNERS:
+        raise ValueError(f"Unknown learner '{learner}', expected one of {list(LEARNERS)}")
+    params = dict(n_estimators=TRAIN_N_ESTIMATORS, learning_rate=TRAIN_LEARNING_RATE,
+                  subsample=TRAIN_SUBSAMPLE, random_state=TRAIN_RANDOM_STATE)
+    params.update(learner_params)
+    return LEARNERS[learner](**params)
+
+
+def validation_mask(index, validation_split=0.2, random_state=TRAIN_RANDOM_STATE) -> np.ndarray:
+    """
+    Rows held out for validation, drawn from a seeded hash of the index (EmployeeNumber):
+    an employee stays on the same side of the split as the data grows, so models trained
+    on different months never see the rows they are compared on
+    """
+    # The seed is hashed along with the id: hash_key only applies to object columns
+    hashes = pd.util.hash_pandas_object(pd.DataFrame({'id': np.asarray(index), 'seed': random_state}), index=False)
+    return hashes.to_numpy() < np.uint64(validation_split * 2**64)
+
+
+def concordance_index(y, risk_scores) -> float:
+    return float(concordance_index_censored(y['event'], y['time'], risk_scores)[0])
+
+
+def predict_risk(pipeline, X: pd.DataFrame, chunk_rows=TRANSFORM_CHUNK_ROWS) -> np.ndarray:
+    """
+    Risk scores of a fitted pipeline, predicted `chunk_rows` rows at a time:
+    the preprocessed matrix of the whole table is never held at once
+    """
+    if len(X) <= chunk_rows:
+        return pipeline.predict(X)
+    return np.concatenate([pipeline.predict(X.iloc[start:start + chunk_rows])
+                           for start in range(0, len(X), chunk_rows)])
+
+
+def fit_with_early_stopping(model, X_train, y_train, X_val, y_val, eval_every=10, patience=5, tol=1e-4):
+    """
+    Grow the boosting ensemble `eval_every` stages at a time (warm start) up to its
+    n_estimators, and stop once the validation C-index has not improved by `tol`
+    for `patience` evaluations.
+    Return (the model as of its best validation C-index, [(n_stages, C-index), ...])
+    """
+    max_estimators = model.n_estimators
+    model.set_params(warm_start=True)
+
+    best_model, best_c_index, stale, history = None, -np.inf, 0, []
+    for n_stages in range(min(eval_every, max_estimators), max_estimators + eval_every, eval_every):
+        n_stages = min(n_stages, max_estimators)
+        model.set_params(n_estimators=n_stages)
+        model.fit(X_train, y_train)
+
+        c_index = concordance_index(y_val, model.predict(X_val))
+        history.append((n_stages, float(c_index)))
+        if c_index > best_c_index + tol:
+            # Snapshot: later stages keep growing the same object
+            best_model, best_c_index, stale = copy.deepcopy(model), c_index, 0
+        else:
+            stale += 1
+        if stale >= patience or n_stages == max_estimators:
+            break
+
+    best_model.set_params(warm_start=False)
+    return best_model, history
+
+
+def fit_pipeline(X_train, y_train, model, early_stopping=False, early_stopping_fraction=0.1,
+                 random_state=TRAIN_RANDOM_STATE) -> Pipeline:
+    """
+    Fit the preprocessing + survival model pipeline.
+    The preprocessor is reused from the preprocessing cache when it was already
+    fitted on the same rows; the model is fitted on its contiguous float array.
+    With `early_stopping`, `early_stopping_fraction` of the training rows is held
+    out to pick the number of boosting stages on the C-index.
+    """
+    if early_stopping:
+        X_train, X_stop, y_train, y_stop = train_test_split(
+            X_train, y_train, test_size=early_stopping_fraction, random_state=random_state
+        )
+
+    # GradientBoostingSurvivalAnalysis fits on float32 anyway: transform straight into it
+    dtype = np.float32 if isinstance(model, GradientBoostingSurvivalAnalysis) else np.float64
+    preprocessor, X_train_processed = fit_transform_cached(X_train, dtype=dtype)
+
+    if early_stopping:
+        # Preprocess once, the ensemble is grown in several fits
+        X_stop_processed = preprocessor.transform(X_stop)
+        model, history = fit_with_early_stopping(
+            model, X_train_processed, y_train, X_stop_processed, y_stop, patience=TRAIN_PATIENCE)
+        print(f"✅ Early stopping kept {model.n_estimators} stages "
+              f"(validation C-index by stages: {[(n, round(c, 4)) for n, c in history]})")
+    else:
+        model.fit(X_train_processed, y_train)
+
+    return Pipeline(steps=[
+        ('preprocessor', preprocessor),
+        ('model', model)
+    ])
+
+
 def train_model(
         X : pd.DataFrame,
         y: np.ndarray,
        # validation_data=None, # overrides validation_split
         model = None,
-        validation_split=0.2
+        validation_split=0.2,
+        early_stopping=TRAIN_EARLY_STOPPING,
+        random_state=TRAIN_RANDOM_STATE
     ) :
 
     """
     1. Get the pre-processed data from the pipeline
-    2. Implement the model
+    2. Implement the model (TRAIN_LEARNER unless `model` is given)
     3. Return the model   """
 
-    # Define numerical and categorical features
-    numerical_columns = ['Age', 'DailyRate', 'MonthlyRate','DistanceFromHome', 'HourlyRate', 'JobInvolvement',
-                        'JobLevel', 'MonthlyIncome', 'NumCompaniesWorked', 'PercentSalaryHike',
-                        'PerformanceRating','TotalWorkingYears',
-                        'TrainingTimesLastYear', 'WorkLifeBalance', 'YearsInCurrentRole',
-                        'YearsSinceLastPromotion', 'YearsWithCurrManager']
-
-    categorical_columns = ['Gender', 'BusinessTravel', 'Department', 'EducationField', 'JobRole',
-                        'MaritalStatus', 'OverTime']
-
-    # Create column transformer
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ('num', StandardScaler(), numerical_columns),
-            ('cat', OneHotEncoder(), categorical_columns)
-        ],
-        verbose_feature_names_out = False,
-        remainder='passthrough'
-    )
-
     # Split data into training and testing sets
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=validation_split
-    )
+    validation = validation_mask(X.index, validation_split, random_state)
+    X_train, X_test, y_train, y_test = X[~validation], X[validation], y[~validation], y[validation]
     # Define the model
-    model = GradientBoostingSurvivalAnalysis(n_estimators=100, learning_rate=0.1)
+    if model is None:
+        model = build_learner()
 
-    # Create the pipeline with the custom transformer
-    pipeline = Pipeline(steps=[
-        ('preprocessor', preprocessor),
-        ('to_dataframe', ToDataFrame(preprocessor=preprocessor)),  # Pass the preprocessor
-        ('model', model)
-    ])
-    # Fit the model
-    pipeline.fit(X_train, y_train)
+    start = time.perf_counter()
+    pipeline = fit_pipeline(X_train, y_train, model, early_stopping=early_stopping, random_state=random_state)
+    fit_time = time.perf_counter() - start
 
     # Predict risk scores (higher = more likely to leave sooner)
-    predicted_risk = pipeline.predict(X_test)
+    predicted_risk = predict_risk(pipeline, X_test)
     # Calculate concordance index
-    c_index = concordance_index_censored(y_test['event'], y_test['time'], predicted_risk)
+    c_index = concordance_index(y_test, predicted_risk)
 
-    print(f"✅ Model trained with Concordance Index: {c_index[0]}")
+    print(f"✅ Model trained in {fit_time:.2f}s with Concordance Index: {c_index}")
 
     return pipeline
 
+
+def compare_learners(X, y, options=None, validation_split=0.2, tolerance=0.01, random_state=TRAIN_RANDOM_STATE):
+    """
+    Fit each training option on the same split (validation_mask) and report its wall time and
+    test C-index. `options` maps a name to build_learner() keyword arguments
+    plus an optional "early_stopping" flag.
+    Return the report sorted by fit time, with `selected` marking the fastest
+    option whose C-index is within `tolerance` of the best one.
+    """
+    if options is None:
+        options = {
+            "gbsa": {"learner": "gbsa"},
+            "gbsa_early_stopping": {"learner": "gbsa", "n_estimators": 500, "early_stopping": True},
+            "gbsa_subsample": {"learner": "gbsa", "subsample": 0.5, "max_features": "sqrt"},
+            "gbsa_subsample_early_stopping": {"learner": "gbsa", "subsample": 0.5, "max_features": "sqrt",
+                                              "n_estimators": 500, "early_stopping": True},
+            "componentwise": {"learner": "componentwise", "n_estimators": 500},
+            "componentwise_early_stopping": {"learner": "componentwise", "n_estimators": 2000,
+                                             "early_stopping": True},
+        }
+
+    # Same held-out employees as train_model, so the report matches what training would see
+    validation = validation_mask(X.index, validation_split, random_state)
+    X_train, X_test, y_train, y_test = X[~validation], X[validation], y[~validation], y[validation]
+
+    rows = []
+    for name, option in options.items():
+        option = dict(option)
+        early_stopping = option.pop("early_stopping", False)
+        model = build_learner(**option)
+
+        start = time.perf_counter()
+        pipeline = fit_pipeline(X_train, y_train, model, early_stopping=early_stopping, random_state=random_state)
+        fit_time = time.perf_counter() - start
+
+        c_index = concordance_index(y_test, pipeline.predict(X_test))
+        rows.append({"option": name, "fit_time_s": fit_time, "c_index": c_index,
+                     "n_estimators": pipeline.named_steps['model'].n_estimators})
+        print(f"✅ {name}: {fit_time:.2f}s, C-index {c_index:.4f}")
+
+    report = pd.DataFrame(rows).sort_values("fit_time_s").reset_index(drop=True)
+    eligible = report["c_index"] >= report["c_index"].max() - tolerance
+    report["selected"] = False
+    report.loc[eligible.idxmax(), "selected"] = True
+    return report
+
 # implement model selection
 # def train_model_2(
 #         X_processed : pd.DataFrame,
@@ -0,0 +1,165 @@
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from google.cloud import storage
+from requests.adapters import HTTPAdapter
+
+from employee_attrition.params import *
+
+# Rows serialized per Parquet row group: uploads stream one row group at a time
+ROW_GROUP_ROWS = 100_000
+PARQUET_COMPRESSION = "zstd"
+
+
+class _AtomicWriter(io.FileIO):
+    """
+    Binary file written to a temporary name and renamed over `path` on close;
+    discarded instead if the `with` block raised
+    """
+
+    def __init__(self, path: str):
+        fd, self._tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        self._path = path
+        super().__init__(fd, "wb")
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            os.replace(self._tmp_path, self._path)
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            super().close()
+            os.remove(self._tmp_path)
+            return False
+        return super().__exit__(exc_type, exc, tb)
+
+
+class LocalBlob:
+    """
+    Object of a LocalBucket, with the subset of the `storage.Blob` API used here
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def open(self, mode="rb", **kwargs):
+        if "w" in mode:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            return _AtomicWriter(self.path)
+        return open(self.path, mode)
+
+    def download_as_bytes(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def delete(self) -> None:
+        os.remove(self.path)
+
+
+class LocalBucket:
+    """
+    Directory standing in for a GCS bucket (GCS_LOCAL_ROOT): tests and offline runs
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def blob(self, name: str) -> LocalBlob:
+        return LocalBlob(os.path.join(self.root, name))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_storage_client() -> storage.Client:
+    """
+    Return the process-wide GCS client, created once, with a connection pool sized for
+    GCS_MAX_WORKERS concurrent transfers (requests keeps 10 connections per host by default)
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            client = storage.Client()
+            adapter = HTTPAdapter(pool_connections=GCS_MAX_WORKERS, pool_maxsize=GCS_MAX_WORKERS)
+            client._http.mount("https://", adapter)
+            client._http.mount("http://", adapter)
+            _client = client
+    return _client
+
+
+def get_bucket(bucket_name=None):
+    """
+    Return the bucket holding the processed data: BUCKET_NAME on GCS, or its
+    directory under GCS_LOCAL_ROOT when set
+    """
+    bucket_name = bucket_name or BUCKET_NAME
+    if GCS_LOCAL_ROOT is not None:
+        return LocalBucket(os.path.join(GCS_LOCAL_ROOT, bucket_name))
+    return get_storage_client().bucket(bucket_name)
+
+
+def columnar_name(name: str) -> str:
+    """
+    Object name of the Parquet copy of a data file: `risk.csv` -> `risk.parquet`
+    """
+    return os.path.splitext(name)[0] + ".parquet"
+
+
+def upload_frame(bucket, name: str, df: pd.DataFrame, row_group_rows=ROW_GROUP_ROWS) -> str:
+    """
+    Write `df` (index included) to the object `name` as compressed Parquet, serialized
+    one row group at a time straight into the upload stream: neither the whole file nor
+    a text copy of the frame is held in memory. Return the object name.
+    """
+    blob = bucket.blob(name)
+    first = pa.Table.from_pandas(df.iloc[:row_group_rows], preserve_index=True)
+    with blob.open("wb", chunk_size=GCS_UPLOAD_CHUNK_MB * 1024 * 1024, ignore_flush=True) as f:
+        with pq.ParquetWriter(f, first.schema, compression=PARQUET_COMPRESSION) as writer:
+            writer.write_table(first)
+            for start in range(row_group_rows, len(df), row_group_rows):
+                chunk = df.iloc[start:start + row_group_rows]
+                writer.write_table(pa.Table.from_pandas(chunk, schema=first.schema, preserve_index=True))
+    return name
+
+
+def download_frame(bucket, name: str, columns=None) -> pd.DataFrame:
+    """
+    Read a frame written by `upload_frame`, only `columns` if given (index included
+    when listed). The compressed object is downloaded in one request and decoded
+    from memory.
+    """
+    data = bucket.blob(name).download_as_bytes()
+    return pq.read_table(pa.BufferReader(data), columns=columns).to_pandas()
+
+
+def delete_object(bucket, name: str) -> bool:
+    """
+    Delete the object `name` if it exists. Return whether there was one.
+    """
+    blob = bucket.blob(name)
+    if not blob.exists():
+        return False
+    blob.delete()
+    return True
+
+
+def upload_frames(frames: dict, bucket=None, max_workers=GCS_MAX_WORKERS) -> list:
+    """
+    Upload {object name: DataFrame} concurrently (see `upload_frame`).
+    Return the object names, raise the first failure.
+    """
+    bucket = bucket or get_bucket()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(frames)))) as pool:
+        futures = [pool.submit(upload_frame, bucket, name, df) for name, df in frames.items()]
+        return [future.result() for future in futures]
+
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+from employee_attrition.params import *
+from employee_attrition.ml_logic.artifact_cache import ArtifactCache
+
+# Feature columns are declared with the employee table schema
+from employee_attrition.ml_logic.schema import NUMERICAL_COLUMNS, CATEGORICAL_COLUMNS, PASSTHROUGH_COLUMNS
+
+# Rows transformed at a time into the training matrix
+TRANSFORM_CHUNK_ROWS = 100_000
+
+
+def build_preprocessor() -> ColumnTransformer:
+    """
+    Scale the numerical columns, one-hot encode the categorical ones and pass the
+    ordinal scores through, as one dense float array (feature names stay available
+    from `get_feature_names_out`). Other columns, such as the target, are ignored,
+    so the raw table can be passed without dropping them first.
+    """
+    return ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), NUMERICAL_COLUMNS),
+            ('cat', OneHotEncoder(sparse_output=False), CATEGORICAL_COLUMNS),
+            ('ordinal', 'passthrough', PASSTHROUGH_COLUMNS)
+        ],
+        verbose_feature_names_out = False,
+        remainder='drop'
+    )
+
+
+def transform_chunked(preprocessor, X: pd.DataFrame, dtype=np.float64) -> np.ndarray:
+    """
+    Transform X with a fitted preprocessor into a contiguous `dtype` array, filled
+    TRANSFORM_CHUNK_ROWS rows at a time: only the output and one chunk's intermediate
+    blocks are held, not float64 copies of every block of the whole table
+    """
+    n_features = len(preprocessor.get_feature_names_out())
+    out = np.empty((len(X), n_features), dtype=dtype)
+    for start in range(0, len(X), TRANSFORM_CHUNK_ROWS):
+        out[start:start + TRANSFORM_CHUNK_ROWS] = preprocessor.transform(X.iloc[start:start + TRANSFORM_CHUNK_ROWS])
+    return out
+
+
+def fit_chunked(preprocessor: ColumnTransformer, X: pd.DataFrame) -> ColumnTransformer:
+    """
+    Fit a `build_preprocessor` transformer without transforming the whole table, which
+    `ColumnTransformer.fit` does: it is fitted on the rows where a category first
+    appears (the encoder learns the same categories), then its scaler is refitted on
+    every row with `partial_fit`, TRANSFORM_CHUNK_ROWS rows at a time
+    """
+    first = np.zeros(len(X), dtype=bool)
+    for column in CATEGORICAL_COLUMNS:
+        first |= ~X[column].duplicated().to_numpy()
+    preprocessor.fit(X[first])
+
+    for i, (name, transformer, columns) in enumerate(preprocessor.transformers_):
+        if isinstance(transformer, StandardScaler):
+            scaler = sklearn.clone(transformer)
+            for start in range(0, len(X), TRANSFORM_CHUNK_ROWS):
+                scaler.partial_fit(X.iloc[start:start + TRANSFORM_CHUNK_ROWS][columns])
+            preprocessor.transformers_[i] = (name, scaler, columns)
+    return preprocessor
+
+
+def data_fingerprint(X: pd.DataFrame, y: np.ndarray = None) -> str:
+    """
+    Content hash of the features (values, index and column names) and survival target
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(map(str, X.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=True).to_numpy().tobytes())
+    if y is not None:
+        digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()
+
+
+_preprocessing_cache = None
+
+def get_preprocessing_cache():
+    """
+    Return the local cache of fitted preprocessors, None if PREPROCESSING_CACHE_MAX_MB is 0
+    """
+    global _preprocessing_cache
+    if _preprocessing_cache is None and PREPROCESSING_CACHE_MAX_MB > 0:
+        _preprocessing_cache = ArtifactCache(PREPROCESSING_CACHE_DIR, PREPROCESSING_CACHE_MAX_MB * 1024 * 1024)
+    return _preprocessing_cache
+
+
+def fit_transform_cached(X_train: pd.DataFrame, dtype=np.float64):
+    """
+    Fit the preprocessor on X_train and transform it: (fitted preprocessor, `dtype` array).
+
+    Both are cached on disk under a key made of the training rows' fingerprint
+    (so the split is part of it), the column spec, the dtype and the scikit-learn
+    version: repeated experiments on the same rows reuse them instead of refitting.
+    """
+    preprocessor = build_preprocessor()
+    key = hashlib.sha256("|".join([
+        data_fingerprint(X_train),
+        json.dumps([NUMERICAL_COLUMNS, CATEGORICAL_COLUMNS, PASSTHROUGH_COLUMNS]),
+        repr(preprocessor),
+        np.dtype(dtype).name,
+        sklearn.__version__,
+    ]).encode()).hexdigest()
+
+    cache = get_preprocessing_cache()
+    cached = cache.open("preprocessing", key) if cache is not None else None
+    if cached is not None:
+        with cached as f:
+            return pickle.load(f)
+
+    # Fitting only learns the scaling statistics and categories
+    fit_chunked(preprocessor, X_train)
+    X_processed = transform_chunked(preprocessor, X_train, dtype)
+    if cache is not None:
+        # Pickled straight to a file: no in-memory copy of the matrix
+        fd, tmp_path = tempfile.mkstemp(dir=cache.objects_dir)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((preprocessor, X_processed), f, protocol=pickle.HIGHEST_PROTOCOL)
+        cache.put_file("preprocessing", key, tmp_path)
+    return preprocessor, X_processed
@@ -1,16 +1,20 @@
 import glob
 import os
+import tempfile
 import time
 import pickle
-import tempfile
 
 from colorama import Fore, Style
-from google.cloud import storage
 from sklearn.pipeline import Pipeline
 
 from employee_attrition.params import *
+from employee_attrition.ml_logic.artifact_cache import ArtifactCache
+from employee_attrition.ml_logic.export import export_model
+from employee_attrition.ml_logic.object_store import get_storage_client
 import mlflow
+import mlflow.artifacts
 import mlflow.sklearn
+from mlflow.models import Model
 from mlflow.tracking import MlflowClient
 
 # def save_results(params: dict, metrics: dict) -> None:
@@ -64,17 +68,30 @@ def save_model(pipeline: Optional[Pipeline] = None) -> None:
         if not os.path.exists(model_path):
             os.makedirs(model_path)
 
-        with open(full_model_path, 'wb') as f:
+        # Write then rename, so a model watcher never loads a half-written file
+        with open(f"{full_model_path}.tmp", 'wb') as f:
             pickle.dump(pipeline, f)
-            print("✅ Model saved locally")
+        os.replace(f"{full_model_path}.tmp", full_model_path)
+        print("✅ Model saved locally")
+
+        # Pickle-free, memory-mappable copy for inference-only loading
+        try:
+            export_model(pipeline, os.path.join(model_path, f"{timestamp}.eam"))
+            print("✅ Model exported locally")
+        except TypeError as e:
+            print(f"⚠️ Model not exported: {e}")
         return None
 
     if MODEL_TARGET == "gcs":
-        client = storage.Client()
-        bucket = client.bucket(BUCKET_NAME)
+        bucket = get_storage_client().bucket(BUCKET_NAME)
         blob = bucket.blob(f"models/{model_filename}")
         blob.upload_from_string(pickle.dumps(pipeline))
 
+        # Written last: a poller reads the latest model from this one object's metadata
+        pointer = bucket.blob(LATEST_MODEL_POINTER)
+        pointer.metadata = {"name": blob.name, "generation": str(blob.generation)}
+        pointer.upload_from_string(blob.name)
+
         print("✅ Model saved to GCS")
 
         return None
@@ -93,15 +110,21 @@ def save_model(pipeline: Optional[Pipeline] = None) -> None:
     return None
 
 
-def load_model(stage="Production"):
-    """
-    Return a saved model:
-    - locally (latest one in alphabetical order)
-    - or from GCS (most recent one) if MODEL_TARGET=='gcs'  --> for unit 02 only
-    - or from MLFLOW (by "stage") if MODEL_TARGET=='mlflow' --> for unit 03 only
+# GCS object naming the latest model saved under "models/" (in its metadata)
+LATEST_MODEL_POINTER = "models/LATEST"
 
-    Return None (but do not Raise) if no model is found
 
+def _latest_model_ref(stage="Production"):
+    """
+    Find the latest model with a cheap metadata call, without downloading it:
+    - locally: the most recent file, versioned by its mtime and size
+    - on GCS: the blob named by the LATEST_MODEL_POINTER object, versioned by its
+      generation (the most recent blob under "models/" if there is no pointer yet)
+    - on MLflow: the model version in `stage`
+
+    Return (source, version, fetch) where fetch(directory) downloads the pickled
+    pipeline into `directory` and returns its path (a local model is not copied),
+    or None if no model is found
     """
 
     if MODEL_TARGET == "local":
@@ -116,51 +139,159 @@ def load_model(stage="Production"):
 
         # Get most recent model
         latest_model_path = max(model_files, key=os.path.getctime)
+        stat = os.stat(latest_model_path)
+
+        def fetch(directory):
+            return latest_model_path
 
-        with open(latest_model_path, 'rb') as f:
-            pipeline = pickle.load(f)
-            print(f"✅ Model loaded from local disk: {latest_model_path}")
-            return pipeline
+        return latest_model_path, f"{stat.st_mtime_ns}-{stat.st_size}", fetch
 
     elif MODEL_TARGET == "gcs":
 
-        client = storage.Client()
-        bucket = client.bucket(BUCKET_NAME)
-        blobs = list(bucket.list_blobs(prefix="models/"))
+        bucket = get_storage_client().bucket(BUCKET_NAME)
+        pointer = bucket.get_blob(LATEST_MODEL_POINTER)
+
+        if pointer is not None and pointer.metadata:
+            # One metadata get: that exact generation is downloaded, even if a newer model lands meanwhile
+            latest_blob = bucket.blob(pointer.metadata["name"], generation=int(pointer.metadata["generation"]))
+        else:
+            # Models saved before the pointer existed: list them all
+            blobs = [blob for blob in bucket.list_blobs(prefix="models/") if blob.name != LATEST_MODEL_POINTER]
+            if not blobs:
+                print("❌ No model found in GCS")
+                return None
+            latest_blob = max(blobs, key=lambda x: x.time_created)
 
-        if not blobs:
-            print("❌ No model found in GCS")
+        def fetch(directory):
+            path = os.path.join(directory, os.path.basename(latest_blob.name))
+            latest_blob.download_to_filename(path)
+            return path
+
+        return f"gs://{BUCKET_NAME}/{latest_blob.name}", str(latest_blob.generation), fetch
+
+    elif MODEL_TARGET == "mlflow":
+        mlflow.set_tracking_uri(MLFLOW_TRACKING_URI) # type: ignore
+        client = MlflowClient()
+
+        versions = client.get_latest_versions(name=MLFLOW_MODEL_NAME, stages=[stage])
+        if not versions:
+            print(f"❌ No model found in MLflow (stage: {stage})")
             return None
 
-        try:
-            # Get most recent model
-            latest_blob = max(blobs, key=lambda x: x.time_created)
+        version = versions[0]
 
-            # Download the model to a temporary file
-            with tempfile.NamedTemporaryFile() as temp_file:
-                latest_blob.download_to_filename(temp_file.name)
-                pipeline = pickle.load(open(temp_file.name, 'rb'))
+        def fetch(directory):
+            # The pickle file as logged, not a reload of the model
+            model_dir = mlflow.artifacts.download_artifacts(
+                artifact_uri=f"models:/{MLFLOW_MODEL_NAME}/{version.version}", dst_path=directory)
+            flavor = Model.load(model_dir).flavors["sklearn"]
+            if flavor.get("serialization_format") not in ("pickle", "cloudpickle"):
+                raise ValueError(f"Model serialized as {flavor.get('serialization_format')}, not pickle")
+            return os.path.join(model_dir, flavor["pickled_model"])
 
-            print(f"✅ Model loaded from GCS: {latest_blob.name}")
-            return pipeline
-        except:
-            print(f"\n❌ No model found in GCS bucket {BUCKET_NAME}")
+        return f"models:/{MLFLOW_MODEL_NAME}", f"{version.version}-{version.run_id}", fetch
 
-            return None
+    return None
 
-    elif MODEL_TARGET == "mlflow":
-        # Load model from MLflow
-        model_uri = f"models:/{MLFLOW_MODEL_NAME}/{stage}"
-        try:
-            pipeline = mlflow.sklearn.load_model(model_uri)
-            print(f"✅ Model loaded from MLflow (stage: {stage})")
-            return pipeline
-        except Exception as e:
-            print(f"❌ No model found in MLflow: {e}")
-            return None
-    else:
+
+_artifact_cache = None
+
+def get_artifact_cache():
+    """
+    Return the local model artifact cache, None if MODEL_CACHE_MAX_MB is 0
+    """
+    global _artifact_cache
+    if _artifact_cache is None and MODEL_CACHE_MAX_MB > 0:
+        _artifact_cache = ArtifactCache(MODEL_CACHE_DIR, MODEL_CACHE_MAX_MB * 1024 * 1024)
+    return _artifact_cache
+
+
+def get_model_version(stage="Production"):
+    """
+    Return an identifier of the latest model in MODEL_TARGET ("<source>@<version>")
+    from metadata only, or None if no model is found
+    """
+    try:
+        ref = _latest_model_ref(stage)
+    except Exception as e:
+        print(f"❌ Could not look up the latest model: {e}")
+        return None
+    if ref is None:
+        return None
+    source, version, _ = ref
+    return f"{source}@{version}"
+
+
+def load_model_with_version(stage="Production"):
+    """
+    Same as `load_model`, also returning the identifier of the loaded version
+    (see `get_model_version`): (pipeline, version), (None, None) if no model is found
+    """
+    try:
+        ref = _latest_model_ref(stage)
+        if ref is None:
+            return None, None
+        source, version, fetch = ref
+
+        # Local models are already on disk
+        cache = get_artifact_cache() if MODEL_TARGET != "local" else None
+        cached = cache.open(source, version) if cache is not None else None
+        if cached is not None:
+            print(f"✅ Model {source} (version {version}) found in local cache")
+            with cached as f:
+                pipeline = pickle.load(f)
+        else:
+            # Downloaded next to the cache, then moved into it once opened
+            with tempfile.TemporaryDirectory(dir=cache.root if cache is not None else None) as directory:
+                with open(fetch(directory), 'rb') as f:
+                    if cache is not None:
+                        cache.put_file(source, version, f.name)
+                    pipeline = pickle.load(f)
+
+        print(f"✅ Model loaded from {MODEL_TARGET}: {source} (version {version})")
+        return pipeline, f"{source}@{version}"
+
+    except Exception as e:
+        print(f"❌ No model found in {MODEL_TARGET}: {e}")
+        return None, None
+
+
+def export_serving_model(path: Optional[str] = None, stage="Production"):
+    """
+    Load the latest model and export it to `path` (default SERVING_MODEL_PATH)
+    for the API workers, which memory-map the file and share one copy of the model.
+    Return the exported model version, None if there is no model to export
+    """
+    path = path or SERVING_MODEL_PATH
+    if path is None:
+        raise ValueError("No export path given and SERVING_MODEL_PATH is not set")
+
+    pipeline, version = load_model_with_version(stage)
+    if pipeline is None:
         return None
 
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    export_model(pipeline, path, metadata={"model_version": version})
+    print(f"✅ Model {version} exported for serving to {path}")
+    return version
+
+
+def load_model(stage="Production"):
+    """
+    Return a saved model:
+    - locally (latest one in alphabetical order)
+    - or from GCS (most recent one) if MODEL_TARGET=='gcs'  --> for unit 02 only
+    - or from MLFLOW (by "stage") if MODEL_TARGET=='mlflow' --> for unit 03 only
+
+    Downloads go through the local artifact cache: a version that is already
+    cached is loaded from disk after a metadata-only freshness check.
+
+    Return None (but do not Raise) if no model is found
+
+    """
+    pipeline, _ = load_model_with_version(stage)
+    return pipeline
+
 
 
 def mlflow_transition_model(current_stage: str, new_stage: str) -> None:
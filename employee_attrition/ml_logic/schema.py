@@ -0,0 +1,193 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Declared schema of the HR employee table (RAW_DATA), in file order:
+# categorical columns with their domain, integer columns with the smallest type
+# holding their range
+CATEGORIES = {
+    'Attrition': ['No', 'Yes'],
+    'BusinessTravel': ['Non-Travel', 'Travel_Frequently', 'Travel_Rarely'],
+    'Department': ['Human Resources', 'Research & Development', 'Sales'],
+    'EducationField': ['Human Resources', 'Life Sciences', 'Marketing', 'Medical', 'Other', 'Technical Degree'],
+    'Gender': ['Female', 'Male'],
+    'JobRole': ['Healthcare Representative', 'Human Resources', 'Laboratory Technician', 'Manager',
+                'Manufacturing Director', 'Research Director', 'Research Scientist', 'Sales Executive',
+                'Sales Representative'],
+    'MaritalStatus': ['Divorced', 'Married', 'Single'],
+    'Over18': ['Y'],
+    'OverTime': ['No', 'Yes'],
+}
+
+EMPLOYEE_DTYPES = {
+    'Age': 'int8',
+    'Attrition': pd.CategoricalDtype(CATEGORIES['Attrition']),
+    'BusinessTravel': pd.CategoricalDtype(CATEGORIES['BusinessTravel']),
+    'DailyRate': 'int16',
+    'Department': pd.CategoricalDtype(CATEGORIES['Department']),
+    'DistanceFromHome': 'int8',
+    'Education': 'int8',
+    'EducationField': pd.CategoricalDtype(CATEGORIES['EducationField']),
+    'EmployeeCount': 'int8',
+    'EmployeeNumber': 'int32',
+    'EnvironmentSatisfaction': 'int8',
+    'Gender': pd.CategoricalDtype(CATEGORIES['Gender']),
+    'HourlyRate': 'int16',
+    'JobInvolvement': 'int8',
+    'JobLevel': 'int8',
+    'JobRole': pd.CategoricalDtype(CATEGORIES['JobRole']),
+    'JobSatisfaction': 'int8',
+    'MaritalStatus': pd.CategoricalDtype(CATEGORIES['MaritalStatus']),
+    'MonthlyIncome': 'int32',
+    'MonthlyRate': 'int32',
+    'NumCompaniesWorked': 'int8',
+    'Over18': pd.CategoricalDtype(CATEGORIES['Over18']),
+    'OverTime': pd.CategoricalDtype(CATEGORIES['OverTime']),
+    'PercentSalaryHike': 'int8',
+    'PerformanceRating': 'int8',
+    'RelationshipSatisfaction': 'int8',
+    'StandardHours': 'int16',
+    'StockOptionLevel': 'int8',
+    'TotalWorkingYears': 'int8',
+    'TrainingTimesLastYear': 'int8',
+    'WorkLifeBalance': 'int8',
+    'YearsAtCompany': 'int8',
+    'YearsInCurrentRole': 'int8',
+    'YearsSinceLastPromotion': 'int8',
+    'YearsWithCurrManager': 'int8',
+}
+
+# Constant columns dropped on load, survival target
+DROPPED_COLUMNS = ['EmployeeCount', 'StandardHours', 'Over18']
+TARGET_COLUMNS = ['Attrition', 'YearsAtCompany']
+
+# Model features: scaled, one-hot encoded, and ordinal scores used as they are
+NUMERICAL_COLUMNS = ['Age', 'DailyRate', 'MonthlyRate','DistanceFromHome', 'HourlyRate', 'JobInvolvement',
+                     'JobLevel', 'MonthlyIncome', 'NumCompaniesWorked', 'PercentSalaryHike',
+                     'PerformanceRating','TotalWorkingYears',
+                     'TrainingTimesLastYear', 'WorkLifeBalance', 'YearsInCurrentRole',
+                     'YearsSinceLastPromotion', 'YearsWithCurrManager']
+
+CATEGORICAL_COLUMNS = ['Gender', 'BusinessTravel', 'Department', 'EducationField', 'JobRole',
+                       'MaritalStatus', 'OverTime']
+
+PASSTHROUGH_COLUMNS = ['Education', 'EnvironmentSatisfaction', 'JobSatisfaction',
+                       'RelationshipSatisfaction', 'StockOptionLevel']
+
+FEATURE_COLUMNS = NUMERICAL_COLUMNS + CATEGORICAL_COLUMNS + PASSTHROUGH_COLUMNS
+
+# Columns `get_data` loads by default, in file order (EmployeeNumber becomes the index)
+LOADED_COLUMNS = [column for column in EMPLOYEE_DTYPES if column not in DROPPED_COLUMNS]
+
+# Row filters are (column, operator, value) tuples, all of which must hold,
+# as understood by pyarrow's Parquet reader
+FILTER_OPERATORS = {
+    '==': lambda values, value: values == value,
+    '=': lambda values, value: values == value,
+    '!=': lambda values, value: values != value,
+    '<': lambda values, value: values < value,
+    '<=': lambda values, value: values <= value,
+    '>': lambda values, value: values > value,
+    '>=': lambda values, value: values >= value,
+    'in': lambda values, value: values.isin(value),
+    'not in': lambda values, value: ~values.isin(value),
+}
+
+# Changes whenever the declared schema does: cached typed copies of the table are rebuilt
+SCHEMA_VERSION = hashlib.sha256(repr(sorted((c, str(d), CATEGORIES.get(c)) for c, d in EMPLOYEE_DTYPES.items()))
+                                .encode()).hexdigest()[:16]
+
+
+def check_filters(filters) -> None:
+    """
+    Raise ValueError on a filter operator outside FILTER_OPERATORS, before any reader sees it
+    """
+    for _, operator, _ in filters or []:
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unknown filter operator '{operator}', expected one of {list(FILTER_OPERATORS)}")
+
+
+def filter_mask(df: pd.DataFrame, filters) -> np.ndarray:
+    """
+    Boolean mask of the rows of `df` matching all `filters` (see FILTER_OPERATORS)
+    """
+    check_filters(filters)
+    mask = np.ones(len(df), dtype=bool)
+    for column, operator, value in filters or []:
+        mask &= np.asarray(FILTER_OPERATORS[operator](df[column], value), dtype=bool)
+    return mask
+
+
+def validate_employee_table(df: pd.DataFrame, columns=None) -> None:
+    """
+    Check a raw employee table against the schema before casting it:
+    every declared column (of `columns` if given) present, no missing values,
+    categories inside their domain and integers inside their type's range.
+    Raise ValueError listing the problems.
+    """
+    problems = []
+    expected = list(EMPLOYEE_DTYPES) if columns is None else columns
+    missing = [column for column in expected if column not in df.columns]
+    if missing:
+        problems.append(f"missing columns {missing}")
+
+    for column, dtype in EMPLOYEE_DTYPES.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if values.isna().any():
+            problems.append(f"{column}: {int(values.isna().sum())} missing values")
+        elif isinstance(dtype, pd.CategoricalDtype):
+            observed = values.cat.categories if isinstance(values.dtype, pd.CategoricalDtype) else values.unique()
+            unknown = sorted(set(map(str, observed)) - set(dtype.categories))
+            if unknown:
+                problems.append(f"{column}: values {unknown} outside {list(dtype.categories)}")
+        else:
+            if not pd.api.types.is_integer_dtype(values):
+                problems.append(f"{column}: expected integers, got {values.dtype}")
+                continue
+            info = np.iinfo(dtype)
+            if len(values) and (values.min() < info.min or values.max() > info.max):
+                problems.append(f"{column}: values outside the {dtype} range [{info.min}, {info.max}]")
+
+    if problems:
+        raise ValueError("Employee table does not match the schema: " + "; ".join(problems))
+
+
+def apply_schema(df: pd.DataFrame, columns=None) -> pd.DataFrame:
+    """
+    Validate the table (expecting `columns`, default all) and cast its declared
+    columns to their compact dtypes, in place
+    """
+    validate_employee_table(df, columns)
+    for column, dtype in EMPLOYEE_DTYPES.items():
+        if column in df.columns:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def iter_employee_csv(path, chunksize=100_000, columns=None, filters=None):
+    """
+    Parse the employee CSV (local path, gs:// URL or buffer) `chunksize` rows at a time,
+    yielding each chunk in the schema dtypes with only `columns` (default all) and the
+    rows matching `filters`: no object-dtype copy of the whole table is ever held
+    """
+    columns = list(EMPLOYEE_DTYPES) if columns is None else list(columns)
+    filter_columns = [column for column, _, _ in filters or [] if column not in columns]
+    usecols = [column for column in EMPLOYEE_DTYPES if column in columns or column in filter_columns]
+    categorical = {column: 'category' for column in CATEGORIES if column in usecols}
+
+    for chunk in pd.read_csv(path, dtype=categorical, usecols=usecols, chunksize=chunksize):
+        apply_schema(chunk, usecols)
+        if filters:
+            chunk = chunk[filter_mask(chunk, filters)]
+        yield chunk[[column for column in usecols if column in columns]]
+
+
+def read_employee_csv(path, chunksize=100_000, columns=None, filters=None) -> pd.DataFrame:
+    """
+    Parse the employee CSV into the schema dtypes (see `iter_employee_csv`)
+    """
+    chunks = list(iter_employee_csv(path, chunksize, columns, filters))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
@@ -0,0 +1,144 @@
+import heapq
+import os
+import pickle
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from employee_attrition.params import *
+from employee_attrition.ml_logic.export import export_model, load_exported_model
+
+# Model of a scoring worker process, loaded once by `_init_worker`
+_worker_model = None
+
+
+def _init_worker(model_path: str, exported: bool) -> None:
+    global _worker_model
+    if exported:
+        # Memory-mapped: the workers share one copy of the model
+        _worker_model = load_exported_model(model_path)
+    else:
+        with open(model_path, "rb") as f:
+            _worker_model = pickle.load(f)
+
+
+def _score_chunk(features: pd.DataFrame) -> np.ndarray:
+    return np.asarray(_worker_model.predict(features), dtype=np.float64)
+
+
+def _write_worker_model(pipeline, directory: str):
+    """
+    Write the model the workers load: the memory-mappable export, or the pickled
+    pipeline for models the export format does not cover. Return (path, exported)
+    """
+    path = os.path.join(directory, "model.eam")
+    try:
+        export_model(pipeline, path)
+        return path, True
+    except TypeError:
+        path = os.path.join(directory, "model.pkl")
+        with open(path, "wb") as f:
+            pickle.dump(pipeline, f)
+        return path, False
+
+
+def _push_top_k(heap: list, scored: pd.DataFrame, first_row: int, top_k: int) -> None:
+    """
+    Merge the rows of a scored chunk into the running top-K min-heap of
+    (PredictedRisk, -row number, row): only the chunk's own top-K candidates,
+    found with a partial sort, are pushed. Ties keep the earlier row.
+    """
+    risk = scored['PredictedRisk'].to_numpy()
+    candidates = np.arange(len(risk))
+    if len(risk) > top_k:
+        candidates = np.argpartition(-risk, top_k - 1)[:top_k]
+    if len(heap) == top_k:
+        candidates = candidates[risk[candidates] >= heap[0][0]]
+
+    rows = scored.iloc[candidates]
+    for position, risk_value, row in zip(candidates, risk[candidates], rows.itertuples(name=None)):
+        entry = (float(risk_value), -(first_row + int(position)), row)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+
+def score_chunks(
+        pipeline,
+        chunks,
+        output_path: str,
+        top_k=SCORING_TOP_K,
+        n_jobs=SCORING_N_JOBS,
+    ) -> pd.DataFrame:
+    """
+    Score a stream of employee chunks (DataFrames indexed by EmployeeNumber) on
+    `n_jobs` worker processes (0 for all cores) and write them to `output_path` as
+    they complete, as Parquet: the chunk's columns, PredictedRisk, then YearsAtCompany.
+
+    At most 2 * n_jobs chunks are in flight, so memory does not grow with the table;
+    the output keeps the input order and replaces `output_path` once complete.
+    Return the `top_k` highest-risk employees, highest first, kept with a heap
+    instead of sorting the whole output.
+    """
+    if top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+    n_jobs = n_jobs or os.cpu_count()
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    heap, writer, columns, schema, n_rows = [], None, None, None, 0
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)), suffix=".parquet")
+    os.close(fd)
+    try:
+        with tempfile.TemporaryDirectory() as model_dir:
+            model_path, exported = _write_worker_model(pipeline, model_dir)
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                     initargs=(model_path, exported)) as pool:
+                pending = deque()
+
+                def write_next():
+                    nonlocal writer, columns, schema, n_rows
+                    scored, years, future = pending.popleft()
+                    scored['PredictedRisk'] = future.result()
+                    if years is not None:
+                        scored['YearsAtCompany'] = years
+                    _push_top_k(heap, scored, n_rows, top_k)
+
+                    table = pa.Table.from_pandas(scored, preserve_index=True)
+                    if writer is None:
+                        columns, schema = [scored.index.name] + list(scored.columns), table.schema
+                        writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+                    writer.write_table(table.cast(writer.schema))
+                    n_rows += len(scored)
+
+                for chunk in chunks:
+                    # Only the model features go to the workers
+                    features = chunk.drop(columns=['YearsAtCompany', 'Attrition'], errors='ignore')
+                    years = chunk['YearsAtCompany'] if 'YearsAtCompany' in chunk.columns else None
+                    pending.append((features, years, pool.submit(_score_chunk, features)))
+                    if len(pending) >= 2 * n_jobs:
+                        write_next()
+                while pending:
+                    write_next()
+
+        if writer is None:
+            raise ValueError("No employees to score")
+        writer.close()
+        os.replace(tmp_path, output_path)
+    finally:
+        if writer is not None and writer.is_open:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    top = sorted(heap, reverse=True)
+    top_df = pd.DataFrame([row for _, _, row in top], columns=columns).set_index(columns[0])
+    # Back to the output's dtypes (compact integers, categories), lost in the heap's tuples
+    top_df = pa.Table.from_pandas(top_df, preserve_index=True).cast(schema).to_pandas()
+    print(f"✅ {n_rows} employees scored to {output_path}")
+    return top_df
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from colorama import Fore, Style
+from sklearn.model_selection import KFold, ParameterSampler
+
+from employee_attrition.params import *
+from employee_attrition.ml_logic.model import build_learner, concordance_index
+from employee_attrition.ml_logic.preprocessing import (
+    NUMERICAL_COLUMNS, CATEGORICAL_COLUMNS, PASSTHROUGH_COLUMNS, build_preprocessor, data_fingerprint,
+    fit_chunked, transform_chunked,
+)
+
+# Hyperparameters sampled for the GradientBoostingSurvivalAnalysis candidates;
+# n_estimators is the budget allocated by successive halving
+SEARCH_SPACE = {
+    "learning_rate": [0.03, 0.05, 0.1, 0.2],
+    "max_depth": [2, 3, 4, 5],
+    "min_samples_leaf": [1, 5, 10, 20],
+    "subsample": [0.5, 0.8, 1.0],
+    "max_features": [None, "sqrt", 0.5],
+}
+
+
+def _atomic_save(path: str, array: np.ndarray) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npy")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def cache_fold_matrices(X: pd.DataFrame, y: np.ndarray, folds_dir: str, n_splits: int, random_state: int) -> list:
+    """
+    Preprocess every CV fold once (preprocessor fitted on the fold's training rows)
+    and store the float32 matrices and targets as .npy files under `folds_dir`.
+    Folds already on disk are reused. Return the list of fold directories.
+    """
+    fold_dirs = []
+    splits = KFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(X)
+    for k, (train_index, val_index) in enumerate(splits):
+        fold_dir = os.path.join(folds_dir, f"fold_{k}")
+        fold_dirs.append(fold_dir)
+        if os.path.exists(os.path.join(fold_dir, "y_val.npy")):
+            continue
+
+        os.makedirs(fold_dir, exist_ok=True)
+        X_fold = X.iloc[train_index]
+        # Fitted chunk-wise like the training pipeline: same statistics, no full-table transform
+        preprocessor = fit_chunked(build_preprocessor(), X_fold)
+        X_train = transform_chunked(preprocessor, X_fold, np.float32)
+        X_val = transform_chunked(preprocessor, X.iloc[val_index], np.float32)
+        _atomic_save(os.path.join(fold_dir, "X_train.npy"), X_train)
+        _atomic_save(os.path.join(fold_dir, "y_train.npy"), y[train_index])
+        _atomic_save(os.path.join(fold_dir, "X_val.npy"), X_val)
+        # Written last: its presence marks a complete fold
+        _atomic_save(os.path.join(fold_dir, "y_val.npy"), y[val_index])
+    return fold_dirs
+
+
+def _evaluate_fold(params: dict, n_estimators: int, fold_dir: str) -> float:
+    """
+    Fit one candidate on one cached fold and return its validation C-index.
+    Runs in a worker process: the fold matrices are memory-mapped, not pickled.
+    """
+    load = lambda name: np.load(os.path.join(fold_dir, f"{name}.npy"), mmap_mode="r")
+    model = build_learner("gbsa", n_estimators=n_estimators, **params)
+    model.fit(load("X_train"), np.asarray(load("y_train")))
+    return concordance_index(np.asarray(load("y_val")), model.predict(load("X_val")))
+
+
+class Checkpoint:
+    """
+    Completed (candidate, budget, fold) evaluations of a search, saved to a JSON
+    file after each one so an interrupted search resumes where it stopped.
+    """
+
+    def __init__(self, path: str, config: dict):
+        self.path = path
+        self.state = {"config": config, "scores": {}}
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved.get("config") == config:
+                self.state = saved
+
+    @staticmethod
+    def key(candidate: int, n_estimators: int, fold: int) -> str:
+        return f"{candidate}|{n_estimators}|{fold}"
+
+    def get(self, key):
+        return self.state["scores"].get(key)
+
+    def record(self, key, score: float) -> None:
+        self.state["scores"][key] = score
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+
+def successive_halving(
+        X: pd.DataFrame,
+        y: np.ndarray,
+        n_candidates=SELECTION_N_CANDIDATES,
+        min_estimators=SELECTION_MIN_ESTIMATORS,
+        max_estimators=SELECTION_MAX_ESTIMATORS,
+        eta=3,
+        n_splits=5,
+        n_jobs=SELECTION_N_JOBS,
+        random_state=TRAIN_RANDOM_STATE,
+    ):
+    """
+    Successive-halving search over SEARCH_SPACE with cross-validated C-index.
+
+    Every rung scores the remaining candidates with `n_estimators` boosting stages
+    on all folds, keeps the best 1/eta of them and multiplies the budget by eta,
+    from `min_estimators` up to `max_estimators`. Fold fits run on a process pool;
+    preprocessed fold matrices and completed fits are cached under SELECTION_DIR.
+
+    Return (best params, its mean CV C-index, report DataFrame of all rung scores)
+    """
+    candidates = list(ParameterSampler(SEARCH_SPACE, n_iter=n_candidates, random_state=random_state))
+    config = {
+        "data": data_fingerprint(X, y),
+        "preprocessing": [NUMERICAL_COLUMNS, CATEGORICAL_COLUMNS, PASSTHROUGH_COLUMNS],
+        "candidates": candidates,
+        "min_estimators": min_estimators, "max_estimators": max_estimators, "eta": eta,
+        "n_splits": n_splits, "random_state": random_state,
+    }
+    search_id = hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    search_dir = os.path.join(SELECTION_DIR, search_id)
+    os.makedirs(search_dir, exist_ok=True)
+
+    # Folds depend on the data and split only, searches with other candidates share them
+    folds_id = hashlib.sha256(f"{config['data']}|{config['preprocessing']}|{n_splits}|{random_state}".encode()).hexdigest()[:16]
+    fold_dirs = cache_fold_matrices(X, y, os.path.join(SELECTION_DIR, "folds", folds_id), n_splits, random_state)
+
+    checkpoint = Checkpoint(os.path.join(search_dir, "checkpoint.json"), json.loads(json.dumps(config, default=str)))
+    n_jobs = n_jobs or os.cpu_count()
+    print(Fore.BLUE + f"\nSearching {len(candidates)} candidates, {n_splits}-fold CV, {n_jobs} processes "
+          f"(checkpoint {checkpoint.path})" + Style.RESET_ALL)
+
+    alive = list(range(len(candidates)))
+    n_estimators = min_estimators
+    rows = []
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        while True:
+            start = time.perf_counter()
+            futures = {}
+            for candidate in alive:
+                for fold, fold_dir in enumerate(fold_dirs):
+                    key = Checkpoint.key(candidate, n_estimators, fold)
+                    if checkpoint.get(key) is None:
+                        future = pool.submit(_evaluate_fold, candidates[candidate], n_estimators, fold_dir)
+                        futures[future] = key
+            for future in as_completed(futures):
+                checkpoint.record(futures[future], future.result())
+
+            scores = {
+                candidate: float(np.mean([checkpoint.get(Checkpoint.key(candidate, n_estimators, fold))
+                                          for fold in range(n_splits)]))
+                for candidate in alive
+            }
+            rows += [{"candidate": c, "n_estimators": n_estimators, "cv_c_index": s, **candidates[c]}
+                     for c, s in scores.items()]
+            print(f"✅ {len(alive)} candidates x {n_estimators} stages: best CV C-index "
+                  f"{max(scores.values()):.4f} ({len(futures)} fits in {time.perf_counter() - start:.1f}s)")
+
+            if len(alive) == 1 or n_estimators >= max_estimators:
+                break
+            alive = sorted(alive, key=scores.get, reverse=True)[:max(1, len(alive) // eta)]
+            n_estimators = min(n_estimators * eta, max_estimators)
+
+    best = max(alive, key=scores.get)
+    best_params = dict(candidates[best], n_estimators=n_estimators)
+    report = pd.DataFrame(rows).sort_values(["n_estimators", "cv_c_index"], ascending=[False, False])
+    return best_params, scores[best], report
@@ -0,0 +1,73 @@
+import base64
+
+import numpy as np
+
+
+def baseline_survival(model):
+    """
+    Return the (event times, baseline survival) arrays of a fitted survival model.
+    Raises ValueError if the model has no Breslow baseline (loss other than coxph).
+    """
+    baseline = model._get_baseline_model().baseline_survival_
+    return baseline.x, baseline.y
+
+
+def survival_time_grid(baseline, max_time=None, n_points=None) -> np.ndarray:
+    """
+    Return the time points the survival curves are evaluated on.
+    - by default the model's unique event times up to `max_time`: the step curves are exact there
+    - `n_points` evenly spaced times between 0 and `max_time` otherwise
+    The horizon is capped at the last event time the model has seen.
+    """
+    event_times, _ = baseline
+    horizon = event_times[-1] if max_time is None else min(max_time, event_times[-1])
+
+    if n_points is None:
+        return event_times[event_times <= horizon]
+    return np.linspace(0, horizon, n_points)
+
+
+def survival_matrix(baseline, risk_scores, time_grid) -> np.ndarray:
+    """
+    Evaluate the survival curves of all employees on a shared time grid.
+
+    With the Breslow baseline of a coxph model S(t | x) = S0(t) ** exp(risk(x)),
+    so the whole (n_employees, n_times) matrix is one broadcast power instead of
+    one StepFunction per employee. Values match `model.predict_survival_function`.
+    """
+    event_times, survival = baseline
+
+    # Same lookup as StepFunction.__call__: last event time <= t,
+    # times before the first event take its value
+    time_grid = np.clip(np.asarray(time_grid, dtype=np.float64), event_times[0], None)
+    idx = np.searchsorted(event_times, time_grid, side="right") - 1
+    baseline_on_grid = survival[idx]
+
+    hazard_ratio = np.exp(np.asarray(risk_scores, dtype=np.float64))
+    return np.power(baseline_on_grid[np.newaxis, :], hazard_ratio[:, np.newaxis])
+
+
+def encode_survival_curves(employee_numbers, time_grid, matrix, dtype="float64", encoding="json") -> dict:
+    """
+    Compact wide-format payload: the time axis once plus one row of
+    survival probabilities per employee.
+    - encoding="json": nested lists (rounded to 6 decimals for dtype="float32")
+    - encoding="base64": row-major little-endian bytes of the matrix in `dtype`
+    """
+    payload = {
+        "EmployeeNumber": np.asarray(employee_numbers).tolist(),
+        "Time": np.asarray(time_grid, dtype=np.float64).tolist(),
+        "shape": list(matrix.shape),
+        "dtype": dtype,
+        "encoding": encoding,
+    }
+
+    if encoding == "base64":
+        data = np.ascontiguousarray(matrix, dtype=np.dtype(dtype).newbyteorder("<"))
+        payload["SurvivalProbability"] = base64.b64encode(data.tobytes()).decode("ascii")
+    elif dtype == "float32":
+        payload["SurvivalProbability"] = np.round(matrix, 6).tolist()
+    else:
+        payload["SurvivalProbability"] = matrix.tolist()
+
+    return payload
@@ -0,0 +1,219 @@
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from google.cloud import bigquery
+
+from employee_attrition.params import *
+from employee_attrition.ml_logic.schema import check_filters
+
+# Parquet codec of the load files (snappy is BigQuery's default)
+PARQUET_LOAD_COMPRESSION = "snappy"
+# SQLite column types of the Arrow types of a loaded table (TEXT otherwise)
+_SQLITE_TYPES = [(pa.types.is_integer, "INTEGER"), (pa.types.is_boolean, "INTEGER"), (pa.types.is_floating, "REAL")]
+# SQL comparison of each row filter operator
+_SQL_OPERATORS = {'==': '=', '=': '=', '!=': '!=', '<': '<', '<=': '<=', '>': '>', '>=': '>=',
+                  'in': 'IN', 'not in': 'NOT IN'}
+
+
+def _bigquery_type(value) -> str:
+    if isinstance(value, (bool, np.bool_)):
+        return "BOOL"
+    if isinstance(value, (int, np.integer)):
+        return "INT64"
+    if isinstance(value, (float, np.floating)):
+        return "FLOAT64"
+    return "STRING"
+
+
+def write_parquet_chunks(data: pd.DataFrame, file, chunk_rows=BQ_LOAD_CHUNK_ROWS) -> int:
+    """
+    Write `data` to `file` as Parquet, `chunk_rows` rows per row group: only one
+    chunk is converted to Arrow at a time. A named index (EmployeeNumber) is
+    written as a column. Return the number of rows written.
+    """
+    preserve_index = data.index.name is not None
+    first = pa.Table.from_pandas(data.iloc[:chunk_rows], preserve_index=preserve_index)
+    with pq.ParquetWriter(file, first.schema, compression=PARQUET_LOAD_COMPRESSION) as writer:
+        writer.write_table(first)
+        for start in range(chunk_rows, len(data), chunk_rows):
+            chunk = data.iloc[start:start + chunk_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=first.schema, preserve_index=preserve_index))
+    return len(data)
+
+
+class BigQueryWarehouse:
+    """
+    BigQuery dataset, loaded with Parquet load jobs (BQ_API_ENDPOINT points the
+    client at an emulator)
+    """
+
+    def __init__(self, gcp_project: str, bq_dataset: str):
+        client_options = {"api_endpoint": BQ_API_ENDPOINT} if BQ_API_ENDPOINT else None
+        self.client = bigquery.Client(project=gcp_project, client_options=client_options)
+        self.dataset = bq_dataset
+
+    def load_parquet(self, path: str, table: str, truncate: bool) -> None:
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition="WRITE_TRUNCATE" if truncate else "WRITE_APPEND",
+        )
+        table_id = f"{self.client.project}.{self.dataset}.{table}"
+        with open(path, "rb") as f:
+            job = self.client.load_table_from_file(f, table_id, job_config=job_config, rewind=True)
+        job.result()
+
+    def drop_table(self, table: str) -> None:
+        self.client.delete_table(f"{self.client.project}.{self.dataset}.{table}", not_found_ok=True)
+
+    def _query_job(self, table: str, columns: list, filters=None):
+        check_filters(filters)
+        clauses, parameters = [], []
+        for k, (column, operator, value) in enumerate(filters or []):
+            if operator in ('in', 'not in'):
+                value = list(value)
+                clauses.append(f"`{column}` {_SQL_OPERATORS[operator]} UNNEST(@p{k})")
+                parameters.append(bigquery.ArrayQueryParameter(
+                    f"p{k}", _bigquery_type(value[0]) if value else "STRING", value))
+            else:
+                clauses.append(f"`{column}` {_SQL_OPERATORS[operator]} @p{k}")
+                parameters.append(bigquery.ScalarQueryParameter(f"p{k}", _bigquery_type(value), value))
+
+        sql = (f"SELECT {', '.join(f'`{column}`' for column in columns)} "
+               f"FROM `{self.client.project}.{self.dataset}.{table}`")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return self.client.query(sql, job_config=bigquery.QueryJobConfig(query_parameters=parameters))
+
+    def query(self, table: str, columns: list, filters=None) -> pd.DataFrame:
+        """
+        Read `columns` of the rows matching `filters`: projection and filters run in
+        BigQuery, as a parameterized query, only the result is downloaded
+        """
+        return self._query_job(table, columns, filters).to_arrow().to_pandas()
+
+    def query_chunks(self, table: str, columns: list, filters=None, chunk_rows=100_000):
+        """
+        Same as `query`, downloaded and yielded `chunk_rows` rows (one result page) at a time
+        """
+        for batch in self._query_job(table, columns, filters).result(page_size=chunk_rows).to_arrow_iterable():
+            yield batch.to_pandas()
+
+
+class SQLiteWarehouse:
+    """
+    Local stand-in for a BigQuery dataset: one SQLite file per dataset under BQ_LOCAL_ROOT.
+    Loads run in one transaction, so a truncate-and-load either fully happens or not at all.
+    """
+
+    def __init__(self, root: str, bq_dataset: str):
+        os.makedirs(root, exist_ok=True)
+        self.path = os.path.join(root, f"{bq_dataset}.db")
+
+    def load_parquet(self, path: str, table: str, truncate: bool) -> None:
+        parquet = pq.ParquetFile(path)
+        columns = [field.name for field in parquet.schema_arrow]
+        types = [next((sql for check, sql in _SQLITE_TYPES if check(field.type)), "TEXT")
+                 for field in parquet.schema_arrow]
+        definitions = ", ".join(f'"{column}" {sql}' for column, sql in zip(columns, types))
+        quoted = ", ".join(f'"{column}"' for column in columns)
+
+        # Autocommit mode and an explicit transaction: sqlite3's implicit one would not
+        # include the DROP / CREATE, a failed load would leave the table emptied
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        try:
+            connection.execute("BEGIN")
+            if truncate:
+                connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+            connection.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({definitions})')
+            insert = f'INSERT INTO "{table}" ({quoted}) VALUES ({", ".join("?" * len(columns))})'
+            for batch in parquet.iter_batches():
+                connection.executemany(insert, zip(*(column.to_pylist() for column in batch.columns)))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def drop_table(self, table: str) -> None:
+        with sqlite3.connect(self.path) as connection:
+            connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+        connection.close()
+
+    def _select(self, table: str, columns: list, filters=None):
+        check_filters(filters)
+        clauses, values = [], []
+        for column, operator, value in filters or []:
+            if operator in ('in', 'not in'):
+                value = list(value)
+                clauses.append(f'"{column}" {_SQL_OPERATORS[operator]} ({", ".join("?" * len(value))})')
+                values += value
+            else:
+                clauses.append(f'"{column}" {_SQL_OPERATORS[operator]} ?')
+                values.append(value)
+
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        sql = f'SELECT {quoted} FROM "{table}"'
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return sql, values
+
+    def query(self, table: str, columns: list, filters=None) -> pd.DataFrame:
+        """
+        Read `columns` of the rows matching `filters`, selected by SQLite
+        """
+        sql, values = self._select(table, columns, filters)
+        connection = sqlite3.connect(self.path)
+        try:
+            return pd.read_sql_query(sql, connection, params=values)
+        finally:
+            connection.close()
+
+    def query_chunks(self, table: str, columns: list, filters=None, chunk_rows=100_000):
+        """
+        Same as `query`, fetched and yielded `chunk_rows` rows at a time
+        """
+        sql, values = self._select(table, columns, filters)
+        connection = sqlite3.connect(self.path)
+        try:
+            yield from pd.read_sql_query(sql, connection, params=values, chunksize=chunk_rows)
+        finally:
+            connection.close()
+
+
+def get_warehouse(gcp_project: str, bq_dataset: str):
+    """
+    Return the warehouse tables are loaded into: BigQuery, or the SQLite stand-in when BQ_LOCAL_ROOT is set
+    """
+    if BQ_LOCAL_ROOT is not None:
+        return SQLiteWarehouse(BQ_LOCAL_ROOT, bq_dataset)
+    return BigQueryWarehouse(gcp_project, bq_dataset)
+
+
+def load_table(warehouse, data: pd.DataFrame, table: str, truncate: bool, chunk_rows=BQ_LOAD_CHUNK_ROWS) -> int:
+    """
+    Bulk-load `data` into `table` with one load job: the frame is written chunk by
+    chunk to a temporary Parquet file, which the warehouse loads as a whole, so
+    WRITE_TRUNCATE replaces the table atomically. Return the number of rows loaded.
+    """
+    fd, path = tempfile.mkstemp(suffix=".parquet")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            n_rows = write_parquet_chunks(data, f, chunk_rows)
+        warehouse.load_parquet(path, table, truncate)
+    finally:
+        os.remove(path)
+    return n_rows
+
+
+def query_table(warehouse, table: str, columns: list, filters=None) -> pd.DataFrame:
+    """
+    Read `columns` of the rows of `table` matching `filters` (see `schema.filter_mask`),
+    selected by the warehouse: only those are transferred and materialized
+    """
+    return warehouse.query(table, columns, filters)
@@ -14,12 +14,31 @@ BQ_REGION = os.environ.get("BQ_REGION")
 BUCKET_NAME = os.environ.get("BUCKET_NAME")
 INSTANCE = os.environ.get("INSTANCE")
 
+# Processed data on GCS (ml_logic/object_store.py): GCS_MAX_WORKERS concurrent transfers
+# over one pooled client, uploads streamed in GCS_UPLOAD_CHUNK_MB chunks. GCS_LOCAL_ROOT
+# stands a local directory in for the bucket; STORAGE_EMULATOR_HOST (read by the
+# google-cloud-storage client itself) points it at a fake GCS server instead
+GCS_MAX_WORKERS = int(os.environ.get("GCS_MAX_WORKERS", 8))
+GCS_UPLOAD_CHUNK_MB = int(os.environ.get("GCS_UPLOAD_CHUNK_MB", 8))
+GCS_LOCAL_ROOT = os.environ.get("GCS_LOCAL_ROOT") or None
+
+# Processed data in BigQuery (ml_logic/warehouse.py, DATA_TARGET=bq): tables are bulk-loaded
+# from Parquet files written BQ_LOAD_CHUNK_ROWS rows at a time. BQ_LOCAL_ROOT stands SQLite
+# files in for the datasets; BQ_API_ENDPOINT points the client at a BigQuery emulator instead
+BQ_LOAD_CHUNK_ROWS = int(os.environ.get("BQ_LOAD_CHUNK_ROWS", 100000))
+BQ_LOCAL_ROOT = os.environ.get("BQ_LOCAL_ROOT") or None
+BQ_API_ENDPOINT = os.environ.get("BQ_API_ENDPOINT") or None
+
 
 ##################  DATA FILES  ##################
 RAW_DATA = os.environ.get("RAW_DATA")
 CLEANED_DATA = os.environ.get("CLEANED_DATA")
 FEATURE_IMPORTANCE_DATA = os.environ.get("FEATURE_IMPORTANCE_DATA")
 RISK_SCORE_DATA = os.environ.get("RISK_SCORE_DATA")
+# Per-employee risk factor attributions, saved by train() next to RISK_SCORE_DATA
+EXPLANATION_DATA = os.environ.get("EXPLANATION_DATA", "explanations.csv")
+# Typed Parquet copy of each local CSV, next to it, rebuilt when the CSV changes
+COLUMNAR_CACHE = os.environ.get("COLUMNAR_CACHE", "true").lower() in ("1", "true", "yes")
 
 
 ##################  MODEL LIFECYCLE  #####################
@@ -50,3 +69,95 @@ LOCAL_CACHE_DIR  = os.environ.get("LOCAL_CACHE_DIR")
 ##################  CONSTANTS  #####################
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 LOCAL_REGISTRY_PATH = os.path.join(PROJECT_ROOT, "training_outputs")
+
+##################  SERVING  #####################
+# Micro-batching of /predictRisk and /getSurvivalCurves rows
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 256))
+BATCH_WINDOW_MS = float(os.environ.get("BATCH_WINDOW_MS", 2))
+# Rows scored per chunk by /predictRiskBulk
+BULK_CHUNK_SIZE = int(os.environ.get("BULK_CHUNK_SIZE", 10000))
+
+# Local cache of downloaded model artifacts (0 disables it)
+MODEL_CACHE_DIR = os.environ.get("MODEL_CACHE_DIR", os.path.join(LOCAL_REGISTRY_PATH, "cache"))
+MODEL_CACHE_MAX_MB = int(os.environ.get("MODEL_CACHE_MAX_MB", 2048))
+
+# Multi-process serving: number of uvicorn workers started by prestart.sh, and the
+# exported model they all memory-map (written once before the workers start)
+API_WORKERS = int(os.environ.get("API_WORKERS", 1))
+SERVING_MODEL_PATH = os.environ.get("SERVING_MODEL_PATH") or None
+# Start the API without a model (not ready until POST /train completes) instead of failing
+API_START_WITHOUT_MODEL = os.environ.get("API_START_WITHOUT_MODEL", "false").lower() in ("1", "true", "yes")
+# Seconds between checks of the registry for a new model version (0 disables hot reload)
+MODEL_POLL_INTERVAL_S = float(os.environ.get("MODEL_POLL_INTERVAL_S", 60))
+# In-process cache of risk scores and survival curves by encoded feature row, flushed on
+# model change (0 disables it)
+PREDICTION_CACHE_MAX_MB = int(os.environ.get("PREDICTION_CACHE_MAX_MB", 64))
+# Survival curves precomputed for the risk table served on GET /risk (0 points disables them)
+RISK_TABLE_CURVE_POINTS = int(os.environ.get("RISK_TABLE_CURVE_POINTS", 0))
+RISK_TABLE_CURVE_MAX_TIME = float(os.environ.get("RISK_TABLE_CURVE_MAX_TIME", 10))
+
+##################  BATCH SCORING  #####################
+# score(): the active employees are streamed SCORING_CHUNK_ROWS rows at a time, scored on
+# SCORING_N_JOBS processes (0 for all cores) and written to SCORING_OUTPUT_PATH (Parquet);
+# the SCORING_TOP_K highest risks are kept on the side
+SCORING_CHUNK_ROWS = int(os.environ.get("SCORING_CHUNK_ROWS", 100000))
+SCORING_N_JOBS = int(os.environ.get("SCORING_N_JOBS", 0))
+SCORING_TOP_K = int(os.environ.get("SCORING_TOP_K", 100))
+SCORING_OUTPUT_PATH = os.environ.get("SCORING_OUTPUT_PATH", os.path.join(LOCAL_REGISTRY_PATH, "scoring", "risk_scores.parquet"))
+
+##################  EXPLANATIONS  #####################
+# train() explains the risk of the active employees EXPLANATION_CHUNK_ROWS rows at a time
+# (TreeSHAP over the GBSA trees); the API serves them from the risk table
+EXPLANATION_CHUNK_ROWS = int(os.environ.get("EXPLANATION_CHUNK_ROWS", 500))
+
+##################  TRAINING  #####################
+# Survival learner ("gbsa" or "componentwise") and its boosting parameters
+TRAIN_LEARNER = os.environ.get("TRAIN_LEARNER", "gbsa")
+TRAIN_N_ESTIMATORS = int(os.environ.get("TRAIN_N_ESTIMATORS", 100))
+TRAIN_LEARNING_RATE = float(os.environ.get("TRAIN_LEARNING_RATE", 0.1))
+TRAIN_SUBSAMPLE = float(os.environ.get("TRAIN_SUBSAMPLE", 1.0))
+# Stop adding stages once the validation C-index stalls for TRAIN_PATIENCE evaluations
+TRAIN_EARLY_STOPPING = os.environ.get("TRAIN_EARLY_STOPPING", "false").lower() in ("1", "true", "yes")
+TRAIN_PATIENCE = int(os.environ.get("TRAIN_PATIENCE", 5))
+# Seed of the train / validation splits and of subsampling
+TRAIN_RANDOM_STATE = int(os.environ.get("TRAIN_RANDOM_STATE", 42))
+
+# Model selection (train_model_with_selection): successive halving over SELECTION_N_CANDIDATES
+# candidates with SELECTION_MIN_ESTIMATORS..SELECTION_MAX_ESTIMATORS stages, on
+# SELECTION_N_JOBS processes (0 for all cores); folds and checkpoints go to SELECTION_DIR
+SELECTION_N_CANDIDATES = int(os.environ.get("SELECTION_N_CANDIDATES", 27))
+SELECTION_MIN_ESTIMATORS = int(os.environ.get("SELECTION_MIN_ESTIMATORS", 25))
+SELECTION_MAX_ESTIMATORS = int(os.environ.get("SELECTION_MAX_ESTIMATORS", 225))
+SELECTION_N_JOBS = int(os.environ.get("SELECTION_N_JOBS", 0))
+SELECTION_DIR = os.environ.get("SELECTION_DIR", os.path.join(LOCAL_REGISTRY_PATH, "selection"))
+
+# Local cache of fitted preprocessors and transformed training matrices (0 disables it)
+PREPROCESSING_CACHE_DIR = os.environ.get("PREPROCESSING_CACHE_DIR", os.path.join(LOCAL_REGISTRY_PATH, "preprocessing"))
+PREPROCESSING_CACHE_MAX_MB = int(os.environ.get("PREPROCESSING_CACHE_MAX_MB", 1024))
+
+# Incremental retraining (retrain): RETRAIN_INCREMENTAL_STAGES boosting stages are added
+# to the production model, fitted on the new / changed rows plus RETRAIN_REPLAY_RATIO times
+# as many unchanged rows. A full refit is done instead every RETRAIN_FULL_EVERY retrains,
+# when the delta exceeds RETRAIN_MAX_DELTA_FRACTION of the rows, or on drift: unseen
+# categories or a numerical mean shift above RETRAIN_DRIFT_THRESHOLD standard deviations
+RETRAIN_INCREMENTAL_STAGES = int(os.environ.get("RETRAIN_INCREMENTAL_STAGES", 20))
+RETRAIN_REPLAY_RATIO = float(os.environ.get("RETRAIN_REPLAY_RATIO", 1.0))
+RETRAIN_FULL_EVERY = int(os.environ.get("RETRAIN_FULL_EVERY", 6))
+RETRAIN_MAX_DELTA_FRACTION = float(os.environ.get("RETRAIN_MAX_DELTA_FRACTION", 0.25))
+RETRAIN_DRIFT_THRESHOLD = float(os.environ.get("RETRAIN_DRIFT_THRESHOLD", 0.5))
+# Row hashes of the data the production model was trained on, to find the delta
+TRAINING_STATE_DIR = os.environ.get("TRAINING_STATE_DIR", os.path.join(LOCAL_REGISTRY_PATH, "training_state"))
+
+##################  EVALUATION  #####################
+# evaluate(): metrics on EVALUATION_N_TIMES time points with EVALUATION_N_BOOTSTRAP bootstrap
+# resamples, computed on EVALUATION_N_JOBS threads (0 for all cores); results are cached
+# per model version and data fingerprint (0 MB disables the cache)
+EVALUATION_N_BOOTSTRAP = int(os.environ.get("EVALUATION_N_BOOTSTRAP", 200))
+EVALUATION_N_TIMES = int(os.environ.get("EVALUATION_N_TIMES", 8))
+EVALUATION_N_JOBS = int(os.environ.get("EVALUATION_N_JOBS", 0))
+EVALUATION_CACHE_DIR = os.environ.get("EVALUATION_CACHE_DIR", os.path.join(LOCAL_REGISTRY_PATH, "evaluation"))
+EVALUATION_CACHE_MAX_MB = int(os.environ.get("EVALUATION_CACHE_MAX_MB", 64))
+# train_flow promotes the retrained model when its validation C-index beats production
+# by PROMOTION_MIN_GAIN, and notifies when neither model reaches PROMOTION_MIN_C_INDEX
+PROMOTION_MIN_GAIN = float(os.environ.get("PROMOTION_MIN_GAIN", 0.0))
+PROMOTION_MIN_C_INDEX = float(os.environ.get("PROMOTION_MIN_C_INDEX", 0.6))
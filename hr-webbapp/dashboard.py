@@ -36,7 +36,15 @@ if not employees.empty:
     st.write("(Visualization placeholder)")
 
     st.subheader("Risk Factors & HR Recommendations")
-    st.write("(Analysis placeholder)")
+    # Risk factors are precomputed at training time, the API only looks them up
+    employee_id = st.selectbox("Employee", high_risk.head(num_top)["EmployeeID"])
+    explanation = requests.get(f"http://localhost:8000/explain/{employee_id}", params={"n_factors": 5})
+    if explanation.status_code == 200:
+        factors = pd.DataFrame(explanation.json()["RiskFactors"]).set_index("Feature")
+        st.bar_chart(factors["Contribution"])
+        st.write("Positive contributions raise the employee's attrition risk, negative ones lower it.")
+    else:
+        st.info("No risk factors available for this employee.")
 
 else:
     st.warning("No employee data available.")
@@ -23,10 +23,18 @@ while True:
 # Redirect all outputs to the pipe
 exec > $PIPE 2>&1
 
-# Start FastAPI with original command
+# Export the model once before starting the workers: each worker memory-maps
+# the same file (tmpfs by default) instead of unpickling its own copy.
+# If there is no model to export, workers fall back to loading it themselves.
+export SERVING_MODEL_PATH=${SERVING_MODEL_PATH:-/dev/shm/employee_attrition/model.eam}
+python -c 'from employee_attrition.ml_logic.registry import export_serving_model; exit(export_serving_model() is None)' \
+    || unset SERVING_MODEL_PATH
+
+# Start FastAPI with one worker process per API_WORKERS
 uvicorn employee_attrition.api.fast:app \
     --host 0.0.0.0 \
     --port 8080 \
+    --workers ${API_WORKERS:-1} \
     --no-access-log  # Prevent duplicate logs
 
 # Cleanup (optional)
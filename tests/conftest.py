@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+from sksurv.ensemble import GradientBoostingSurvivalAnalysis
+
+from employee_attrition import params
+from employee_attrition.api import fast
+from employee_attrition.ml_logic import evaluation, incremental, preprocessing, registry, selection, warehouse
+from employee_attrition.ml_logic.artifact_cache import ArtifactCache
+from synthetic import employee_features, fit_gbsa
+
+
+@pytest.fixture(autouse=True)
+def isolated_outputs(tmp_path, monkeypatch):
+    """Keep the on-disk caches and training state of every test under its tmp_path"""
+    outputs = tmp_path / "training_outputs"
+    for module, name in [(preprocessing, "_preprocessing_cache"), (registry, "_artifact_cache"),
+                         (evaluation, "_evaluation_cache")]:
+        monkeypatch.setattr(module, name, ArtifactCache(str(outputs / name.strip("_")), 64 * 1024 * 1024))
+    monkeypatch.setattr(incremental, "TRAINING_STATE_DIR", str(outputs / "training_state"))
+    monkeypatch.setattr(selection, "SELECTION_DIR", str(outputs / "selection"))
+    return outputs
+
+
+@pytest.fixture(scope="session")
+def served_pipeline():
+    """A small GBSA pipeline and the employees it was fitted on"""
+    X = employee_features(200)
+    return fit_gbsa(X, GradientBoostingSurvivalAnalysis(n_estimators=10, max_depth=3, random_state=0)), X
+
+
+@pytest.fixture
+def local_registry(tmp_path, monkeypatch):
+    """Save and load models in a temporary local registry (MODEL_TARGET=local)"""
+    monkeypatch.setattr(registry, "MODEL_TARGET", "local")
+    monkeypatch.setattr(registry, "LOCAL_REGISTRY_PATH", str(tmp_path / "registry"))
+    return tmp_path / "registry"
+
+
+@pytest.fixture
+def local_data(tmp_path, monkeypatch):
+    """Read and save the data files in a temporary LOCAL_CACHE_DIR (DATA_SOURCE=DATA_TARGET=local)"""
+    for name, value in [("DATA_SOURCE", "local"), ("DATA_TARGET", "local"), ("LOCAL_CACHE_DIR", str(tmp_path / "data")),
+                        ("RAW_DATA", "hr.csv"), ("CLEANED_DATA", "cleaned.csv"),
+                        ("FEATURE_IMPORTANCE_DATA", "feature_importance.csv"),
+                        ("RISK_SCORE_DATA", "risk_scores.csv"), ("EXPLANATION_DATA", "explanations.csv")]:
+        monkeypatch.setattr(params, name, value)
+    (tmp_path / "data").mkdir()
+    return tmp_path / "data"
+
+
+@pytest.fixture
+def local_warehouse(tmp_path, monkeypatch, local_data):
+    """Read and save the data in a SQLite stand-in for the BigQuery dataset (DATA_SOURCE=DATA_TARGET=bq)"""
+    monkeypatch.setattr(warehouse, "BQ_LOCAL_ROOT", str(tmp_path / "bq"))
+    for name, value in [("DATA_SOURCE", "bq"), ("DATA_TARGET", "bq"), ("GCP_PROJECT", "project"),
+                        ("BQ_DATASET", "dataset")]:
+        monkeypatch.setattr(params, name, value)
+    return warehouse.get_warehouse("project", "dataset")
+
+
+@pytest.fixture
+def start_api(monkeypatch, served_pipeline):
+    """
+    Start the API on `served_pipeline` (version "v1"), without hot reload or risk table:
+    start_api(compiled=False) serves it through the sklearn pipeline fallback
+    """
+    pipeline, _ = served_pipeline
+    monkeypatch.setattr(params, "SERVING_MODEL_PATH", None)
+    monkeypatch.setattr(params, "MODEL_POLL_INTERVAL_S", 0)
+    monkeypatch.setattr(fast, "load_model_with_version", lambda: (pipeline, "v1"))
+    monkeypatch.setattr(fast, "get_risk_scores", lambda: None)
+    clients = []
+
+    def start(compiled=True):
+        if not compiled:
+            monkeypatch.setattr(fast, "compile_pipeline", lambda model: None)
+        client = TestClient(fast.app)
+        clients.append(client.__enter__())
+        return client
+
+    yield start
+    for client in clients:
+        client.__exit__(None, None, None)
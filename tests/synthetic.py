@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sksurv.util import Surv
+
+from employee_attrition.ml_logic.preprocessing import build_preprocessor
+from employee_attrition.ml_logic.schema import CATEGORIES, EMPLOYEE_DTYPES, FEATURE_COLUMNS
+
+
+def employee_features(n_rows, seed=0) -> pd.DataFrame:
+    """Random feature columns in the schema dtypes, indexed by EmployeeNumber"""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for column in FEATURE_COLUMNS:
+        dtype = EMPLOYEE_DTYPES[column]
+        if column in CATEGORIES:
+            columns[column] = pd.Categorical(rng.choice(CATEGORIES[column], n_rows), dtype=dtype)
+        else:
+            columns[column] = rng.integers(1, 50, n_rows).astype(dtype)
+    return pd.DataFrame(columns, index=pd.Index(np.arange(1, n_rows + 1, dtype=np.int32), name='EmployeeNumber'))
+
+
+def hr_table(n_rows, seed=0) -> pd.DataFrame:
+    """Raw HR table in the file layout: every schema column, EmployeeNumber and the target as columns"""
+    X = employee_features(n_rows, seed)
+    y = survival_target(X, seed)
+    table = X.reset_index()
+    table['Attrition'] = np.where(y['event'], 'Yes', 'No')
+    table['YearsAtCompany'] = np.minimum(np.ceil(y['time']), 40).astype(np.int8)
+    table['EmployeeCount'], table['StandardHours'], table['Over18'] = 1, 80, 'Y'
+    return table[list(EMPLOYEE_DTYPES)]
+
+
+def survival_target(X, seed=0) -> np.ndarray:
+    """Event times driven by a few features, so the trees split on them"""
+    rng = np.random.default_rng(seed)
+    hazard = np.exp(0.05 * X['Age'].to_numpy() - 0.04 * X['JobSatisfaction'].to_numpy()
+                    + (X['OverTime'] == 'Yes').to_numpy())
+    time = rng.exponential(10 / hazard) + 0.1
+    event = rng.random(len(X)) < 0.7
+    return Surv.from_arrays(event, time)
+
+
+def fit_gbsa(X, model, seed=0) -> Pipeline:
+    pipeline = Pipeline(steps=[('preprocessor', build_preprocessor()), ('model', model)])
+    return pipeline.fit(X, survival_target(X, seed))
@@ -0,0 +1,82 @@
+import itertools
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from employee_attrition.ml_logic import artifact_cache
+from employee_attrition.ml_logic.artifact_cache import ArtifactCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # One tick per call, so recency never ties
+    clock = itertools.count()
+    monkeypatch.setattr(artifact_cache, "time", SimpleNamespace(time=lambda: float(next(clock))))
+    return ArtifactCache(str(tmp_path / "cache"), max_bytes=250)
+
+
+def read(cache, source, version):
+    f = cache.open(source, version)
+    if f is None:
+        return None
+    with f:
+        return f.read()
+
+
+def test_versions_are_served_from_disk(cache):
+    assert cache.open("gs://bucket/model.pkl", "1") is None
+    cache.put("gs://bucket/model.pkl", "1", b"model one")
+
+    assert read(cache, "gs://bucket/model.pkl", "1") == b"model one"
+    assert cache.open("gs://bucket/model.pkl", "2") is None
+
+
+def test_identical_content_is_stored_once(cache):
+    first = cache.put("a", "1", b"same bytes")
+    second = cache.put("b", "7", b"same bytes")
+
+    assert first == second
+    assert os.listdir(cache.objects_dir) == [os.path.basename(first)]
+    assert read(cache, "b", "7") == b"same bytes"
+
+
+def test_least_recently_used_objects_are_evicted(cache):
+    for version in "123":
+        cache.put("model", version, version.encode() * 100)
+    assert read(cache, "model", "1") is None
+
+    # Version 2 is used again, so 3 is the older one when 4 comes in
+    assert read(cache, "model", "2") == b"2" * 100
+    cache.put("model", "4", b"4" * 100)
+
+    assert read(cache, "model", "3") is None
+    assert read(cache, "model", "2") == b"2" * 100
+    assert read(cache, "model", "4") == b"4" * 100
+    assert len(os.listdir(cache.objects_dir)) == 2
+
+
+def test_an_artifact_larger_than_the_cache_is_kept(cache):
+    cache.put("model", "big", b"x" * 1000)
+    assert read(cache, "model", "big") == b"x" * 1000
+
+
+def test_open_files_survive_eviction(cache):
+    cache.put("model", "1", b"1" * 200)
+    f = cache.open("model", "1")
+    cache.put("model", "2", b"2" * 200)
+
+    assert cache.open("model", "1") is None
+    with f:
+        assert f.read() == b"1" * 200
+
+
+def test_put_file_moves_the_file_in(cache, tmp_path):
+    path = tmp_path / "download.pkl"
+    path.write_bytes(b"downloaded")
+
+    cached = cache.put_file("model", "1", str(path))
+
+    assert not path.exists()
+    with open(cached, "rb") as f:
+        assert f.read() == b"downloaded"
@@ -0,0 +1,78 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from employee_attrition.api.batching import MicroBatcher
+
+
+def row_sums(X):
+    return X.sum(axis=1)
+
+
+async def submit_all(batcher, requests):
+    batcher.start()
+    try:
+        return await asyncio.gather(*(batcher.submit(X) for X in requests))
+    finally:
+        await batcher.stop()
+
+
+def test_concurrent_requests_share_one_batch():
+    requests = [np.full((n, 3), i, dtype=np.float32) for i, n in enumerate([1, 4, 2, 3])]
+    batcher = MicroBatcher(row_sums, max_batch_size=256, max_wait_ms=50)
+
+    results = asyncio.run(submit_all(batcher, requests))
+
+    for X, scores in zip(requests, results):
+        np.testing.assert_array_equal(scores, row_sums(X))
+    assert batcher.batches == 1
+    assert batcher.metrics()["last_batch_rows"] == 10
+    assert batcher.metrics()["batch_size_histogram"] == {"<=16": 1}
+
+
+def test_batches_stop_at_max_batch_size():
+    requests = [np.full((3, 2), i, dtype=np.float32) for i in range(5)]
+    batcher = MicroBatcher(row_sums, max_batch_size=6, max_wait_ms=50)
+
+    results = asyncio.run(submit_all(batcher, requests))
+
+    for X, scores in zip(requests, results):
+        np.testing.assert_array_equal(scores, row_sums(X))
+    assert batcher.max_batch_rows == 6
+    assert batcher.batches == 3
+
+
+def test_scoring_error_reaches_every_caller_of_the_batch():
+    calls = []
+
+    def fail_once(X):
+        calls.append(len(X))
+        if len(calls) == 1:
+            raise ValueError("model failed")
+        return row_sums(X)
+
+    async def scenario():
+        batcher = MicroBatcher(fail_once, max_wait_ms=20)
+        batcher.start()
+        try:
+            first = await asyncio.gather(*(batcher.submit(np.ones((1, 2))) for _ in range(3)),
+                                         return_exceptions=True)
+            # The worker survives the failure
+            second = await batcher.submit(np.ones((1, 2)))
+        finally:
+            await batcher.stop()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert all(isinstance(e, ValueError) for e in first)
+    np.testing.assert_array_equal(second, [2.0])
+
+
+def test_submit_requires_a_running_batcher():
+    async def scenario():
+        batcher = MicroBatcher(row_sums)
+        with pytest.raises(RuntimeError):
+            await batcher.submit(np.ones((1, 2)))
+
+    asyncio.run(scenario())
@@ -0,0 +1,90 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from employee_attrition import params
+from employee_attrition.api.bulk import CSV, NDJSON, _ndjson_chunks
+
+
+def ndjson_body(X) -> bytes:
+    return X.reset_index().to_json(orient='records', lines=True).encode()
+
+
+def read_ndjson(text) -> list:
+    return [json.loads(line) for line in text.splitlines()]
+
+
+@pytest.fixture(params=[True, False], ids=["plan", "pipeline"])
+def client(request, start_api, monkeypatch):
+    monkeypatch.setattr(params, "BULK_CHUNK_SIZE", 64)
+    return start_api(compiled=request.param)
+
+
+def test_ndjson_body_is_scored_in_chunks(client, served_pipeline):
+    pipeline, X = served_pipeline
+    response = client.post("/predictRiskBulk", content=ndjson_body(X), headers={"content-type": NDJSON})
+
+    assert response.status_code == 200
+    rows = read_ndjson(response.text)
+    assert [row["EmployeeNumber"] for row in rows] == X.index.tolist()
+    np.testing.assert_allclose([row["PredictedRisk"] for row in rows], pipeline.predict(X), rtol=1e-5)
+
+
+@pytest.mark.parametrize("filename", ["hr.csv", "hr.parquet"])
+def test_uploaded_file_is_scored_to_csv(client, served_pipeline, filename):
+    pipeline, X = served_pipeline
+    upload = io.BytesIO()
+    if filename.endswith(".csv"):
+        X.reset_index().to_csv(upload, index=False)
+    else:
+        X.reset_index().to_parquet(upload)
+
+    response = client.post("/predictRiskBulk", files={"file": (filename, upload.getvalue())},
+                           headers={"accept": CSV})
+
+    assert response.status_code == 200
+    scores = pd.read_csv(io.StringIO(response.text), comment='#')
+    assert scores["EmployeeNumber"].tolist() == X.index.tolist()
+    np.testing.assert_allclose(scores["PredictedRisk"], pipeline.predict(X), rtol=1e-5)
+
+
+def test_bad_first_chunk_is_a_400(client, served_pipeline):
+    _, X = served_pipeline
+    no_id = X.to_json(orient='records', lines=True).encode()
+    response = client.post("/predictRiskBulk", content=no_id, headers={"content-type": NDJSON})
+    assert response.status_code == 400
+    assert "EmployeeNumber" in response.json()["detail"]
+
+    # A row lacking a column the others have
+    rows = read_ndjson(ndjson_body(X.iloc[:3]).decode())
+    del rows[1]["Age"]
+    ragged = "\n".join(json.dumps(row) for row in rows).encode()
+    response = client.post("/predictRiskBulk", content=ragged, headers={"content-type": NDJSON})
+    assert response.status_code == 400
+
+
+def test_failure_after_the_first_chunk_is_reported_in_band(client, served_pipeline):
+    _, X = served_pipeline
+    body = X.reset_index().astype({'OverTime': str})
+    body.loc[150, 'OverTime'] = "Maybe"
+
+    response = client.post("/predictRiskBulk", content=ndjson_body(body.set_index('EmployeeNumber')),
+                           headers={"content-type": NDJSON})
+
+    assert response.status_code == 200
+    rows = read_ndjson(response.text)
+    assert "error" in rows[-1]
+    assert len(rows) == 128 + 1
+
+
+def test_unsupported_body_is_a_415(client):
+    response = client.post("/predictRiskBulk", json={"EmployeeNumber": [1]})
+    assert response.status_code == 415
+
+
+def test_ndjson_chunks_keep_every_key():
+    lines = io.StringIO('{"a": 1}\n\n{"a": 2, "b": 3}\n{"b": 4}\n')
+    assert list(_ndjson_chunks(lines, 2)) == [{"a": [1, 2], "b": [None, 3]}, {"b": [4]}]
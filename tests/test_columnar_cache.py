@@ -0,0 +1,66 @@
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from employee_attrition import params
+from employee_attrition.ml_logic.data import compact_dtypes, read_csv_cached
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "risk_scores.csv"
+    pd.DataFrame({'EmployeeNumber': [1, 2, 3], 'Department': ['Sales', 'R&D', 'Sales'],
+                  'risk_score': [0.5, 1.5, -0.25]}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_the_parquet_copy_is_built_then_reused(csv_path, monkeypatch):
+    df = read_csv_cached(csv_path, index_col='EmployeeNumber')
+
+    assert os.path.exists(csv_path[:-4] + ".parquet")
+    pd.testing.assert_frame_equal(df, compact_dtypes(pd.read_csv(csv_path)).set_index('EmployeeNumber'))
+    assert df['Department'].dtype == 'category'
+    assert read_csv_cached(csv_path)['EmployeeNumber'].dtype == 'int8'
+
+    # Later reads never parse the CSV, even when it was only touched
+    monkeypatch.setattr(pd, "read_csv", pytest.fail)
+    pd.testing.assert_frame_equal(read_csv_cached(csv_path, index_col='EmployeeNumber'), df)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    pd.testing.assert_frame_equal(read_csv_cached(csv_path, index_col='EmployeeNumber'), df)
+    assert read_csv_cached(csv_path, columns=['EmployeeNumber', 'risk_score']).columns.tolist() == \
+        ['EmployeeNumber', 'risk_score']
+
+
+def test_the_copy_is_rebuilt_when_the_csv_changes(csv_path):
+    read_csv_cached(csv_path)
+    pd.DataFrame({'EmployeeNumber': [1, 2], 'Department': ['HR', 'HR'], 'risk_score': [0.1, 0.2]}) \
+        .to_csv(csv_path, index=False)
+
+    df = read_csv_cached(csv_path)
+    assert df['Department'].tolist() == ['HR', 'HR']
+    assert len(pq.read_table(csv_path[:-4] + ".parquet")) == 2
+
+
+def test_custom_parse_and_its_version(csv_path):
+    calls = []
+
+    def parse(path, columns=None, filters=None):
+        calls.append(path)
+        return pd.read_csv(path).assign(parsed=True)
+
+    assert read_csv_cached(csv_path, parse=parse, parse_version="1")['parsed'].all()
+    read_csv_cached(csv_path, parse=parse, parse_version="1")
+    read_csv_cached(csv_path, parse=parse, parse_version="2")
+    assert len(calls) == 2
+
+
+def test_disabled_cache_reads_the_csv(csv_path, monkeypatch):
+    monkeypatch.setattr(params, "COLUMNAR_CACHE", False)
+
+    df = read_csv_cached(csv_path, filters=[('risk_score', '>', 0)])
+
+    assert not os.path.exists(csv_path[:-4] + ".parquet")
+    assert df['EmployeeNumber'].tolist() == [1, 2]
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from sksurv.ensemble import GradientBoostingSurvivalAnalysis
+from sksurv.metrics import brier_score, concordance_index_censored, cumulative_dynamic_auc, integrated_brier_score
+from sksurv.nonparametric import CensoringDistributionEstimator
+from sksurv.util import Surv
+
+from employee_attrition.ml_logic import evaluation
+from employee_attrition.ml_logic.evaluation import _c_index, _time_auc, bootstrap_weights, evaluate_model, evaluation_times
+from synthetic import employee_features, fit_gbsa, survival_target
+
+
+@pytest.fixture(scope="module")
+def sample():
+    """Integer years and rounded risks, so both have ties"""
+    rng = np.random.default_rng(0)
+    time = rng.integers(1, 15, 300).astype(np.float64)
+    # The last time is an event, else the censoring distribution drops to zero
+    event = (rng.random(300) < 0.6) | (time == time.max())
+    risk = np.round(rng.normal(size=300) - 0.1 * time, 1)
+    return Surv.from_arrays(event, time), risk
+
+
+def test_c_index_matches_sksurv(sample):
+    y, risk = sample
+    weights = np.ones((1, len(y)), dtype=np.float32)
+
+    expected = concordance_index_censored(y['event'], y['time'], risk)[0]
+    np.testing.assert_allclose(_c_index(weights, y['time'], y['event'], risk), [expected], rtol=1e-6)
+
+
+def test_bootstrap_weights_are_resamples(sample):
+    y, risk = sample
+    weights = bootstrap_weights(len(y), n_bootstrap=3, random_state=0)
+    assert weights.shape == (4, len(y))
+    assert (weights[0] == 1).all() and (weights.sum(axis=1) == len(y)).all()
+
+    # A weighted row scores like the resample it stands for
+    rows = np.repeat(np.arange(len(y)), weights[1].astype(int))
+    expected = concordance_index_censored(y['event'][rows], y['time'][rows], risk[rows])[0]
+    np.testing.assert_allclose(_c_index(weights, y['time'], y['event'], risk)[1], expected, rtol=1e-6)
+
+
+def test_time_auc_matches_sksurv(sample):
+    y, risk = sample
+    times = evaluation_times(y, n_times=5)
+    censoring = CensoringDistributionEstimator().fit(y)
+    ipcw = y['event'] / censoring.predict_proba(y['time'])
+
+    auc = _time_auc(np.ones((1, len(y)), dtype=np.float32), y['time'], y['event'], risk, ipcw, times)
+
+    expected, _ = cumulative_dynamic_auc(y, y, risk, times)
+    np.testing.assert_allclose(auc[0], expected, rtol=1e-6)
+
+
+def test_evaluate_model_point_estimates_match_sksurv(monkeypatch):
+    X = employee_features(300)
+    y = survival_target(X)
+    pipeline = fit_gbsa(X.iloc[:200], GradientBoostingSurvivalAnalysis(n_estimators=10, random_state=0))
+    # Censoring is estimated on the whole follow-up, which covers the test times
+    X_test, y_test, y_train = X.iloc[200:], y[200:], y
+    times = evaluation_times(y_test, n_times=4)
+
+    results = evaluate_model(pipeline, X_test, y_test, y_train=y_train, times=times, n_bootstrap=20, n_jobs=2)
+
+    risk = pipeline.predict(X_test)
+    assert results["c_index"]["estimate"] == pytest.approx(
+        concordance_index_censored(y_test['event'], y_test['time'], risk)[0], rel=1e-6)
+    expected_auc, _ = cumulative_dynamic_auc(y_train, y_test, risk, times)
+    np.testing.assert_allclose([a["estimate"] for a in results["auc"]], expected_auc, rtol=1e-6)
+    survival = np.stack([fn(times) for fn in pipeline.predict_survival_function(X_test)])
+    _, expected_brier = brier_score(y_train, y_test, survival, times)
+    np.testing.assert_allclose([b["estimate"] for b in results["brier"]], expected_brier, rtol=1e-5)
+    assert results["integrated_brier_score"]["estimate"] == pytest.approx(
+        integrated_brier_score(y_train, y_test, survival, times), rel=1e-5)
+    interval = results["c_index"]
+    assert interval["ci_low"] <= interval["mean"] <= interval["ci_high"]
+
+    # Cached per model version, data and settings
+    monkeypatch.setattr(evaluation, "_metrics", pytest.fail)
+    assert evaluate_model(pipeline, X_test, y_test, y_train=y_train, times=times, n_bootstrap=20) == results
@@ -0,0 +1,84 @@
+import copy
+import itertools
+import math
+
+import numpy as np
+import pytest
+from sksurv.ensemble import ComponentwiseGradientBoostingSurvivalAnalysis, GradientBoostingSurvivalAnalysis
+
+from employee_attrition.ml_logic.explanation import BASE_VALUE_COLUMN, TreeExplainer, explain_risk
+from employee_attrition.ml_logic.inference import InferencePlan
+from employee_attrition.ml_logic.schema import FEATURE_COLUMNS
+from synthetic import employee_features, fit_gbsa
+
+
+@pytest.fixture(scope="module")
+def pipeline_and_data():
+    X = employee_features(300)
+    model = GradientBoostingSurvivalAnalysis(n_estimators=20, max_depth=3, learning_rate=0.3, random_state=0)
+    return fit_gbsa(X, model), X
+
+
+def conditional_expectation(tree, x, known, node=0) -> float:
+    """E[tree(x) | x_known] over the training cover (path-dependent)"""
+    if tree.children_left[node] < 0:
+        return tree.value[node, 0, 0]
+    left, right = tree.children_left[node], tree.children_right[node]
+    if tree.feature[node] in known:
+        return conditional_expectation(tree, x, known, left if x[tree.feature[node]] <= tree.threshold[node] else right)
+    cover = tree.weighted_n_node_samples
+    return (cover[left] * conditional_expectation(tree, x, known, left)
+            + cover[right] * conditional_expectation(tree, x, known, right)) / cover[node]
+
+
+def brute_force_shapley(tree, x) -> dict:
+    """Shapley value of each feature the tree splits on, by enumerating the subsets"""
+    features = sorted(set(tree.feature[tree.feature >= 0]))
+    d = len(features)
+    values = {}
+    for i in features:
+        others = [f for f in features if f != i]
+        values[i] = sum(
+            math.factorial(s) * math.factorial(d - s - 1) / math.factorial(d)
+            * (conditional_expectation(tree, x, set(subset) | {i}) - conditional_expectation(tree, x, set(subset)))
+            for s in range(d) for subset in itertools.combinations(others, s))
+    return values
+
+
+def test_attributions_match_brute_force_shapley(pipeline_and_data):
+    pipeline, X = pipeline_and_data
+    model = pipeline.named_steps['model']
+    X_encoded = InferencePlan.from_pipeline(pipeline).transform(X.iloc[:5])
+
+    for stage in (0, 7, 19):
+        # The model reduced to this one tree, unscaled
+        single = copy.copy(model)
+        single.estimators_ = model.estimators_[stage:stage + 1]
+        single.learning_rate = 1.0
+        single._scale = None
+        tree = single.estimators_[0, 0].tree_
+
+        phi = TreeExplainer(single).attributions(X_encoded)
+        for row, x in enumerate(X_encoded):
+            expected = np.zeros(X_encoded.shape[1])
+            for feature, value in brute_force_shapley(tree, x).items():
+                expected[feature] = value
+            np.testing.assert_allclose(phi[row], expected, atol=1e-9)
+
+
+def test_base_value_plus_attributions_is_the_prediction(pipeline_and_data):
+    pipeline, X = pipeline_and_data
+    explanation = explain_risk(pipeline, X, chunk_rows=64)
+
+    assert list(explanation.index) == list(X.index)
+    assert set(explanation.columns) == set(FEATURE_COLUMNS) | {BASE_VALUE_COLUMN}
+    total = (explanation.drop(columns=BASE_VALUE_COLUMN).sum(axis=1).to_numpy(np.float64)
+             + explanation[BASE_VALUE_COLUMN].to_numpy(np.float64))
+    np.testing.assert_allclose(total, pipeline.predict(X), atol=1e-4)
+
+
+def test_unsupported_model_is_rejected():
+    X = employee_features(100)
+    pipeline = fit_gbsa(X, ComponentwiseGradientBoostingSurvivalAnalysis(n_estimators=5, random_state=0))
+    with pytest.raises(TypeError):
+        explain_risk(pipeline, X)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from sksurv.ensemble import ComponentwiseGradientBoostingSurvivalAnalysis, GradientBoostingSurvivalAnalysis
+
+from employee_attrition.ml_logic.export import export_model, load_exported_model
+from synthetic import employee_features, fit_gbsa
+
+
+@pytest.fixture(scope="module")
+def X():
+    return employee_features(300)
+
+
+@pytest.mark.parametrize("params", [
+    dict(n_estimators=30, max_depth=3),
+    dict(n_estimators=30, max_depth=5, subsample=0.5, max_features="sqrt"),
+    # Dropout rescales the stages (model._scale)
+    dict(n_estimators=20, max_depth=2, dropout_rate=0.2),
+    # exp(raw) output
+    dict(n_estimators=20, max_depth=3, loss="squared"),
+])
+def test_exported_scores_match_the_pipeline(X, tmp_path, params):
+    pipeline = fit_gbsa(X, GradientBoostingSurvivalAnalysis(random_state=0, **params))
+    path = str(tmp_path / "model.eam")
+
+    export_model(pipeline, path, metadata={"model_version": "v1"})
+    plan = load_exported_model(path)
+
+    np.testing.assert_array_equal(plan.predict(X), pipeline.predict(X))
+    assert plan.metadata == {"model_version": "v1"}
+
+
+def test_exported_baseline_and_arrays(X, tmp_path):
+    pipeline = fit_gbsa(X, GradientBoostingSurvivalAnalysis(n_estimators=10, random_state=0))
+    path = str(tmp_path / "model.eam")
+    export_model(pipeline, path)
+    plan = load_exported_model(path)
+
+    baseline = pipeline.named_steps['model']._get_baseline_model().baseline_survival_
+    np.testing.assert_array_equal(plan.baseline[0], baseline.x)
+    np.testing.assert_array_equal(plan.baseline[1], baseline.y)
+    # Read-only views of the mapped file, aligned for vectorized loads
+    assert not plan.means.flags.writeable
+    assert plan.means.ctypes.data % 64 == 0
+
+
+def test_mapped_model_survives_replacement(X, tmp_path):
+    path = str(tmp_path / "model.eam")
+    first = fit_gbsa(X, GradientBoostingSurvivalAnalysis(n_estimators=5, random_state=0))
+    second = fit_gbsa(X, GradientBoostingSurvivalAnalysis(n_estimators=5, random_state=1), seed=1)
+
+    export_model(first, path, metadata={"model_version": "1"})
+    mapped = load_exported_model(path)
+    export_model(second, path, metadata={"model_version": "2"})
+
+    np.testing.assert_array_equal(mapped.predict(X), first.predict(X))
+    assert load_exported_model(path).metadata["model_version"] == "2"
+
+
+def test_unsupported_models_and_files_are_rejected(X, tmp_path):
+    pipeline = fit_gbsa(X, ComponentwiseGradientBoostingSurvivalAnalysis(n_estimators=5, random_state=0))
+    with pytest.raises(TypeError):
+        export_model(pipeline, str(tmp_path / "model.eam"))
+
+    (tmp_path / "model.pkl").write_bytes(b"\x80\x04not an export")
+    with pytest.raises(ValueError):
+        load_exported_model(str(tmp_path / "model.pkl"))
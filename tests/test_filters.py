@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from employee_attrition import params
+from employee_attrition.ml_logic.data import get_data, iter_data, load_data_to_bq
+from synthetic import hr_table
+
+FILTERS = [('Attrition', '==', 'No'), ('Department', 'in', ['Sales', 'Human Resources']), ('YearsAtCompany', '<=', 5)]
+COLUMNS = ['Age', 'OverTime', 'YearsAtCompany']
+
+
+@pytest.fixture
+def full_data(local_data):
+    hr_table(400).to_csv(local_data / "hr.csv", index=False)
+    return get_data()
+
+
+def expected(full_data):
+    """The same rows and columns selected with pandas after a full read"""
+    rows = (full_data['Attrition'] == 0) & full_data['Department'].isin(['Sales', 'Human Resources']) \
+        & (full_data['YearsAtCompany'] <= 5)
+    return full_data.loc[rows, COLUMNS]
+
+
+@pytest.mark.parametrize("columnar_cache", [True, False])
+def test_local_reads_push_down_columns_and_filters(full_data, monkeypatch, columnar_cache):
+    monkeypatch.setattr(params, "COLUMNAR_CACHE", columnar_cache)
+
+    df = get_data(columns=COLUMNS, filters=FILTERS)
+
+    assert len(df) and df.columns.tolist() == COLUMNS
+    pd.testing.assert_frame_equal(df, expected(full_data), check_index_type=False, check_categorical=False)
+    chunks = list(iter_data(chunk_rows=20, columns=COLUMNS, filters=FILTERS))
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected(full_data), check_index_type=False,
+                                  check_categorical=False)
+    # The columnar copy still holds every row and column
+    assert get_data().shape == full_data.shape
+
+
+def test_warehouse_reads_push_down_columns_and_filters(full_data, local_warehouse):
+    load_data_to_bq(hr_table(400), "project", "dataset", "hr", truncate=True)
+
+    df = get_data(columns=COLUMNS, filters=FILTERS)
+
+    pd.testing.assert_frame_equal(df, expected(full_data), check_dtype=False, check_index_type=False)
+
+
+def test_unknown_filter_operator_is_rejected(full_data):
+    filters = [('JobRole', 'like', 'Sales%')]
+
+    with pytest.raises(ValueError, match="Unknown filter operator 'like'"):
+        get_data(filters=filters)
+    with pytest.raises(ValueError, match="Unknown filter operator 'like'"):
+        list(iter_data(filters=filters))
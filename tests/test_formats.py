@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pyarrow as pa
+import pytest
+from sksurv.ensemble import GradientBoostingSurvivalAnalysis
+
+from employee_attrition.api.formats import (
+    ARROW_STREAM, JSON, PARQUET, ArrowColumns, binary_format, read_table, response_format,
+    risk_scores_table, survival_curves_table, write_table,
+)
+from employee_attrition.ml_logic.inference import InferencePlan
+from synthetic import employee_features, fit_gbsa
+
+
+def test_content_negotiation():
+    assert binary_format("application/vnd.apache.arrow.file") == ARROW_STREAM
+    assert binary_format("Application/Parquet; charset=binary") == PARQUET
+    assert binary_format("application/json") is None
+    # Accept wins, then the request format, then JSON
+    assert response_format(f"text/html, {PARQUET}", "application/json") == PARQUET
+    assert response_format("*/*", ARROW_STREAM) == ARROW_STREAM
+    assert response_format(None, None) == JSON
+
+
+@pytest.mark.parametrize("fmt", [ARROW_STREAM, PARQUET])
+def test_tables_round_trip(fmt):
+    table = risk_scores_table(np.array([3, 1, 2], dtype=np.int32), np.array([0.5, -1.0, 2.0]))
+    assert read_table(write_table(table, fmt), fmt).equals(table)
+
+
+def test_arrow_file_bodies_are_accepted():
+    table = risk_scores_table([1], [0.0])
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    assert read_table(sink.getvalue().to_pybytes(), ARROW_STREAM).equals(table)
+
+
+def test_unreadable_body_is_a_value_error():
+    with pytest.raises(ValueError):
+        read_table(b"not arrow", ARROW_STREAM)
+    with pytest.raises(ValueError):
+        read_table(b"not parquet", PARQUET)
+
+
+def test_arrow_columns_score_like_the_pipeline():
+    X = employee_features(200)
+    pipeline = fit_gbsa(X, GradientBoostingSurvivalAnalysis(n_estimators=10, random_state=0))
+    # Categories as plain strings, as a client would send them
+    table = pa.Table.from_pandas(X.reset_index().astype({c: str for c in X.select_dtypes('category')}))
+
+    columns = ArrowColumns(read_table(write_table(table, ARROW_STREAM), ARROW_STREAM))
+    np.testing.assert_allclose(InferencePlan.from_pipeline(pipeline).predict(columns), pipeline.predict(X), rtol=1e-5)
+    assert len(columns) == table.num_columns
+    with pytest.raises(KeyError):
+        columns["NotAColumn"]
+
+
+def test_survival_curves_table_keeps_the_time_axis_once():
+    matrix = np.random.default_rng(0).random((2, 3))
+    table = survival_curves_table([10, 11], [0.0, 1.5, 3.0], matrix, dtype="float32")
+
+    assert json.loads(table.schema.metadata[b"Time"]) == [0.0, 1.5, 3.0]
+    assert table.column("SurvivalProbability").type == pa.list_(pa.float32(), 3)
+    np.testing.assert_array_equal(np.array(table.column("SurvivalProbability").to_pylist()),
+                                  matrix.astype(np.float32))
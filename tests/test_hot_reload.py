@@ -0,0 +1,85 @@
+import time
+
+import numpy as np
+import pytest
+from sksurv.ensemble import GradientBoostingSurvivalAnalysis
+
+from employee_attrition import params
+from employee_attrition.api import fast
+from employee_attrition.ml_logic import registry
+from employee_attrition.ml_logic.registry import get_model_version, save_model
+from synthetic import fit_gbsa
+
+
+@pytest.fixture(scope="module")
+def new_pipeline(served_pipeline):
+    _, X = served_pipeline
+    return fit_gbsa(X, GradientBoostingSurvivalAnalysis(n_estimators=15, max_depth=2, random_state=1), seed=1)
+
+
+def save_new_version(pipeline):
+    """Save a model as a new registry version (local versions are file mtime and size)"""
+    before = get_model_version()
+    while True:
+        save_model(pipeline)
+        if get_model_version() != before:
+            return get_model_version()
+        time.sleep(0.01)
+
+
+def test_refresh_loads_only_a_new_version(local_registry, served_pipeline, new_pipeline):
+    pipeline, X = served_pipeline
+    assert fast.refresh_serving_model(None) is None
+
+    version = save_new_version(pipeline)
+    model, plan, loaded_version = fast.refresh_serving_model(None)
+    assert loaded_version == version
+    assert fast.refresh_serving_model(version) is None
+
+    new_version = save_new_version(new_pipeline)
+    model, plan, loaded_version = fast.refresh_serving_model(version)
+    assert loaded_version == new_version
+    np.testing.assert_allclose(plan.predict(X), new_pipeline.predict(X), rtol=1e-6)
+
+
+def test_workers_export_a_new_version_once(local_registry, served_pipeline, new_pipeline, tmp_path, monkeypatch):
+    monkeypatch.setattr(params, "SERVING_MODEL_PATH", str(tmp_path / "model.eam"))
+    exports = []
+    monkeypatch.setattr(fast, "export_serving_model", lambda path: exports.append(registry.export_serving_model(path)))
+
+    version = save_new_version(served_pipeline[0])
+    first_worker = fast.refresh_serving_model(None)
+    second_worker = fast.refresh_serving_model(None)
+
+    assert exports == [version]
+    assert first_worker[0] is None and first_worker[2] == version
+    assert second_worker[2] == version
+
+    new_version = save_new_version(new_pipeline)
+    assert fast.refresh_serving_model(version)[2] == new_version
+    assert exports == [version, new_version]
+
+
+def test_api_swaps_in_a_new_version(local_registry, served_pipeline, new_pipeline, start_api, monkeypatch):
+    pipeline, X = served_pipeline
+    monkeypatch.setattr(fast, "load_model_with_version", registry.load_model_with_version)
+    monkeypatch.setattr(params, "MODEL_POLL_INTERVAL_S", 0.05)
+    version = save_new_version(pipeline)
+    client = start_api()
+    hr_data = X.iloc[:10].reset_index().astype(object).to_dict(orient='list')
+
+    def served_scores():
+        response = client.post("/predictRisk", json={"hr_data": hr_data})
+        return [row["PredictedRisk"] for row in response.json()["risk_scores_df"]]
+
+    assert client.get("/health/ready").json()["model_version"] == version
+    np.testing.assert_allclose(served_scores(), pipeline.predict(X.iloc[:10]), rtol=1e-6)
+
+    new_version = save_new_version(new_pipeline)
+    deadline = time.monotonic() + 30
+    while client.get("/health/ready").json()["model_version"] != new_version and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert client.get("/health/ready").json()["model_version"] == new_version
+    # Cached scores of the previous model are not served
+    np.testing.assert_allclose(served_scores(), new_pipeline.predict(X.iloc[:10]), rtol=1e-6)
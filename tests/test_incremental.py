@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sksurv.ensemble import GradientBoostingSurvivalAnalysis
+from sksurv.linear_model.coxph import BreslowEstimator
+
+from employee_attrition.interface import main
+from employee_attrition.ml_logic import incremental
+from employee_attrition.ml_logic.data import get_data
+from employee_attrition.ml_logic.incremental import (
+    changed_rows, detect_drift, full_refit_reason, load_training_state, save_training_state, warm_start_pipeline,
+)
+from employee_attrition.ml_logic.model import validation_mask
+from employee_attrition.ml_logic.registry import get_model_version, save_model
+from synthetic import employee_features, fit_gbsa, hr_table, survival_target
+
+
+@pytest.fixture(scope="module")
+def pipeline_and_data():
+    X = employee_features(300)
+    return fit_gbsa(X, GradientBoostingSurvivalAnalysis(n_estimators=10, max_depth=2, random_state=0)), X
+
+
+def test_warm_start_adds_stages_and_refits_the_baseline(pipeline_and_data):
+    pipeline, X = pipeline_and_data
+    y = survival_target(X)
+    model = pipeline.named_steps['model']
+
+    warm = warm_start_pipeline(pipeline, X.iloc[:50], y[:50], X.iloc[:250], y[:250], n_stages=5)
+    warm_model = warm.named_steps['model']
+
+    assert len(warm_model.estimators_) == 15 and not warm_model.warm_start
+    # The production model is left as it was, its stages are kept
+    assert len(model.estimators_) == 10
+    for old, new in zip(model.estimators_[:, 0], warm_model.estimators_[:10, 0]):
+        np.testing.assert_array_equal(old.tree_.threshold, new.tree_.threshold)
+    # Breslow baseline of the new risk scores over X_all
+    X_all = warm.named_steps['preprocessor'].transform(X.iloc[:250]).astype(np.float32)
+    expected = BreslowEstimator().fit(warm_model._predict(X_all), y[:250]['event'], y[:250]['time'])
+    np.testing.assert_allclose(warm_model._baseline_model.baseline_survival_.y, expected.baseline_survival_.y)
+
+
+def test_training_state_and_delta():
+    raw_data = employee_features(100)
+    save_training_state(raw_data, "v1", mode="full")
+    state = load_training_state()
+    assert (state["model_version"], state["mode"], state["incremental_runs"], state["n_rows"]) == ("v1", "full", 0, 100)
+
+    changed = raw_data.copy()
+    changed.iloc[3, changed.columns.get_loc('Age')] += 1
+    new_rows = employee_features(105).iloc[100:]
+    delta = changed_rows(pd.concat([changed, new_rows]), state)
+    assert np.flatnonzero(delta).tolist() == [3, 100, 101, 102, 103, 104]
+
+
+def test_full_refit_reasons(pipeline_and_data, monkeypatch):
+    pipeline, _ = pipeline_and_data
+    state = {"model_version": "v1", "incremental_runs": 2}
+    monkeypatch.setattr(incremental, "RETRAIN_FULL_EVERY", 3)
+    monkeypatch.setattr(incremental, "RETRAIN_MAX_DELTA_FRACTION", 0.25)
+
+    assert full_refit_reason(pipeline, "v1", state, n_changed=10, n_rows=100) is None
+    assert full_refit_reason(None, "v1", state, 10, 100) == "no production model"
+    assert full_refit_reason(pipeline, "v1", None, 10, 100) == "no training state"
+    assert "not the one" in full_refit_reason(pipeline, "v2", state, 10, 100)
+    assert "scheduled" in full_refit_reason(pipeline, "v1", {**state, "incremental_runs": 3}, 10, 100)
+    assert "26 new or changed rows" in full_refit_reason(pipeline, "v1", state, 26, 100)
+
+
+def test_drift_detection(pipeline_and_data):
+    pipeline, X = pipeline_and_data
+    preprocessor = pipeline.named_steps['preprocessor']
+
+    assert detect_drift(preprocessor, X.iloc[:50]) is None
+    shifted = X.iloc[:50].copy()
+    shifted['MonthlyIncome'] += 30
+    assert "MonthlyIncome" in detect_drift(preprocessor, shifted)
+    unseen = X.iloc[:50].copy()
+    unseen['OverTime'] = unseen['OverTime'].cat.set_categories(['No', 'Yes', 'Sometimes'])
+    unseen.iloc[0, unseen.columns.get_loc('OverTime')] = 'Sometimes'
+    assert "unseen OverTime" in detect_drift(preprocessor, unseen)
+
+
+def test_retrain_fits_on_the_delta_and_never_on_validation_rows(local_data, local_registry, monkeypatch):
+    hr_table(400).to_csv(local_data / "hr.csv", index=False)
+    raw_data = get_data()
+    X = raw_data.drop(columns=['Attrition', 'YearsAtCompany'])
+    validation = validation_mask(X.index)
+    pipeline = fit_gbsa(X[~validation], GradientBoostingSurvivalAnalysis(n_estimators=10, random_state=0))
+    save_model(pipeline)
+    save_training_state(raw_data, get_model_version(), mode="full")
+
+    # Some trainable and some validation employees changed
+    changed = raw_data.copy()
+    changed.iloc[:20, changed.columns.get_loc('DistanceFromHome')] += 1
+    calls = []
+    monkeypatch.setattr(main, "warm_start_pipeline",
+                        lambda *args, **kwargs: calls.append(args) or warm_start_pipeline(*args, **kwargs))
+
+    retrained, mode, incremental_runs = main.retrain_pipeline(changed)
+
+    assert (mode, incremental_runs) == ("incremental", 1)
+    _, X_fit, _, X_all, _ = calls[0]
+    assert not validation_mask(X_fit.index).any()
+    assert not validation_mask(X_all.index).any()
+    assert set(X_fit.index) >= set(X.index[:20][~validation[:20]])
+    assert len(retrained.named_steps['model'].estimators_) == 10 + main.params.RETRAIN_INCREMENTAL_STAGES
+
+    assert main.retrain_pipeline(raw_data)[1] == "unchanged"
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from sksurv.ensemble import ComponentwiseGradientBoostingSurvivalAnalysis, GradientBoostingSurvivalAnalysis
+
+from employee_attrition.ml_logic.inference import InferencePlan, compile_pipeline
+from synthetic import employee_features, fit_gbsa
+
+
+@pytest.fixture(scope="module", params=["gbsa", "componentwise"])
+def pipeline_and_data(request):
+    X = employee_features(300)
+    if request.param == "gbsa":
+        model = GradientBoostingSurvivalAnalysis(n_estimators=20, max_depth=3, random_state=0)
+    else:
+        model = ComponentwiseGradientBoostingSurvivalAnalysis(n_estimators=50, random_state=0)
+    return fit_gbsa(X, model), X
+
+
+def test_plan_scores_match_the_pipeline(pipeline_and_data):
+    pipeline, X = pipeline_and_data
+    plan = InferencePlan.from_pipeline(pipeline)
+
+    expected = pipeline.predict(X)
+    np.testing.assert_allclose(plan.predict(X), expected, rtol=1e-5)
+    # JSON payload orientations: dict of lists, dict of {index: value}
+    np.testing.assert_allclose(plan.predict(X.astype(object).to_dict(orient='list')), expected, rtol=1e-5)
+    np.testing.assert_allclose(plan.predict(X.astype(object).to_dict()), expected, rtol=1e-5)
+
+
+def test_plan_matrix_matches_the_preprocessor(pipeline_and_data):
+    pipeline, X = pipeline_and_data
+    plan = InferencePlan.from_pipeline(pipeline)
+
+    encoded = plan.transform(X.reset_index())
+    assert encoded.dtype == np.float32
+    assert plan.feature_names == list(pipeline.named_steps['preprocessor'].get_feature_names_out())
+    np.testing.assert_allclose(encoded, pipeline.named_steps['preprocessor'].transform(X), atol=1e-5)
+
+
+def test_plan_rejects_bad_payloads(pipeline_and_data):
+    pipeline, X = pipeline_and_data
+    plan = InferencePlan.from_pipeline(pipeline)
+    payload = X.astype(object).to_dict(orient='list')
+
+    with pytest.raises(ValueError, match="missing"):
+        plan.predict({k: v for k, v in payload.items() if k != 'Age'})
+    with pytest.raises(ValueError, match="unknown categories"):
+        plan.predict({**payload, 'OverTime': ['Maybe'] * len(X)})
+    with pytest.raises(ValueError, match="same length"):
+        plan.predict({**payload, 'Age': payload['Age'][:-1]})
+    assert len(plan.score(np.empty((0, plan.n_features), dtype=np.float32))) == 0
+
+
+def test_compile_pipeline_falls_back_to_none():
+    assert compile_pipeline(None) is None
+    assert compile_pipeline(type("Unfitted", (), {"named_steps": {}})()) is None
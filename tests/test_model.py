@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from sksurv.ensemble import ComponentwiseGradientBoostingSurvivalAnalysis, GradientBoostingSurvivalAnalysis
+
+from employee_attrition.ml_logic.model import build_learner, compare_learners, fit_pipeline, fit_with_early_stopping
+from employee_attrition.ml_logic.preprocessing import build_preprocessor
+from synthetic import employee_features, survival_target
+
+
+@pytest.fixture(scope="module")
+def data():
+    X = employee_features(400)
+    return X, survival_target(X)
+
+
+def test_build_learner():
+    model = build_learner("componentwise", n_estimators=7)
+    assert isinstance(model, ComponentwiseGradientBoostingSurvivalAnalysis)
+    assert model.n_estimators == 7
+    assert isinstance(build_learner("gbsa"), GradientBoostingSurvivalAnalysis)
+    with pytest.raises(ValueError):
+        build_learner("forest")
+
+
+def test_early_stopping_keeps_the_best_stage_count(data):
+    X, y = data
+    X_encoded = build_preprocessor().fit_transform(X).astype(np.float32)
+    train, val = slice(0, 300), slice(300, None)
+    model = GradientBoostingSurvivalAnalysis(n_estimators=200, max_depth=2, learning_rate=0.5, random_state=0)
+
+    best, history = fit_with_early_stopping(model, X_encoded[train], y[train], X_encoded[val], y[val],
+                                            eval_every=10, patience=3)
+
+    stages = [n for n, _ in history]
+    assert stages == list(range(10, 10 * len(history) + 1, 10))
+    assert best.n_estimators == max(history, key=lambda h: h[1])[0]
+    assert not best.warm_start
+    # Growing the ensemble by warm starts ends on the same model as one fit
+    cold = GradientBoostingSurvivalAnalysis(n_estimators=best.n_estimators, max_depth=2, learning_rate=0.5,
+                                            random_state=0).fit(X_encoded[train], y[train])
+    np.testing.assert_allclose(best.predict(X_encoded[val]), cold.predict(X_encoded[val]))
+
+
+def test_early_stopping_stops_after_patience(data):
+    X, y = data
+    X_encoded = build_preprocessor().fit_transform(X)
+    model = ComponentwiseGradientBoostingSurvivalAnalysis(n_estimators=1000, random_state=0)
+
+    # No later evaluation can improve by tol=1
+    best, history = fit_with_early_stopping(model, X_encoded, y, X_encoded, y, eval_every=5, patience=2, tol=1.0)
+
+    assert [n for n, _ in history] == [5, 10, 15]
+    assert best.n_estimators == 5
+
+
+def test_fit_pipeline_with_early_stopping(data):
+    X, y = data
+    pipeline = fit_pipeline(X, y, build_learner("gbsa", n_estimators=60, max_depth=2), early_stopping=True)
+
+    assert pipeline.named_steps['model'].n_estimators <= 60
+    assert pipeline.predict(X).shape == (len(X),)
+
+
+def test_compare_learners_selects_the_fastest_good_enough_option(data):
+    X, y = data
+    options = {"gbsa": {"learner": "gbsa", "n_estimators": 10},
+               "componentwise": {"learner": "componentwise", "n_estimators": 20}}
+
+    report = compare_learners(X, y, options=options, tolerance=1.0)
+
+    assert set(report["option"]) == set(options)
+    assert report["fit_time_s"].is_monotonic_increasing
+    # Every option is within tolerance: the fastest one is selected
+    assert report["selected"].tolist() == [True, False]
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from employee_attrition import params
+from employee_attrition.ml_logic import object_store
+from employee_attrition.ml_logic.data import get_explanations, get_processed_data_from_gcs, get_risk_scores, save_data
+from employee_attrition.ml_logic.object_store import LocalBucket, download_frame, get_bucket, upload_frame, upload_frames
+
+
+@pytest.fixture
+def gcs_data(tmp_path, monkeypatch):
+    """Save and read the processed data in a local stand-in bucket (DATA_TARGET=gcs, GCS_LOCAL_ROOT)"""
+    monkeypatch.setattr(object_store, "GCS_LOCAL_ROOT", str(tmp_path / "gcs"))
+    monkeypatch.setattr(object_store, "BUCKET_NAME", "bucket")
+    for name, value in [("DATA_TARGET", "gcs"), ("BUCKET_NAME", "bucket"), ("CLEANED_DATA", "cleaned.csv"),
+                        ("FEATURE_IMPORTANCE_DATA", "feature_importance.csv"),
+                        ("RISK_SCORE_DATA", "risk_scores.csv"), ("EXPLANATION_DATA", "explanations.csv")]:
+        monkeypatch.setattr(params, name, value)
+    return tmp_path / "gcs" / "bucket"
+
+
+def frame(n_rows):
+    index = pd.Index(np.arange(1, n_rows + 1, dtype=np.int32), name='EmployeeNumber')
+    return pd.DataFrame({'PredictedRisk': np.linspace(-1, 1, n_rows), 'YearsAtCompany': np.arange(n_rows) % 40,
+                         'Department': pd.Categorical(np.where(np.arange(n_rows) % 2, 'Sales', 'R&D'))}, index=index)
+
+
+def test_frames_round_trip_row_group_by_row_group(tmp_path):
+    bucket = LocalBucket(str(tmp_path))
+    df = frame(250)
+
+    upload_frame(bucket, "risk.parquet", df, row_group_rows=100)
+
+    assert pq.ParquetFile(tmp_path / "risk.parquet").metadata.num_row_groups == 3
+    pd.testing.assert_frame_equal(download_frame(bucket, "risk.parquet"), df)
+    pd.testing.assert_frame_equal(download_frame(bucket, "risk.parquet", columns=['EmployeeNumber', 'PredictedRisk']),
+                                  df[['PredictedRisk']])
+
+
+def test_failed_upload_leaves_the_previous_object(tmp_path):
+    bucket = LocalBucket(str(tmp_path / "bucket"))
+    upload_frame(bucket, "risk.parquet", frame(10))
+
+    with pytest.raises(ValueError):
+        with bucket.blob("risk.parquet").open("wb") as f:
+            f.write(b"partial")
+            raise ValueError("connection lost")
+
+    pd.testing.assert_frame_equal(download_frame(bucket, "risk.parquet"), frame(10))
+    assert [path.name for path in (tmp_path / "bucket").iterdir()] == ["risk.parquet"]
+
+
+def test_concurrent_uploads_raise_the_first_failure(tmp_path):
+    bucket = LocalBucket(str(tmp_path))
+
+    assert upload_frames({"a.parquet": frame(5), "b.parquet": frame(6)}, bucket, max_workers=2) == \
+        ["a.parquet", "b.parquet"]
+    with pytest.raises(AttributeError):
+        upload_frames({"c.parquet": frame(5), "d.parquet": "not a frame"}, bucket, max_workers=2)
+    assert not bucket.blob("d.parquet").exists()
+
+
+def test_processed_data_round_trip_through_the_bucket(gcs_data):
+    cleaned, risk_scores = frame(120), frame(120)[['PredictedRisk', 'YearsAtCompany']]
+    feature_importance = pd.DataFrame({'feature': ['Age', 'OverTime'], 'importance': [0.7, 0.3]})
+    explanations = frame(120)[['PredictedRisk']].rename(columns={'PredictedRisk': 'Age'})
+
+    save_data(cleaned, feature_importance, risk_scores, explanations)
+
+    assert sorted(path.name for path in gcs_data.iterdir()) == \
+        ['cleaned.parquet', 'explanations.parquet', 'feature_importance.parquet', 'risk_scores.parquet']
+    success, *frames = get_processed_data_from_gcs()
+    assert success
+    for read, written in zip(frames, [cleaned, feature_importance, risk_scores]):
+        pd.testing.assert_frame_equal(read, written)
+    pd.testing.assert_frame_equal(get_risk_scores(), risk_scores)
+    pd.testing.assert_frame_equal(get_explanations(), explanations)
+
+    # A model saved without risk factors removes the previous ones
+    save_data(cleaned, feature_importance, risk_scores)
+    assert get_explanations() is None
+
+
+def test_csv_objects_of_earlier_versions_are_still_read(gcs_data):
+    gcs_data.mkdir(parents=True)
+    frame(30).to_csv(gcs_data / "risk_scores.csv")
+
+    risk_scores = get_risk_scores()
+
+    assert risk_scores.columns.tolist() == ['PredictedRisk', 'YearsAtCompany']
+    np.testing.assert_allclose(risk_scores['PredictedRisk'], frame(30)['PredictedRisk'])
+    assert isinstance(get_bucket(), LocalBucket)
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from employee_attrition.api.prediction_cache import ENTRY_BYTES, PredictionCache
+
+
+def test_row_keys():
+    X = np.array([[1.0, -0.0], [1.0, 0.0], [2.0, 0.0]])
+    keys = PredictionCache.row_keys(X)
+
+    assert keys[0] == keys[1] != keys[2]
+    assert all(isinstance(key, bytes) and len(key) == 8 for key in keys)
+    # Same values from another dtype, another key with a salt
+    assert PredictionCache.row_keys(X.astype(np.float32)) == keys
+    assert PredictionCache.row_keys(X, salt=b"grid")[2] == keys[2] + b"grid"
+
+
+def test_scores_are_cached_for_the_served_model():
+    cache = PredictionCache(1 << 20)
+    model = object()
+    cache.reset(model)
+    keys = PredictionCache.row_keys(np.eye(3))
+
+    cache.store(model, keys[:2], [0.5, 1.5])
+    scores, missing = cache.lookup(keys)
+
+    np.testing.assert_array_equal(scores[:2], [0.5, 1.5])
+    assert np.isnan(scores[2])
+    assert missing.tolist() == [False, False, True]
+    assert cache.metrics()["hits"] == 2 and cache.metrics()["misses"] == 1
+
+
+def test_a_new_model_invalidates_the_cache():
+    cache = PredictionCache(1 << 20)
+    old_model, new_model = object(), object()
+    cache.reset(old_model)
+    keys = PredictionCache.row_keys(np.eye(2))
+    cache.store(old_model, keys, [1.0, 2.0])
+
+    cache.reset(new_model)
+    assert cache.lookup(keys)[1].all()
+    # Results the previous model finishes computing after the swap are dropped
+    cache.store(old_model, keys, [1.0, 2.0])
+    assert cache.lookup(keys)[1].all()
+
+
+def test_curves_are_cached_row_by_row():
+    cache = PredictionCache(1 << 20)
+    model = object()
+    cache.reset(model)
+    keys = PredictionCache.row_keys(np.eye(2), salt=b"curves")
+    curves = np.array([[1.0, 0.9, 0.8], [1.0, 0.5, 0.2]])
+
+    cache.store(model, keys, curves)
+    cached, missing = cache.lookup_curves(keys, 3)
+
+    np.testing.assert_array_equal(cached, curves)
+    assert not missing.any()
+
+
+def test_least_recently_used_rows_are_evicted():
+    keys = PredictionCache.row_keys(np.eye(4))
+    cache = PredictionCache(3 * (ENTRY_BYTES + len(keys[0])))
+    model = object()
+    cache.reset(model)
+
+    cache.store(model, keys[:3], [0.0, 1.0, 2.0])
+    cache.lookup(keys[:1])
+    cache.store(model, keys[3:], [3.0])
+
+    assert cache.lookup(keys)[1].tolist() == [False, True, False, False]
+    assert cache.metrics()["evictions"] == 1
+
+
+@pytest.mark.parametrize("compiled", [True, False], ids=["plan", "pipeline"])
+def test_api_serves_repeated_rows_from_the_cache(start_api, served_pipeline, compiled):
+    pipeline, X = served_pipeline
+    client = start_api(compiled=compiled)
+    hr_data = X.iloc[:10].reset_index().astype(object).to_dict(orient='list')
+    # The same rows, columns reordered and given as floats
+    reordered = {column: [float(v) for v in values] if column == 'Age' else values
+                 for column, values in reversed(list(hr_data.items()))}
+
+    first = client.post("/predictRisk", json={"hr_data": hr_data}).json()
+    second = client.post("/predictRisk", json={"hr_data": reordered}).json()
+    assert first == second
+    assert client.get("/metrics").json()["prediction_cache"]["hits"] == 10
+
+    curves = [client.post("/getSurvivalCurves", json={"hr_data": hr_data, "n_points": 5}).json()
+              for _ in range(2)]
+    assert curves[0] == curves[1]
+    # Ten curve hits on the second call, the risk scores behind the first were cached too
+    assert client.get("/metrics").json()["prediction_cache"]["hits"] == 30
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from sklearn.pipeline import Pipeline
+from sksurv.ensemble import GradientBoostingSurvivalAnalysis
+
+from employee_attrition.ml_logic import preprocessing
+from employee_attrition.ml_logic.inference import InferencePlan
+from employee_attrition.ml_logic.model import ToDataFrame
+from employee_attrition.ml_logic.preprocessing import build_preprocessor, data_fingerprint, fit_transform_cached
+from synthetic import employee_features, survival_target
+
+
+@pytest.fixture
+def X():
+    return employee_features(200)
+
+
+def test_cached_result_matches_a_fresh_fit(X, monkeypatch):
+    fits = []
+    fit_chunked = preprocessing.fit_chunked
+    monkeypatch.setattr(preprocessing, "fit_chunked", lambda *args: fits.append(1) or fit_chunked(*args))
+
+    preprocessor, X_processed = fit_transform_cached(X, dtype=np.float32)
+    assert X_processed.dtype == np.float32
+    np.testing.assert_allclose(X_processed, build_preprocessor().fit_transform(X), atol=1e-5)
+
+    cached_preprocessor, cached_processed = fit_transform_cached(X, dtype=np.float32)
+    assert len(fits) == 1
+    np.testing.assert_array_equal(cached_processed, X_processed)
+    np.testing.assert_array_equal(cached_preprocessor.transform(X), preprocessor.transform(X))
+
+    # Other rows or another dtype are other entries
+    fit_transform_cached(X.iloc[1:], dtype=np.float32)
+    fit_transform_cached(X, dtype=np.float64)
+    assert len(fits) == 3
+
+
+def test_fingerprint_covers_values_index_columns_and_target(X):
+    y = survival_target(X)
+    fingerprint = data_fingerprint(X, y)
+
+    assert data_fingerprint(X.copy(), y.copy()) == fingerprint
+    changed = X.copy()
+    changed.iloc[0, changed.columns.get_loc('Age')] += 1
+    assert data_fingerprint(changed, y) != fingerprint
+    assert data_fingerprint(X.set_axis(X.index + 1), y) != fingerprint
+    assert data_fingerprint(X.rename(columns={'Age': 'age'}), y) != fingerprint
+    assert data_fingerprint(X, y[::-1]) != fingerprint
+    assert data_fingerprint(X) != fingerprint
+
+
+def test_pipelines_with_the_legacy_to_dataframe_step_still_compile(X):
+    y = survival_target(X)
+    preprocessor = build_preprocessor().fit(X)
+    to_dataframe = ToDataFrame(preprocessor).fit(X)
+    model = GradientBoostingSurvivalAnalysis(n_estimators=5, random_state=0)
+    model.fit(to_dataframe.transform(preprocessor.transform(X)), y)
+    pipeline = Pipeline([('preprocessor', preprocessor), ('to_dataframe', to_dataframe), ('model', model)])
+
+    np.testing.assert_allclose(InferencePlan.from_pipeline(pipeline).predict(X), pipeline.predict(X), rtol=1e-5)
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from employee_attrition import params
+from employee_attrition.api import fast
+from employee_attrition.api.risk_table import RiskTable
+from employee_attrition.ml_logic import data
+from employee_attrition.ml_logic.data import get_risk_scores, save_data
+from employee_attrition.ml_logic.survival import baseline_survival, survival_matrix
+
+
+@pytest.fixture
+def risk_score_df():
+    return pd.DataFrame({"PredictedRisk": [0.3, 2.5, -1.0, 1.2], "YearsAtCompany": [1, 4, 2, 8]},
+                        index=pd.Index([40, 7, 1000, 12], name="EmployeeNumber"))
+
+
+def test_lookups(risk_score_df):
+    table = RiskTable.from_frame(risk_score_df)
+
+    positions, found = table.positions([12, 5, 40, 2**40])
+    assert found.tolist() == [True, False, True, False]
+    assert table.records(positions[found]) == [
+        {"EmployeeNumber": 12, "PredictedRisk": 1.2, "YearsAtCompany": 8},
+        {"EmployeeNumber": 40, "PredictedRisk": 0.3, "YearsAtCompany": 1},
+    ]
+    assert [r["EmployeeNumber"] for r in table.records(table.top(3))] == [7, 12, 40]
+    assert not RiskTable.from_frame(risk_score_df.iloc[:0]).positions([1])[1].any()
+
+
+def test_precomputed_curves_match_the_model(risk_score_df, served_pipeline):
+    baseline = baseline_survival(served_pipeline[0].named_steps['model'])
+    table = RiskTable.from_frame(risk_score_df, baseline, n_points=6, max_time=5)
+
+    positions, _ = table.positions([1000])
+    expected = survival_matrix(baseline, [-1.0], table.time_grid)
+    assert table.survival.dtype == np.float32 and table.survival.shape == (4, 6)
+    np.testing.assert_allclose(table.survival[positions], expected, rtol=1e-6)
+
+
+def test_saved_risk_scores_are_read_back(local_data, risk_score_df, monkeypatch):
+    frames = [pd.DataFrame({"x": [1]})] * 2
+    save_data(*frames, risk_score_df)
+
+    assert (local_data / params.RISK_SCORE_DATA).exists()
+    # Read back in compact dtypes
+    pd.testing.assert_frame_equal(get_risk_scores(), risk_score_df, check_dtype=False, check_index_type=False)
+
+    monkeypatch.setattr(params, "LOCAL_CACHE_DIR", None)
+    with pytest.raises(ValueError):
+        save_data(*frames, risk_score_df)
+
+
+def test_risk_endpoints(local_data, risk_score_df, served_pipeline, start_api, monkeypatch):
+    save_data(pd.DataFrame({"x": [1]}), pd.DataFrame({"x": [1]}), risk_score_df)
+    monkeypatch.setattr(fast, "get_risk_scores", data.get_risk_scores)
+    monkeypatch.setattr(params, "RISK_TABLE_CURVE_POINTS", 4)
+    client = start_api()
+
+    top = client.get("/risk/top", params={"n": 2}).json()
+    assert [r["EmployeeNumber"] for r in top["risk_scores"]] == [7, 12]
+
+    response = client.get("/risk", params={"employee_number": [1000, 3], "curves": True}).json()
+    assert response["risk_scores"][0]["PredictedRisk"] == -1.0
+    assert response["missing"] == [3]
+    assert response["survival_curves"]["shape"] == [1, 4]
+
+    assert client.get("/risk/7").json()["risk_scores"][0]["PredictedRisk"] == 2.5
+    assert client.get("/risk/3").status_code == 404
+    # No risk factors were saved
+    assert client.get("/risk/7", params={"explain": True}).status_code == 400
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from employee_attrition.ml_logic import preprocessing
+from employee_attrition.ml_logic.preprocessing import build_preprocessor, fit_chunked, transform_chunked
+from employee_attrition.ml_logic.schema import EMPLOYEE_DTYPES, apply_schema, read_employee_csv, validate_employee_table
+from synthetic import employee_features, hr_table
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "hr.csv"
+    hr_table(300).to_csv(path, index=False)
+    return path
+
+
+def test_csv_is_parsed_into_the_compact_schema(csv_path):
+    plain = pd.read_csv(csv_path)
+
+    df = read_employee_csv(csv_path, chunksize=64)
+
+    assert df.dtypes.to_dict() == {column: pd.api.types.pandas_dtype(dtype) for column, dtype in EMPLOYEE_DTYPES.items()}
+    pd.testing.assert_frame_equal(df, apply_schema(plain.copy()))
+    pd.testing.assert_frame_equal(df.astype(plain.dtypes), plain)
+    assert df.memory_usage(deep=True).sum() < plain.memory_usage(deep=True).sum() / 4
+
+    # Projection keeps the file order, filters may use other columns
+    sales = read_employee_csv(csv_path, columns=['Age', 'EmployeeNumber'], filters=[('Department', '==', 'Sales')])
+    assert sales.columns.tolist() == ['Age', 'EmployeeNumber']
+    assert sales['EmployeeNumber'].tolist() == plain.loc[plain['Department'] == 'Sales', 'EmployeeNumber'].tolist()
+
+
+@pytest.mark.parametrize("change, problem", [
+    (lambda df: df.drop(columns=['Age']), r"missing columns \['Age'\]"),
+    (lambda df: df.assign(Age=df['Age'].astype(float).where(df.index > 0)), "Age: 1 missing values"),
+    (lambda df: df.assign(Department=df['Department'].replace('Sales', 'Marketing')), r"Department: values \['Marketing'\]"),
+    (lambda df: df.assign(Age=df['Age'] + 200), "Age: values outside the int8 range"),
+    (lambda df: df.assign(DailyRate=df['DailyRate'] + 0.5), "DailyRate: expected integers"),
+])
+def test_invalid_tables_are_rejected(csv_path, change, problem):
+    df = change(pd.read_csv(csv_path))
+
+    with pytest.raises(ValueError, match=problem):
+        apply_schema(df)
+
+
+def test_only_the_expected_columns_are_required(csv_path):
+    df = pd.read_csv(csv_path, usecols=['EmployeeNumber', 'Age'])
+
+    validate_employee_table(df, columns=['EmployeeNumber', 'Age'])
+    with pytest.raises(ValueError, match="missing columns"):
+        validate_employee_table(df)
+
+
+def test_chunked_fit_matches_a_plain_fit(monkeypatch):
+    X = employee_features(500)
+    monkeypatch.setattr(preprocessing, "TRANSFORM_CHUNK_ROWS", 64)
+
+    chunked = fit_chunked(build_preprocessor(), X)
+    plain = build_preprocessor().fit(X)
+
+    np.testing.assert_array_equal(chunked.get_feature_names_out(), plain.get_feature_names_out())
+    np.testing.assert_allclose(transform_chunked(chunked, X), plain.transform(X), rtol=1e-10, atol=1e-10)
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from employee_attrition import params
+from employee_attrition.interface import main
+from employee_attrition.ml_logic.data import get_data
+from employee_attrition.ml_logic.model import build_learner
+from employee_attrition.ml_logic.registry import save_model
+from employee_attrition.ml_logic.scoring import _push_top_k, _write_worker_model, score_chunks
+from synthetic import employee_features, fit_gbsa, hr_table
+
+
+def chunked(X, chunk_rows):
+    return (X.iloc[start:start + chunk_rows] for start in range(0, len(X), chunk_rows))
+
+
+def top_by_sort(scored, top_k):
+    return scored.sort_values('PredictedRisk', ascending=False, kind='stable').head(top_k)
+
+
+def test_scores_are_written_in_order_with_the_top_k(served_pipeline, tmp_path):
+    pipeline, X = served_pipeline
+    X = X.assign(YearsAtCompany=np.arange(len(X)) % 40)
+    output_path = str(tmp_path / "scores" / "risk_scores.parquet")
+
+    top = score_chunks(pipeline, chunked(X, 30), output_path, top_k=15, n_jobs=2)
+
+    scored = pd.read_parquet(output_path)
+    assert scored.columns.tolist()[-2:] == ['PredictedRisk', 'YearsAtCompany']
+    assert scored.index.equals(X.index)
+    np.testing.assert_allclose(scored['PredictedRisk'], pipeline.predict(X.drop(columns='YearsAtCompany')), rtol=1e-5)
+    pd.testing.assert_frame_equal(top, top_by_sort(scored, 15), check_categorical=False)
+
+
+def test_top_k_heap_keeps_the_earlier_of_tied_rows():
+    rng = np.random.default_rng(0)
+    scored = pd.DataFrame({'PredictedRisk': rng.integers(0, 5, 300).astype(float)},
+                          index=pd.Index(np.arange(300), name='EmployeeNumber'))
+    heap = []
+
+    for start in range(0, 300, 40):
+        _push_top_k(heap, scored.iloc[start:start + 40], start, top_k=25)
+
+    top = [row for _, _, row in sorted(heap, reverse=True)]
+    assert top == list(top_by_sort(scored, 25).itertuples(name=None))
+
+
+def test_models_outside_the_export_format_are_pickled(tmp_path):
+    X = employee_features(150)
+    pipeline = fit_gbsa(X, build_learner("componentwise", n_estimators=20))
+    assert _write_worker_model(pipeline, str(tmp_path))[1] is False
+
+    top = score_chunks(pipeline, chunked(X, 64), str(tmp_path / "scores.parquet"), top_k=5, n_jobs=1)
+
+    np.testing.assert_allclose(pd.read_parquet(tmp_path / "scores.parquet")['PredictedRisk'], pipeline.predict(X))
+    assert len(top) == 5
+
+
+def test_invalid_requests_write_nothing(served_pipeline, tmp_path):
+    pipeline, X = served_pipeline
+    output_path = str(tmp_path / "scores.parquet")
+
+    with pytest.raises(ValueError, match="top_k"):
+        score_chunks(pipeline, chunked(X, 50), output_path, top_k=0)
+    with pytest.raises(ValueError, match="No employees"):
+        score_chunks(pipeline, iter([]), output_path, n_jobs=1)
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".parquet")] == []
+
+
+def test_score_job_scores_the_active_employees(local_data, local_registry, served_pipeline, tmp_path, monkeypatch):
+    pipeline, _ = served_pipeline
+    hr_table(300).to_csv(local_data / "hr.csv", index=False)
+    save_model(pipeline)
+    for name, value in [("SCORING_CHUNK_ROWS", 40), ("SCORING_N_JOBS", 2), ("SCORING_TOP_K", 10)]:
+        monkeypatch.setattr(params, name, value)
+    output_path = str(tmp_path / "scoring" / "risk_scores.parquet")
+
+    top = main.score(output_path)
+
+    active = get_data()
+    active = active[active['Attrition'] == 0]
+    scored = pd.read_parquet(output_path)
+    assert scored.index.tolist() == active.index.tolist()
+    np.testing.assert_allclose(scored['PredictedRisk'],
+                               pipeline.predict(active.drop(columns=['Attrition', 'YearsAtCompany'])), rtol=1e-5)
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "scoring" / "risk_scores_top.parquet"), top)
+    pd.testing.assert_frame_equal(top, top_by_sort(scored, 10), check_categorical=False)
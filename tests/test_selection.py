@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.model_selection import KFold
+
+from employee_attrition.ml_logic.preprocessing import build_preprocessor
+from employee_attrition.ml_logic.selection import Checkpoint, cache_fold_matrices, successive_halving
+from synthetic import employee_features, survival_target
+
+
+@pytest.fixture(scope="module")
+def data():
+    X = employee_features(300)
+    return X, survival_target(X)
+
+
+def test_fold_matrices_are_preprocessed_on_their_training_rows(data, tmp_path):
+    X, y = data
+    fold_dirs = cache_fold_matrices(X, y, str(tmp_path), n_splits=3, random_state=0)
+
+    for fold_dir, (train_index, val_index) in zip(fold_dirs, KFold(3, shuffle=True, random_state=0).split(X)):
+        preprocessor = build_preprocessor().fit(X.iloc[train_index])
+        X_val = np.load(os.path.join(fold_dir, "X_val.npy"))
+        assert X_val.dtype == np.float32
+        np.testing.assert_allclose(X_val, preprocessor.transform(X.iloc[val_index]), atol=1e-5)
+        np.testing.assert_array_equal(np.load(os.path.join(fold_dir, "y_train.npy")), y[train_index])
+
+    # Complete folds are reused as they are
+    mtimes = [os.stat(os.path.join(d, "X_train.npy")).st_mtime_ns for d in fold_dirs]
+    cache_fold_matrices(X, y, str(tmp_path), n_splits=3, random_state=0)
+    assert [os.stat(os.path.join(d, "X_train.npy")).st_mtime_ns for d in fold_dirs] == mtimes
+
+
+def test_checkpoint_resumes_the_same_search_only(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(path, {"search": 1})
+    checkpoint.record(Checkpoint.key(0, 25, 1), 0.7)
+
+    assert Checkpoint(path, {"search": 1}).get("0|25|1") == 0.7
+    assert Checkpoint(path, {"search": 2}).get("0|25|1") is None
+
+
+def test_successive_halving(data, capsys):
+    X, y = data
+    search = dict(n_candidates=4, min_estimators=5, max_estimators=20, eta=2, n_splits=2, n_jobs=2, random_state=0)
+
+    best_params, cv_c_index, report = successive_halving(X, y, **search)
+
+    # 4 candidates x 5 stages, the best 2 x 10, the best one x 20
+    assert report.groupby("n_estimators").size().to_dict() == {5: 4, 10: 2, 20: 1}
+    assert best_params["n_estimators"] == 20
+    assert cv_c_index == report.loc[report["n_estimators"] == 20, "cv_c_index"].item()
+
+    # A rerun is answered from the checkpoint
+    capsys.readouterr()
+    assert successive_halving(X, y, **search)[0] == best_params
+    assert "(0 fits" in capsys.readouterr().out
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from employee_attrition import params
+from employee_attrition.api import fast
+from employee_attrition.ml_logic.export import load_exported_model
+from employee_attrition.ml_logic.registry import export_serving_model, get_model_version, save_model
+
+
+@pytest.fixture
+def exported(local_registry, served_pipeline, tmp_path):
+    """The served pipeline saved to the registry and exported to a serving file"""
+    pipeline, _ = served_pipeline
+    save_model(pipeline)
+    path = str(tmp_path / "shm" / "model.eam")
+    return path, export_serving_model(path)
+
+
+def test_nothing_to_export_without_a_model(local_registry, tmp_path):
+    assert export_serving_model(str(tmp_path / "model.eam")) is None
+    with pytest.raises(ValueError):
+        export_serving_model()
+
+
+def test_export_carries_the_registry_version(exported, served_pipeline):
+    pipeline, X = served_pipeline
+    path, version = exported
+
+    plan = load_exported_model(path)
+    assert version == get_model_version()
+    assert plan.metadata["model_version"] == version
+    np.testing.assert_array_equal(plan.predict(X), pipeline.predict(X))
+
+
+def test_workers_map_the_exported_model(exported, monkeypatch):
+    path, version = exported
+    monkeypatch.setattr(params, "SERVING_MODEL_PATH", path)
+
+    model, plan, loaded_version = fast.load_serving_model()
+
+    # No unpickled pipeline: the plan's arrays are views of the shared file
+    assert model is None
+    assert loaded_version == version
+    assert not plan.means.flags.writeable
+
+
+def test_api_serves_from_the_exported_model(exported, served_pipeline, start_api, monkeypatch):
+    pipeline, X = served_pipeline
+    path, version = exported
+
+    def no_pickle():
+        raise AssertionError("the exported model should be mapped, not unpickled")
+
+    monkeypatch.setattr(fast, "load_model_with_version", no_pickle)
+    monkeypatch.setattr(params, "SERVING_MODEL_PATH", path)
+    client = start_api()
+
+    assert client.get("/health/ready").json() == {"status": "ready", "model_version": version}
+    hr_data = X.iloc[:20].reset_index().astype(object).to_dict(orient='list')
+    response = client.post("/predictRisk", json={"hr_data": hr_data})
+    assert response.status_code == 200
+    np.testing.assert_allclose([row["PredictedRisk"] for row in response.json()["risk_scores_df"]],
+                               pipeline.predict(X.iloc[:20]), rtol=1e-6)
@@ -0,0 +1,58 @@
+import base64
+
+import numpy as np
+import pytest
+from sksurv.ensemble import GradientBoostingSurvivalAnalysis
+
+from employee_attrition.ml_logic.survival import (
+    baseline_survival, encode_survival_curves, survival_matrix, survival_time_grid,
+)
+from synthetic import employee_features, fit_gbsa
+
+
+@pytest.fixture(scope="module")
+def model_and_data():
+    X = employee_features(300)
+    pipeline = fit_gbsa(X, GradientBoostingSurvivalAnalysis(n_estimators=20, max_depth=3, random_state=0))
+    return pipeline.named_steps['model'], pipeline.named_steps['preprocessor'].transform(X.iloc[:20])
+
+
+@pytest.mark.parametrize("grid", [dict(), dict(max_time=5.0), dict(max_time=8.0, n_points=13)])
+def test_matrix_matches_predict_survival_function(model_and_data, grid):
+    model, X = model_and_data
+    baseline = baseline_survival(model)
+    time_grid = survival_time_grid(baseline, **grid)
+
+    matrix = survival_matrix(baseline, model.predict(X), time_grid)
+
+    # Before the first event time StepFunction raises: evaluate there as survival_matrix does
+    clipped = np.clip(time_grid, baseline[0][0], None)
+    expected = np.stack([fn(clipped) for fn in model.predict_survival_function(X)])
+    assert matrix.shape == (len(X), len(time_grid))
+    np.testing.assert_allclose(matrix, expected, rtol=1e-10)
+
+
+def test_time_grid_is_capped_at_the_last_event(model_and_data):
+    model, _ = model_and_data
+    baseline = baseline_survival(model)
+    last_event = baseline[0][-1]
+
+    np.testing.assert_array_equal(survival_time_grid(baseline), baseline[0])
+    assert survival_time_grid(baseline, max_time=last_event * 10, n_points=5)[-1] == last_event
+
+
+def test_model_without_breslow_baseline_is_rejected():
+    X = employee_features(100)
+    pipeline = fit_gbsa(X, GradientBoostingSurvivalAnalysis(loss="squared", n_estimators=5, random_state=0))
+    with pytest.raises(ValueError):
+        baseline_survival(pipeline.named_steps['model'])
+
+
+def test_base64_payload_round_trips():
+    matrix = np.random.default_rng(0).random((3, 4))
+    payload = encode_survival_curves([7, 8, 9], np.arange(4.0), matrix, dtype="float32", encoding="base64")
+
+    decoded = np.frombuffer(base64.b64decode(payload["SurvivalProbability"]), dtype="<f4").reshape(payload["shape"])
+    np.testing.assert_array_equal(decoded, matrix.astype(np.float32))
+    assert payload["EmployeeNumber"] == [7, 8, 9]
+    assert payload["Time"] == [0.0, 1.0, 2.0, 3.0]
@@ -0,0 +1,116 @@
+import asyncio
+import functools
+import json
+import os
+import time
+
+import pytest
+
+from employee_attrition.api import training
+from employee_attrition.api.training import TrainingJob
+
+# Stand-ins for train(save=True), picklable for the spawned training process
+QUICK = os.getpid
+FAILING = functools.partial(int, "not a number")
+SLOW = functools.partial(time.sleep, 30)
+
+
+async def wait_for(job, timeout=60):
+    deadline = time.monotonic() + timeout
+    while job.running and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+
+def test_successful_job_loads_the_model(monkeypatch):
+    monkeypatch.setattr(training, "_train_and_save", QUICK)
+    loaded = []
+
+    async def scenario():
+        job = TrainingJob()
+        job.start(on_success=lambda: asyncio.sleep(0, loaded.append(True)))
+        assert job.to_dict()["status"] == "running"
+        await wait_for(job)
+        return job.to_dict()
+
+    state = asyncio.run(scenario())
+    assert state["status"] == "succeeded"
+    assert loaded == [True]
+    assert state["finished_at"] >= state["started_at"]
+
+
+def test_failed_job_reports_its_error(monkeypatch):
+    monkeypatch.setattr(training, "_train_and_save", FAILING)
+
+    async def scenario():
+        job = TrainingJob()
+        job.start(on_success=pytest.fail)
+        await wait_for(job)
+        return job.to_dict()
+
+    state = asyncio.run(scenario())
+    assert state["status"] == "failed"
+    assert "not a number" in state["error"]
+
+
+def test_workers_share_one_job(monkeypatch, tmp_path):
+    monkeypatch.setattr(training, "_train_and_save", SLOW)
+    state_path = str(tmp_path / "model.eam.training")
+
+    async def scenario():
+        job, other_worker = TrainingJob(state_path), TrainingJob(state_path)
+        job.start(on_success=pytest.fail)
+        try:
+            # The training process is up
+            await asyncio.sleep(0.5)
+            with pytest.raises(RuntimeError, match="already running$"):
+                job.start(on_success=pytest.fail)
+            with pytest.raises(RuntimeError, match="another worker"):
+                other_worker.start(on_success=pytest.fail)
+            assert other_worker.to_dict()["status"] == "running"
+        finally:
+            await job.cancel()
+        return other_worker.to_dict()
+
+    assert asyncio.run(scenario())["status"] == "cancelled"
+
+
+def test_job_cancelled_before_it_started_releases_the_lock(monkeypatch, tmp_path):
+    monkeypatch.setattr(training, "_train_and_save", SLOW)
+    state_path = str(tmp_path / "model.eam.training")
+
+    async def scenario():
+        job = TrainingJob(state_path)
+        job.start(on_success=pytest.fail)
+        await job.cancel()
+        # Another worker can start the next one
+        other_worker = TrainingJob(state_path)
+        other_worker.start(on_success=pytest.fail)
+        await other_worker.cancel()
+        return job.to_dict()
+
+    assert asyncio.run(scenario())["status"] == "cancelled"
+
+
+def test_job_of_a_dead_worker_is_reported_failed(tmp_path):
+    state_path = tmp_path / "model.eam.training"
+    # Left "running" by a worker that exited, so nobody holds the lock
+    state_path.write_text(json.dumps({"status": "running", "started_at": 1.0, "finished_at": None, "error": None}))
+
+    state = TrainingJob(str(state_path)).to_dict()
+    assert state["status"] == "failed"
+    assert "exited" in state["error"]
+
+
+def test_train_endpoint(start_api, monkeypatch):
+    monkeypatch.setattr(training, "_train_and_save", QUICK)
+    client = start_api()
+
+    response = client.post("/train")
+    assert response.status_code == 202
+    assert client.post("/train").status_code == 409
+
+    deadline = time.monotonic() + 60
+    while client.get("/train").json()["status"] == "running" and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert client.get("/train").json()["status"] == "succeeded"
+    assert client.get("/health/ready").json()["status"] == "ready"
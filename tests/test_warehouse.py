@@ -0,0 +1,88 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from employee_attrition import params
+from employee_attrition.ml_logic.data import get_data, load_data_to_bq, save_data
+from employee_attrition.ml_logic.schema import apply_schema, filter_mask
+from employee_attrition.ml_logic.warehouse import SQLiteWarehouse, load_table, query_table
+from synthetic import hr_table
+
+
+def tables(warehouse):
+    with sqlite3.connect(warehouse.path) as connection:
+        names = [name for name, in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    connection.close()
+    return sorted(names)
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    return SQLiteWarehouse(str(tmp_path / "bq"), "dataset")
+
+
+def test_chunked_loads_append_or_truncate(warehouse):
+    hr = hr_table(250)
+
+    assert load_table(warehouse, hr, "hr", truncate=True, chunk_rows=100) == 250
+    load_table(warehouse, hr.iloc[:50], "hr", truncate=False, chunk_rows=100)
+    assert len(query_table(warehouse, "hr", ['EmployeeNumber'])) == 300
+
+    load_table(warehouse, hr.iloc[:50], "hr", truncate=True)
+    result = query_table(warehouse, "hr", list(hr.columns))
+    pd.testing.assert_frame_equal(apply_schema(result), apply_schema(hr.iloc[:50].copy()))
+
+
+def test_named_index_is_loaded_as_a_column(warehouse):
+    risk_scores = hr_table(20).set_index('EmployeeNumber')[['YearsAtCompany']].assign(PredictedRisk=0.5)
+
+    load_table(warehouse, risk_scores, "risk_scores", truncate=True)
+
+    assert query_table(warehouse, "risk_scores", ['EmployeeNumber'])['EmployeeNumber'].tolist() == list(range(1, 21))
+
+
+def test_failed_truncate_keeps_the_table(warehouse):
+    load_table(warehouse, pd.DataFrame({'a': [1, 2]}), "t", truncate=True)
+
+    with pytest.raises(sqlite3.Error):
+        load_table(warehouse, pd.DataFrame({'a': [[1], [2]]}), "t", truncate=True)
+
+    assert query_table(warehouse, "t", ['a'])['a'].tolist() == [1, 2]
+
+
+def test_filters_run_in_the_query(warehouse):
+    hr = hr_table(300)
+    load_table(warehouse, hr, "hr", truncate=True)
+    filters = [('Department', 'in', ['Sales', 'Human Resources']), ('Age', '>=', 25), ('OverTime', '!=', 'Yes')]
+
+    result = query_table(warehouse, "hr", ['EmployeeNumber', 'Age'], filters)
+
+    expected = hr.loc[filter_mask(hr, filters), ['EmployeeNumber', 'Age']].reset_index(drop=True)
+    assert len(expected)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert pd.concat(warehouse.query_chunks("hr", ['EmployeeNumber'], filters, chunk_rows=10))['EmployeeNumber'] \
+        .tolist() == expected['EmployeeNumber'].tolist()
+    with pytest.raises(ValueError, match="Unknown filter operator"):
+        query_table(warehouse, "hr", ['Age'], [('Age', '~', 25)])
+
+
+def test_data_round_trip_through_the_warehouse(local_warehouse, monkeypatch):
+    hr = hr_table(200)
+    hr.to_csv(params.LOCAL_CACHE_DIR + "/hr.csv", index=False)
+    load_data_to_bq(hr, "project", "dataset", "hr", truncate=True)
+
+    raw_data = get_data()
+
+    monkeypatch.setattr(params, "DATA_SOURCE", "local")
+    pd.testing.assert_frame_equal(raw_data, get_data(), check_dtype=False, check_index_type=False)
+
+    risk_scores = raw_data[['YearsAtCompany']].assign(PredictedRisk=np.linspace(0, 1, 200))
+    feature_importance = pd.DataFrame({'feature': ['Age'], 'importance': [1.0]})
+    save_data(raw_data, feature_importance, risk_scores, risk_scores[['PredictedRisk']])
+    assert tables(local_warehouse) == ['cleaned', 'explanations', 'feature_importance', 'hr', 'risk_scores']
+
+    # Saving without risk factors drops the previous model's
+    save_data(raw_data, feature_importance, risk_scores)
+    assert 'explanations' not in tables(local_warehouse)
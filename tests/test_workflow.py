@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from sksurv.ensemble import GradientBoostingSurvivalAnalysis
+
+from employee_attrition.interface.main import validation_data
+from employee_attrition.ml_logic.data import get_data
+from employee_attrition.ml_logic.model import validation_mask
+from employee_attrition.ml_logic.registry import get_model_version, save_model
+from synthetic import fit_gbsa, hr_table
+
+
+def test_validation_mask_keeps_employees_on_their_side():
+    index = pd.Index(np.arange(1, 2001), name='EmployeeNumber')
+    mask = validation_mask(index)
+
+    assert 0.17 < mask.mean() < 0.23
+    # Same employees held out as the data grows or is reordered
+    np.testing.assert_array_equal(validation_mask(index[:1000]), mask[:1000])
+    shuffled = np.random.default_rng(0).permutation(index)
+    np.testing.assert_array_equal(validation_mask(shuffled), mask[shuffled - 1])
+    assert (validation_mask(index, random_state=1) != mask).any()
+
+
+def test_validation_data_holds_out_the_masked_rows(local_data):
+    hr_table(300).to_csv(local_data / "hr.csv", index=False)
+    raw_data = get_data()
+
+    X, y, y_train = validation_data(raw_data)
+
+    mask = validation_mask(raw_data.index)
+    assert X.index.equals(raw_data.index[mask])
+    assert 'Attrition' not in X and 'YearsAtCompany' not in X
+    assert (len(y), len(y_train)) == (mask.sum(), (~mask).sum())
+    np.testing.assert_array_equal(y['time'], raw_data['YearsAtCompany'][mask])
+
+
+def test_evaluate_production_model_refuses_another_version(local_data, local_registry):
+    workflow = pytest.importorskip("employee_attrition.interface.workflow", exc_type=ImportError)
+    hr_table(300).to_csv(local_data / "hr.csv", index=False)
+    raw_data = get_data()
+    X = raw_data.drop(columns=['Attrition', 'YearsAtCompany'])
+    save_model(fit_gbsa(X, GradientBoostingSurvivalAnalysis(n_estimators=5, random_state=0)))
+    version = get_model_version()
+
+    metrics = workflow.evaluate_production_model.fn(raw_data, "fingerprint", version)
+    assert metrics["model_version"] == version
+
+    with pytest.raises(RuntimeError, match="changed"):
+        workflow.evaluate_production_model.fn(raw_data, "fingerprint", "an older version")
+
+    task = SimpleNamespace(task=SimpleNamespace(name="evaluate_production_model"))
+    assert workflow.fingerprint_cache_key(task, {"data_fingerprint": "abc", "model_version": version}) == \
+        f"evaluate_production_model-abc-{version}"